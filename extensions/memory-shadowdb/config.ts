@@ -202,6 +202,9 @@ export function resolveEmbeddingConfig(pluginCfg: PluginConfig): {
   command?: string;
   commandArgs: string[];
   commandTimeoutMs: number;
+  cacheSize: number;
+  cacheFile: string;
+  warmupQueries: string[];
 } {
   const embeddingCfg = pluginCfg.embedding || {};
   const provider = normalizeEmbeddingProvider(embeddingCfg.provider);
@@ -263,6 +266,23 @@ export function resolveEmbeddingConfig(pluginCfg: PluginConfig): {
   const commandArgs = embeddingCfg.commandArgs || [];
   const commandTimeoutMs = embeddingCfg.commandTimeoutMs || 15_000;
 
+  // Query-embedding LRU: 0 disables, invalid values fall back to the default
+  const cacheSize =
+    typeof embeddingCfg.cacheSize === "number" && Number.isFinite(embeddingCfg.cacheSize) && embeddingCfg.cacheSize >= 0
+      ? Math.floor(embeddingCfg.cacheSize)
+      : 1024;
+
+  // Persisted cache: default under ~/.shadowdb, "" (or cacheSize 0) disables
+  const cacheFile =
+    cacheSize === 0
+      ? ""
+      : typeof embeddingCfg.cacheFile === "string"
+        ? embeddingCfg.cacheFile.trim()
+        : path.join(os.homedir(), ".shadowdb", "embed-cache.json");
+  const warmupQueries = Array.isArray(embeddingCfg.warmupQueries)
+    ? embeddingCfg.warmupQueries.filter((q): q is string => typeof q === "string" && q.trim().length > 0)
+    : [];
+
   return {
     provider,
     apiKey,
@@ -276,6 +296,92 @@ export function resolveEmbeddingConfig(pluginCfg: PluginConfig): {
     command,
     commandArgs,
     commandTimeoutMs,
+    cacheSize,
+    cacheFile,
+    warmupQueries,
+  };
+}
+
+/**
+ * Resolve the search settings the store applies itself
+ *
+ * The result cache serves a repeated identical search from memory. Writes
+ * through this store clear it, so the TTL only bounds staleness from other
+ * writers (scripts, other processes). With semanticCacheThreshold set, a
+ * miss may also be served from a cached query whose embedding is at least
+ * that cosine-similar. ftsDominanceScore lets a clear full-text winner end
+ * the search before the query is embedded.
+ *
+ * @param pluginCfg - Plugin configuration object
+ * @returns Validated search cache and short-circuit configuration
+ */
+export function resolveSearchConfig(pluginCfg: PluginConfig): {
+  cacheTtlMs: number;
+  cacheSize: number;
+  semanticCacheThreshold: number;
+  ftsDominanceScore: number;
+} {
+  const search = pluginCfg.search || {};
+
+  // Result cache TTL: non-negative, 0 disables the cache. Default: 60 seconds
+  const cacheTtlMs =
+    typeof search.cacheTtlMs === "number" && Number.isFinite(search.cacheTtlMs) && search.cacheTtlMs >= 0
+      ? Math.floor(search.cacheTtlMs)
+      : 60_000;
+
+  // Distinct queries kept: non-negative, 0 disables the cache. Default: 256
+  const cacheSize =
+    typeof search.cacheSize === "number" && Number.isFinite(search.cacheSize) && search.cacheSize >= 0
+      ? Math.floor(search.cacheSize)
+      : 256;
+
+  // Semantic cache lookup: cosine similarity in (0, 1]; 0 = exact matches only
+  const semanticCacheThreshold =
+    typeof search.semanticCacheThreshold === "number" &&
+    Number.isFinite(search.semanticCacheThreshold) &&
+    search.semanticCacheThreshold >= 0 &&
+    search.semanticCacheThreshold <= 1
+      ? search.semanticCacheThreshold
+      : 0;
+
+  // FTS short-circuit: backend text score, non-negative; 0 = always run every leg
+  const ftsDominanceScore =
+    typeof search.ftsDominanceScore === "number" && Number.isFinite(search.ftsDominanceScore) && search.ftsDominanceScore >= 0
+      ? search.ftsDominanceScore
+      : 0;
+
+  return { cacheTtlMs, cacheSize, semanticCacheThreshold, ftsDominanceScore };
+}
+
+/**
+ * Resolve opt-in vector index options for the backend store
+ *
+ * Each option shapes the vector leg for an index that has to exist first
+ * (a migration for Postgres). Backends ignore options they don't support.
+ *
+ * @param pluginCfg - Plugin configuration object
+ * @returns Validated vector index configuration
+ */
+export function resolveVectorIndexConfig(pluginCfg: PluginConfig): {
+  halfvec: boolean;
+  binaryCandidates: number;
+  int8Vectors: boolean;
+  hnsw: boolean;
+} {
+  const vectorIndex = pluginCfg.vectorIndex || {};
+
+  return {
+    // Postgres: rank by embedding::halfvec (migration 006/011)
+    halfvec: vectorIndex.halfvec === true,
+    // Postgres/SQLite: Hamming-distance candidates re-ranked at full precision; 0 = off
+    binaryCandidates:
+      typeof vectorIndex.binaryCandidates === "number" && Number.isFinite(vectorIndex.binaryCandidates) && vectorIndex.binaryCandidates > 0
+        ? Math.floor(vectorIndex.binaryCandidates)
+        : 0,
+    // SQLite: int8 embeddings in <table>_vec_i8
+    int8Vectors: vectorIndex.int8Vectors === true,
+    // SQLite: vectorlite HNSW graph for the vector leg
+    hnsw: vectorIndex.hnsw === true,
   };
 }
 
@@ -305,6 +411,7 @@ export function resolvePrimerConfig(pluginCfg: PluginConfig): {
   maxChars: number;
   maxCharsByModel: Record<string, number>;
   cacheTtlMs: number;
+  rowsTtlMs: number;
 } {
   const primer = pluginCfg.primer || {};
   
@@ -343,12 +450,20 @@ export function resolvePrimerConfig(pluginCfg: PluginConfig): {
       ? Math.floor(primer.cacheTtlMs)
       : 10 * 60 * 1000;
 
+  // Primer row cache in the store: non-negative, 0 = re-read every turn
+  // Default: 60 seconds
+  const rowsTtlMs =
+    typeof primer.rowsTtlMs === "number" && Number.isFinite(primer.rowsTtlMs) && primer.rowsTtlMs >= 0
+      ? Math.floor(primer.rowsTtlMs)
+      : 60_000;
+
   return {
     enabled: primer.enabled !== false, // Default: enabled
     mode,
     maxChars,
     maxCharsByModel,
     cacheTtlMs,
+    rowsTtlMs,
   };
 }
 
@@ -438,6 +553,9 @@ export function computeEmbeddingFingerprint(cfg: {
 }): string {
   // Include prefix behavior: nomic models use task prefixes, others don't
   const hasTaskPrefix = cfg.model.toLowerCase().includes("nomic") ? "task-prefix" : "none";
-  const input = `${cfg.provider}:${cfg.model}:${cfg.dimensions}:${hasTaskPrefix}`;
+  // Ollama vectors are scaled to unit length (see embedOllama); stores
+  // embedded before that hold raw-norm vectors and must re-embed
+  const normalization = cfg.provider === "ollama" ? ":unit-norm" : "";
+  const input = `${cfg.provider}:${cfg.model}:${cfg.dimensions}:${hasTaskPrefix}${normalization}`;
   return createHash("sha256").update(input).digest("hex").slice(0, 16);
 }
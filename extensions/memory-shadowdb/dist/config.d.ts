@@ -96,6 +96,43 @@ export declare function resolveEmbeddingConfig(pluginCfg: PluginConfig): {
     command?: string;
     commandArgs: string[];
     commandTimeoutMs: number;
+    cacheSize: number;
+    cacheFile: string;
+    warmupQueries: string[];
+};
+/**
+ * Resolve the search settings the store applies itself
+ *
+ * The result cache serves a repeated identical search from memory. Writes
+ * through this store clear it, so the TTL only bounds staleness from other
+ * writers (scripts, other processes). With semanticCacheThreshold set, a
+ * miss may also be served from a cached query whose embedding is at least
+ * that cosine-similar. ftsDominanceScore lets a clear full-text winner end
+ * the search before the query is embedded.
+ *
+ * @param pluginCfg - Plugin configuration object
+ * @returns Validated search cache and short-circuit configuration
+ */
+export declare function resolveSearchConfig(pluginCfg: PluginConfig): {
+    cacheTtlMs: number;
+    cacheSize: number;
+    semanticCacheThreshold: number;
+    ftsDominanceScore: number;
+};
+/**
+ * Resolve opt-in vector index options for the backend store
+ *
+ * Each option shapes the vector leg for an index that has to exist first
+ * (a migration for Postgres). Backends ignore options they don't support.
+ *
+ * @param pluginCfg - Plugin configuration object
+ * @returns Validated vector index configuration
+ */
+export declare function resolveVectorIndexConfig(pluginCfg: PluginConfig): {
+    halfvec: boolean;
+    binaryCandidates: number;
+    int8Vectors: boolean;
+    hnsw: boolean;
 };
 /**
  * Resolve primer injection configuration with validation
@@ -123,6 +160,7 @@ export declare function resolvePrimerConfig(pluginCfg: PluginConfig): {
     maxChars: number;
     maxCharsByModel: Record<string, number>;
     cacheTtlMs: number;
+    rowsTtlMs: number;
 };
 /**
  * Resolve maxChars for a specific model using pattern matching
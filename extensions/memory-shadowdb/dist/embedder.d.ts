@@ -19,6 +19,7 @@
  * - command: external process via stdin/stdout JSON
  *
  * DATA FLOW:
+ * 0. Query embeddings are served from an in-memory LRU when possible
  * 1. Text input (truncated to 6000 chars)
  * 2. Provider-specific API call or command execution
  * 3. Parse response → extract embedding vector
@@ -26,6 +27,25 @@
  * 5. Return validated float[] to caller
  */
 import type { EmbeddingProvider } from "./types.js";
+/** Default capacity of the in-memory query-embedding LRU (entries). */
+export declare const EMBED_CACHE_SIZE = 1024;
+/** Default time embed() fails fast after the provider was unreachable (ms). */
+export declare const EMBED_FAILURE_COOLDOWN_MS = 5000;
+/** Most embed() calls one coalesced batch carries; a full batch is sent at once. */
+export declare const EMBED_COALESCE_MAX = 16;
+/**
+ * pgvector / MySQL VECTOR text form of an embedding ("[a,b,...]"), memoized
+ * per array. Query vectors come back from the LRU as the same shared array
+ * on every repeat search, so each is formatted once rather than per leg
+ * call. Relies on embeddings being treated as read-only (see CACHING).
+ */
+export declare function vectorText(embedding: number[]): string;
+/**
+ * sqlite-vec BLOB form of an embedding (little-endian float32 bytes),
+ * memoized per array like vectorText(), so a repeat query's vector is
+ * converted once instead of on every vector leg call.
+ */
+export declare function vectorBlob(embedding: number[]): Uint8Array;
 /**
  * Unified embedding client supporting multiple providers
  *
@@ -39,9 +59,32 @@ import type { EmbeddingProvider } from "./types.js";
  * - Dimension validation ensures output matches pgvector schema
  *
  * CONCURRENCY:
- * - This client is stateless and safe for concurrent embed() calls
- * - No connection pooling (HTTP requests are one-shot via fetch)
+ * - Safe for concurrent embed() calls
+ * - HTTP connections are pooled and kept alive by fetch's global dispatcher,
+ *   so only the first request to a host pays the TCP (and TLS) handshake
+ * - Ollama requests are retried once if a pooled socket was closed by the
+ *   server while idle (the request never reached Ollama)
  * - Command-based provider spawns a new process per embed() call
+ *
+ * CACHING:
+ * - Query embeddings are kept in an LRU keyed by sha256(provider, model,
+ *   purpose, text), so a repeated search skips the provider round-trip
+ * - Concurrent embed() calls for the same key share one in-flight request
+ * - Document embeddings are not cached (one-off writes would just churn it)
+ * - Cached vectors are shared between callers — treat them as read-only
+ * - saveCacheFile()/loadCacheFile() carry the LRU across restarts so the
+ *   first searches after startup don't all pay a provider round-trip
+ * - stats() reports LRU hit/miss counts for tuning cacheSize
+ *
+ * BATCHING:
+ * - With coalesceWindowMs > 0, embed() calls arriving within that window are
+ *   sent as one embedBatch-style request (up to EMBED_COALESCE_MAX texts),
+ *   so bursts of concurrent searches or writes share a round-trip
+ *
+ * OUTAGES:
+ * - If the provider can't be reached (connection refused, DNS, timeout), calls
+ *   fail immediately for failureCooldownMs instead of each waiting on a dead
+ *   endpoint; the first call after the window probes the provider again
  */
 export declare class EmbeddingClient {
     private provider;
@@ -56,6 +99,18 @@ export declare class EmbeddingClient {
     private command?;
     private commandArgs;
     private commandTimeoutMs;
+    private cacheSize;
+    private cache;
+    private inflight;
+    private cacheHits;
+    private cacheMisses;
+    private failureCooldownMs;
+    private unreachableUntil;
+    private shortCircuits;
+    private coalesceWindowMs;
+    private pendingBatches;
+    /** False once the server has answered /api/embed with 404 (pre-0.3 Ollama). */
+    private ollamaBatchEndpoint;
     constructor(params: {
         provider: EmbeddingProvider;
         model: string;
@@ -69,6 +124,12 @@ export declare class EmbeddingClient {
         command?: string;
         commandArgs?: string[];
         commandTimeoutMs?: number;
+        /** Query-embedding LRU capacity (default 1024, 0 = disabled) */
+        cacheSize?: number;
+        /** Fail-fast window after the provider was unreachable (default 5000ms, 0 = disabled) */
+        failureCooldownMs?: number;
+        /** Window for coalescing concurrent embed() calls into one batch (default 0 = disabled) */
+        coalesceWindowMs?: number;
     });
     /**
      * Get the configured embedding dimensions.
@@ -83,11 +144,98 @@ export declare class EmbeddingClient {
      * SECURITY: Input is truncated to 6000 chars to prevent DoS.
      * This limit is enforced in each provider method.
      *
+     * Query embeddings are served from the LRU when present; misses for the
+     * same key while a request is in flight await that request instead of
+     * issuing another. Failures are never cached, but while the provider is
+     * unreachable calls fail fast (see OUTAGES above).
+     *
      * @param text - Input text to embed
      * @returns Embedding vector (validated to match expected dimensions)
      * @throws Error if provider fails or dimensions don't match
      */
     embed(text: string, purpose?: "query" | "document"): Promise<number[]>;
+    /**
+     * Embed many texts, using the provider's batch endpoint where it has one.
+     *
+     * ollama (/api/embed), openai/openai-compatible and voyage embed the whole
+     * list in one HTTP request instead of one per text. gemini, command, and
+     * Ollama servers too old for /api/embed fall back to sequential requests.
+     * Query embeddings already in the LRU are served from it; only misses go
+     * to the provider.
+     *
+     * Ollama vectors are unit length on both endpoints (see unitLength), so a
+     * batch-embedded text matches its embed() vector.
+     *
+     * @param texts - Input texts (each truncated to 6000 chars)
+     * @returns One validated embedding per input, in input order
+     * @throws Error if the provider fails or any dimension doesn't match
+     */
+    embedBatch(texts: string[], purpose?: "query" | "document"): Promise<number[][]>;
+    /** Drop all cached query embeddings. */
+    clearCache(): void;
+    /**
+     * Query-embedding LRU occupancy and hit/miss counts since construction.
+     * `shortCircuits` counts calls failed fast while the provider was unreachable.
+     */
+    stats(): {
+        size: number;
+        capacity: number;
+        hits: number;
+        misses: number;
+        shortCircuits: number;
+    };
+    /**
+     * Embed queries ahead of time so their first real search is a cache hit.
+     * Failures are swallowed — warmup is best-effort.
+     *
+     * @param texts - Query strings expected to recur (e.g. common searches)
+     * @returns Number of queries now cached
+     */
+    warmup(texts: string[]): Promise<number>;
+    /**
+     * Seed the query-embedding LRU from a file written by saveCacheFile().
+     *
+     * The file records provider, model and dimensions; if any differ from this
+     * client the whole file is ignored, so a model change simply starts cold.
+     * Missing or corrupt files are ignored too.
+     *
+     * @param filePath - Cache file path
+     * @returns Number of entries loaded
+     */
+    loadCacheFile(filePath: string): Promise<number>;
+    /**
+     * Write the query-embedding LRU to disk (atomic: temp file + rename).
+     *
+     * Only sha256 keys are written, never the query text itself. The file is
+     * created owner-readable only.
+     *
+     * @param filePath - Cache file path (parent directories are created)
+     * @returns Number of entries written
+     */
+    saveCacheFile(filePath: string): Promise<number>;
+    /** LRU lookup; a hit becomes most-recently used. */
+    /**
+     * Run a provider call unless a recent one found the provider unreachable.
+     * Starts the cooldown on network failures/timeouts only — an HTTP error
+     * or bad response means the provider is up, so later calls still try.
+     */
+    private callProvider;
+    /** One uncached embed, coalesced with concurrent ones when enabled. */
+    private request;
+    /** Send the pending batch for `purpose` and settle each caller with its slice. */
+    private flushBatch;
+    private recall;
+    /** LRU insert, evicting the least-recently used entries over capacity. */
+    private remember;
+    /** LRU key: provider, model and purpose all change the vector for a text. */
+    private cacheKey;
+    /** Provider dispatch + dimension validation, bypassing the cache. */
+    private embedUncached;
+    /**
+     * Batch dispatch + dimension validation, bypassing the cache.
+     * Providers without a batch endpoint get one request per text.
+     */
+    private embedManyUncached;
     /**
      * Ollama provider implementation
      *
@@ -104,6 +252,21 @@ export declare class EmbeddingClient {
      */
     private resolveTaskPrefix;
     private embedOllama;
+    /**
+     * Ollama batch implementation
+     *
+     * API: POST /api/embed with JSON {model, input: [...]} → {embeddings: [...]}
+     * (Ollama 0.3+). Returns null on 404 so callers fall back to /api/embeddings;
+     * the 404 is remembered, so later batches skip the probe round trip.
+     */
+    private embedOllamaBatch;
+    /**
+     * POST JSON to the Ollama server over fetch's keep-alive pool.
+     *
+     * Ollama closes idle connections on its own schedule; if the pooled socket
+     * turns out to be dead, the request is sent once more on a fresh one.
+     */
+    private postOllama;
     /**
      * OpenAI and OpenAI-compatible provider implementation
      *
@@ -122,6 +285,13 @@ export declare class EmbeddingClient {
      * @throws Error if API key missing, HTTP fails, or response invalid
      */
     private embedOpenAICompatible;
+    /**
+     * OpenAI-compatible batch implementation
+     *
+     * Same endpoint as embedOpenAICompatible() with `input` as an array.
+     * Results are ordered by their `index` field, not response order.
+     */
+    private embedOpenAICompatibleBatch;
     /**
      * Voyage AI provider implementation
      *
@@ -135,6 +305,13 @@ export declare class EmbeddingClient {
      * @throws Error if API key missing, HTTP fails, or response invalid
      */
     private embedVoyage;
+    /**
+     * Voyage batch implementation — the API takes an array of inputs natively.
+     *
+     * @param texts - Input texts (each truncated to 6000 chars)
+     * @returns Embedding vectors in input order
+     */
+    private embedVoyageBatch;
     /**
      * Google Gemini provider implementation
      *
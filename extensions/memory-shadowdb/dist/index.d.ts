@@ -26,7 +26,7 @@
  * - "mysql": MySQL 9.2+ — native vector, FULLTEXT
  */
 import type { OpenClawPluginApi } from "openclaw/plugin-sdk";
-import { resolveEmbeddingConfig, resolvePrimerConfig, resolveMaxCharsForModel, normalizeEmbeddingProvider, validateEmbeddingDimensions, computeEmbeddingFingerprint } from "./config.js";
+import { resolveEmbeddingConfig, resolvePrimerConfig, resolveSearchConfig, resolveVectorIndexConfig, resolveMaxCharsForModel, normalizeEmbeddingProvider, validateEmbeddingDimensions, computeEmbeddingFingerprint } from "./config.js";
 declare const memoryShadowdbPlugin: {
     id: string;
     name: string;
@@ -38,6 +38,8 @@ export declare const __test__: {
     normalizeEmbeddingProvider: typeof normalizeEmbeddingProvider;
     resolveEmbeddingConfig: typeof resolveEmbeddingConfig;
     resolvePrimerConfig: typeof resolvePrimerConfig;
+    resolveSearchConfig: typeof resolveSearchConfig;
+    resolveVectorIndexConfig: typeof resolveVectorIndexConfig;
     validateEmbeddingDimensions: typeof validateEmbeddingDimensions;
     computeEmbeddingFingerprint: typeof computeEmbeddingFingerprint;
     resolveMaxCharsForModel: typeof resolveMaxCharsForModel;
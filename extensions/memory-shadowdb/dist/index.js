@@ -26,37 +26,57 @@
  * - "mysql": MySQL 9.2+ — native vector, FULLTEXT
  */
 import { Type } from "@sinclair/typebox";
-import { resolveConnectionString, resolveEmbeddingConfig, resolvePrimerConfig, resolveMaxCharsForModel, normalizeEmbeddingProvider, validateEmbeddingDimensions, computeEmbeddingFingerprint, } from "./config.js";
+import { resolveConnectionString, resolveEmbeddingConfig, resolvePrimerConfig, resolveSearchConfig, resolveVectorIndexConfig, resolveMaxCharsForModel, normalizeEmbeddingProvider, validateEmbeddingDimensions, computeEmbeddingFingerprint, } from "./config.js";
 import { EmbeddingClient } from "./embedder.js";
 import { parseRerankerConfig, checkRerankerHealth } from "./reranker.js";
 // ============================================================================
 // Backend factory — picks the right store based on config
 // ============================================================================
 /**
- * Create the appropriate MemoryStore backend based on config.
- *
- * Dynamically imports backend modules so unused backends don't add
- * to the dependency tree (e.g., SQLite users don't need pg).
+ * Backend name → store constructor. Each builder dynamically imports its
+ * module so unused backends don't add to the dependency tree (e.g., SQLite
+ * users don't need pg).
  */
-async function createStore(backend, connectionString, embedder, storeConfig, logger) {
-    switch (backend) {
-        case "postgres": {
+const STORE_BUILDERS = new Map([
+    ["postgres", async (connectionString, embedder, config, logger, vectorIndex) => {
             const { PostgresStore } = await import("./postgres.js");
-            return new PostgresStore({ connectionString, embedder, config: storeConfig, logger });
-        }
-        case "sqlite": {
+            return new PostgresStore({
+                connectionString,
+                embedder,
+                config,
+                logger,
+                halfvec: vectorIndex.halfvec,
+                binaryCandidates: vectorIndex.binaryCandidates,
+            });
+        }],
+    ["sqlite", async (connectionString, embedder, config, logger, vectorIndex) => {
             const { SQLiteStore } = await import("./sqlite.js");
             // For SQLite, connectionString is the file path (e.g., ~/.shadowdb/memory.db)
             const dbPath = connectionString || `${process.env.HOME}/.shadowdb/memory.db`;
-            return new SQLiteStore({ dbPath, embedder, config: storeConfig, logger });
-        }
-        case "mysql": {
+            return new SQLiteStore({
+                dbPath,
+                embedder,
+                config,
+                logger,
+                int8Vectors: vectorIndex.int8Vectors,
+                binaryCandidates: vectorIndex.binaryCandidates,
+                hnsw: vectorIndex.hnsw,
+            });
+        }],
+    ["mysql", async (connectionString, embedder, config, logger) => {
             const { MySQLStore } = await import("./mysql.js");
-            return new MySQLStore({ connectionString, embedder, config: storeConfig, logger });
-        }
-        default:
-            throw new Error(`memory-shadowdb: unknown backend "${backend}". Supported: postgres, sqlite, mysql`);
+            return new MySQLStore({ connectionString, embedder, config, logger });
+        }],
+]);
+/**
+ * Create the appropriate MemoryStore backend based on config.
+ */
+async function createStore(backend, connectionString, embedder, storeConfig, logger, vectorIndex) {
+    const build = STORE_BUILDERS.get(backend);
+    if (!build) {
+        throw new Error(`memory-shadowdb: unknown backend "${backend}". Supported: ${[...STORE_BUILDERS.keys()].join(", ")}`);
     }
+    return build(connectionString, embedder, storeConfig, logger, vectorIndex);
 }
 // ============================================================================
 // Plugin Definition
@@ -95,6 +115,8 @@ const memoryShadowdbPlugin = {
         const recencyWeight = pluginCfg.search?.recencyWeight ?? 0.15;
         const minVectorScore = pluginCfg.search?.minVectorScore ?? 0;
         const primerCfg = resolvePrimerConfig(pluginCfg);
+        const searchCfg = resolveSearchConfig(pluginCfg);
+        const vectorIndexCfg = resolveVectorIndexConfig(pluginCfg);
         const writesCfg = {
             enabled: pluginCfg.writes?.enabled === true,
             autoEmbed: pluginCfg.writes?.autoEmbed !== false,
@@ -113,6 +135,11 @@ const memoryShadowdbPlugin = {
             autoEmbed: writesCfg.autoEmbed,
             purgeAfterDays: writesCfg.purgeAfterDays,
             reranker: rerankerCfg,
+            primerRowsTtlMs: primerCfg.rowsTtlMs,
+            searchCacheTtlMs: searchCfg.cacheTtlMs,
+            searchCacheSize: searchCfg.cacheSize,
+            semanticCacheThreshold: searchCfg.semanticCacheThreshold,
+            ftsDominanceScore: searchCfg.ftsDominanceScore,
         };
         // Primer injection cache (bounded at 5000 entries)
         const primerState = new Map();
@@ -137,6 +164,7 @@ const memoryShadowdbPlugin = {
             command: embeddingCfg.command,
             commandArgs: embeddingCfg.commandArgs,
             commandTimeoutMs: embeddingCfg.commandTimeoutMs,
+            cacheSize: embeddingCfg.cacheSize,
         });
         // ========================================================================
         // Create Store (deferred — initialized in service start)
@@ -148,7 +176,7 @@ const memoryShadowdbPlugin = {
          */
         async function getStore() {
             if (!store) {
-                store = await createStore(backend, connectionString, embedder, storeConfig, api.logger);
+                store = await createStore(backend, connectionString, embedder, storeConfig, api.logger, vectorIndexCfg);
             }
             return store;
         }
@@ -737,6 +765,19 @@ const memoryShadowdbPlugin = {
                 const s = await getStore();
                 // Initialize backend (create tables for SQLite/MySQL, no-op for Postgres)
                 await s.initialize();
+                // Seed the query-embedding cache from the previous run, then warm
+                // configured queries in the background (don't block startup)
+                if (embeddingCfg.cacheFile) {
+                    const loaded = await embedder.loadCacheFile(embeddingCfg.cacheFile);
+                    if (loaded > 0) {
+                        api.logger.info(`memory-shadowdb: loaded ${loaded} cached query embedding(s)`);
+                    }
+                }
+                if (embeddingCfg.warmupQueries.length > 0) {
+                    void embedder.warmup(embeddingCfg.warmupQueries).then((warmed) => {
+                        api.logger.info(`memory-shadowdb: warmed ${warmed}/${embeddingCfg.warmupQueries.length} query embedding(s)`);
+                    });
+                }
                 // Run startup recovery scan for orphaned writes
                 try {
                     const { initializeStartupRecovery } = await import('./startup-recovery.js');
@@ -804,7 +845,16 @@ const memoryShadowdbPlugin = {
                 }
             },
             stop: async () => {
+                if (embeddingCfg.cacheFile) {
+                    try {
+                        await embedder.saveCacheFile(embeddingCfg.cacheFile);
+                    }
+                    catch (err) {
+                        api.logger.warn(`memory-shadowdb: failed to persist embedding cache: ${String(err)}`);
+                    }
+                }
                 if (store) {
+                    api.logger.info(`memory-shadowdb: cache stats ${JSON.stringify(store.stats())}`);
                     await store.close();
                     api.logger.info("memory-shadowdb: connection closed");
                 }
@@ -825,6 +875,8 @@ export const __test__ = {
     normalizeEmbeddingProvider,
     resolveEmbeddingConfig,
     resolvePrimerConfig,
+    resolveSearchConfig,
+    resolveVectorIndexConfig,
     validateEmbeddingDimensions,
     computeEmbeddingFingerprint,
     resolveMaxCharsForModel,
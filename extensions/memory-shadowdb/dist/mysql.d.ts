@@ -17,7 +17,8 @@
  * - FULLTEXT index WITH PARSER ngram on (title, content) for fuzzy search
  *
  * SECURITY:
- * - All queries use parameterized SQL (? placeholders)
+ * - All queries use parameterized SQL (? placeholders), prepared once per
+ *   pooled connection via pool.execute()
  * - Table name comes from config only (not user input)
  * - Connection pool capped at 3 to prevent resource exhaustion
  * - Connection string may contain credentials — never logged
@@ -30,6 +31,13 @@
  */
 import { MemoryStore, type RankedHit, type PrimerRow, type StoreConfig, type StoreLogger } from "./store.js";
 import type { EmbeddingClient } from "./embedder.js";
+/**
+ * Turn free text into a boolean-mode FULLTEXT query requiring every term as
+ * a prefix: `foo bar-baz` → `+foo* +bar* +baz*`. Boolean operators in the
+ * input are stripped so user text can't change the query's meaning or make
+ * it a syntax error. Returns "" when no usable terms remain.
+ */
+export declare function toBooleanPrefixQuery(query: string): string;
 /**
  * MySQL-backed memory store.
  *
@@ -38,8 +46,17 @@ import type { EmbeddingClient } from "./embedder.js";
  */
 export declare class MySQLStore extends MemoryStore {
     private pool;
+    private poolInit;
+    /** Whether this store holds one of its shared pool's refs (taken in getPool, released by close). */
+    private holdsRef;
     private connectionString;
     private hasVector;
+    private searchSql;
+    /**
+     * Text searches since the last optimize(), counted by their shortest
+     * term's length, so any innodb_ft_min_token_size is checked exactly.
+     */
+    private shortestTermCounts;
     constructor(params: {
         connectionString: string;
         embedder: EmbeddingClient;
@@ -47,7 +64,15 @@ export declare class MySQLStore extends MemoryStore {
         logger: StoreLogger;
     });
     private getPool;
-    /** Execute a query and return rows. */
+    /**
+     * Execute a query and return rows.
+     *
+     * pool.execute() prepares each distinct SQL string once per pooled
+     * connection and reuses the server-side handle afterwards, so SQL text
+     * must stay stable: values go in `params`, never in the string.
+     * LIMIT/OFFSET values are bound as strings — MySQL 8.0.22+ rejects a
+     * DOUBLE (how mysql2 sends JS numbers) for LIMIT in prepared statements.
+     */
     private query;
     /** Execute a statement (INSERT/UPDATE/DELETE) and return result metadata. */
     private exec;
@@ -63,6 +88,7 @@ export declare class MySQLStore extends MemoryStore {
         text: string;
         path: string;
     }>;
+    protected fetchContentByIds(ids: number[]): Promise<Map<number, string>>;
     protected getPrimerRows(): Promise<PrimerRow[]>;
     protected findByOperationId(operationId: string): Promise<number | null>;
     protected insertRecord(params: {
@@ -106,6 +132,23 @@ export declare class MySQLStore extends MemoryStore {
         category: string | null;
         deleted_at: string | Date | null;
     } | null>;
+    /**
+     * Refresh table statistics and check FULLTEXT token limits.
+     *
+     * ANALYZE TABLE re-samples index statistics, which drift after heavy
+     * inserts and can mislead the optimizer on the search legs. It also reads
+     * innodb_ft_min_token_size: terms shorter than it are never indexed, so
+     * queries made of them fall through to the fuzzy leg. If such queries
+     * are common, lower the variable and rebuild the FULLTEXT index.
+     * Counters reset after each call.
+     *
+     * @returns Token size (null if unreadable) and text-search counts since the last call
+     */
+    optimize(): Promise<{
+        minTokenSize: number | null;
+        textQueries: number;
+        shortTermQueries: number;
+    }>;
     ping(): Promise<boolean>;
     close(): Promise<void>;
     getMetaValue(key: string): Promise<string | null>;
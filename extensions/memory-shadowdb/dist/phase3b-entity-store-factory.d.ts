@@ -28,6 +28,11 @@ export interface EntityStoreOptions {
         info: (msg: string) => void;
     };
 }
+/**
+ * Forget cached stores and end their pools; the next createEntityStore()
+ * builds fresh ones. Stores handed out earlier can't query afterwards.
+ */
+export declare function clearEntityStoreCache(): Promise<void>;
 /**
  * Create an EntityStore for the given backend.
  *
@@ -36,5 +41,6 @@ export interface EntityStoreOptions {
  * @returns                 - EntityStore (real or stub)
  *
  * Never throws — returns NullEntityStore on unknown backend.
+ * PostgreSQL stores are reused per connection string (see clearEntityStoreCache).
  */
 export declare function createEntityStore(backend: string, options?: EntityStoreOptions): Promise<EntityStore>;
@@ -58,6 +58,21 @@ class NullEntityStore {
 // ============================================================================
 // Factory
 // ============================================================================
+/**
+ * PostgreSQL stores by connection string. Each owns a pg pool, so repeat
+ * createEntityStore() calls share one pool per database instead of opening
+ * a new one every time.
+ */
+const postgresStores = new Map();
+/**
+ * Forget cached stores and end their pools; the next createEntityStore()
+ * builds fresh ones. Stores handed out earlier can't query afterwards.
+ */
+export async function clearEntityStoreCache() {
+    const entries = [...postgresStores.values()];
+    postgresStores.clear();
+    await Promise.allSettled(entries.map(async (entry) => (await entry).pool.end()));
+}
 /**
  * Create an EntityStore for the given backend.
  *
@@ -66,16 +81,21 @@ class NullEntityStore {
  * @returns                 - EntityStore (real or stub)
  *
  * Never throws — returns NullEntityStore on unknown backend.
+ * PostgreSQL stores are reused per connection string (see clearEntityStoreCache).
  */
 export async function createEntityStore(backend, options = {}) {
     const logger = options.logger ?? { warn: console.warn, info: console.info };
     switch (backend) {
         case "postgres": {
-            // Real implementation — uses pg pool + memory_edges table
-            const { createPostgresEntityStore } = await import("./phase3b-postgres-entity-store.js");
-            const { Pool } = await import("pg");
-            const pool = new Pool({ connectionString: options.connectionString, max: 3 });
-            return createPostgresEntityStore(pool);
+            const key = options.connectionString ?? "";
+            let entry = postgresStores.get(key);
+            if (!entry) {
+                entry = createPostgresStore(options.connectionString);
+                postgresStores.set(key, entry);
+                // A failed import isn't cached, so the next call retries
+                entry.catch(() => postgresStores.delete(key));
+            }
+            return (await entry).store;
         }
         case "sqlite":
             // TODO: implement SQLiteEntityStore when SQLiteStore is extended
@@ -90,4 +110,11 @@ export async function createEntityStore(backend, options = {}) {
             return new NullEntityStore(backend, logger);
     }
 }
+/** Real implementation — uses pg pool + memory_edges table. */
+async function createPostgresStore(connectionString) {
+    const { createPostgresEntityStore } = await import("./phase3b-postgres-entity-store.js");
+    const { Pool } = await import("pg");
+    const pool = new Pool({ connectionString, max: 3 });
+    return { store: createPostgresEntityStore(pool), pool };
+}
 //# sourceMappingURL=phase3b-entity-store-factory.js.map
\ No newline at end of file
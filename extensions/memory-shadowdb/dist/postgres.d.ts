@@ -10,7 +10,8 @@
  * SECURITY:
  * - All queries use parameterized SQL ($1, $2, ...) — no user input interpolation
  * - Table name interpolation is safe: comes from plugin config only (not user input)
- * - Connection pool capped at 3 to prevent resource exhaustion
+ * - Connection pool capped at 3 to prevent resource exhaustion, shared by
+ *   every store in the process that uses the same database
  * - Connection string may contain credentials — never logged
  */
 import pg from "pg";
@@ -18,6 +19,12 @@ import { MemoryStore, type RankedHit, type PrimerRow, type StoreConfig, type Sto
 import type { EmbeddingClient } from "./embedder.js";
 import type { SearchFilters } from "./types.js";
 import { type GraphEdge } from "./graph-queries.js";
+/**
+ * Default `hnsw.ef_search` for pooled connections. pgvector's built-in 40
+ * caps the HNSW candidate list below the 5× oversampled vector leg
+ * (maxResults * 5), so the leg would return fewer, lower-recall hits.
+ */
+export declare const HNSW_EF_SEARCH = 80;
 /**
  * PostgreSQL-backed memory store.
  *
@@ -27,13 +34,47 @@ import { type GraphEdge } from "./graph-queries.js";
 export declare class PostgresStore extends MemoryStore {
     private pool;
     private connectionString;
+    private efSearch;
+    private halfvec;
+    private binaryCandidates;
+    /** Index into PRIMER_QUERIES of the first query this schema can run. */
+    private primerQuery;
+    /** Cleared once a query finds no content_snippet column. */
+    private hasContentSnippet;
+    /**
+     * @param params.efSearch - hnsw.ef_search set on every pooled connection
+     *   (default: HNSW_EF_SEARCH). Higher improves vector recall at the cost of
+     *   latency; 0 keeps the server's setting.
+     * @param params.halfvec - Order the vector leg by embedding::halfvec so it
+     *   uses the half-precision HNSW index from migration 006/011 (default: false).
+     * @param params.binaryCandidates - When > 0, the vector leg first takes this
+     *   many nearest rows by Hamming distance on binary_quantize(embedding)
+     *   (migration 010's index), then ranks only those by full-precision cosine.
+     *   Takes precedence over halfvec (default: 0 = off).
+     */
     constructor(params: {
         connectionString: string;
         embedder: EmbeddingClient;
         config: StoreConfig;
         logger: StoreLogger;
+        efSearch?: number;
+        halfvec?: boolean;
+        binaryCandidates?: number;
     });
+    /**
+     * Connections go back to the pool after each query rather than closing,
+     * so only the first query pays TCP + TLS + auth. The idle timeout outlives
+     * a typical gap between agent turns, and TCP keep-alive stops NATs and
+     * firewalls from silently dropping the warm sockets in between.
+     *
+     * hnsw.ef_search is set once per new connection. pg queues queries per
+     * client, so the SET runs before the first query the pool hands it.
+     *
+     * The pool is shared with other stores on the same database (sharedPools).
+     */
     protected getPool(): pg.Pool;
+    /** sharedPools key for this store's connection settings. */
+    private get poolKey();
     /**
      * Expose pool for legacy compatibility (index.ts shared pool pattern).
      * TODO: Remove once index.ts is fully migrated to use MemoryStore directly.
@@ -66,6 +107,7 @@ export declare class PostgresStore extends MemoryStore {
         text: string;
         path: string;
     }>;
+    protected fetchContentByIds(ids: number[], snippetOnly?: boolean): Promise<Map<number, string>>;
     protected getPrimerRows(): Promise<PrimerRow[]>;
     /**
      * Find an existing non-deleted record by caller-supplied operationId in metadata.
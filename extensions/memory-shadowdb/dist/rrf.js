@@ -7,6 +7,19 @@
  * RRF Reference: Cormack, Clarke, & Buettcher (2009)
  */
 import { RRF_K } from "./store.js";
+/** Ranks covered by the reciprocal table; legs return far fewer. */
+const RRF_TABLE_SIZE = 1024;
+/**
+ * 1 / (RRF_K + rank), indexed by rank, shared by every merge. Built on first
+ * use: store.js imports this module, so RRF_K isn't initialized at load time.
+ */
+let rrfReciprocals = null;
+function reciprocals() {
+    if (!rrfReciprocals) {
+        rrfReciprocals = Float64Array.from({ length: RRF_TABLE_SIZE }, (_, rank) => 1 / (RRF_K + rank));
+    }
+    return rrfReciprocals;
+}
 /**
  * Merge ranked hits from multiple search signals using Reciprocal Rank Fusion.
  *
@@ -22,42 +35,64 @@ import { RRF_K } from "./store.js";
  * @param config       - Store config with weight parameters
  */
 export function mergeRRF(vectorHits, ftsHits, fuzzyHits, maxResults, minScore, config) {
+    // Entries are appended as first seen, so the fused list is built in the
+    // same pass as the scores instead of being copied out of the map after
     const scoreMap = new Map();
+    const allEntries = [];
+    // Out-of-range or fractional ranks read undefined and fall back to dividing
+    const table = reciprocals();
     const addSignal = (hits, weight) => {
         for (const hit of hits) {
-            const contribution = weight / (RRF_K + hit.rank);
+            const contribution = weight * (table[hit.rank] ?? 1 / (RRF_K + hit.rank));
             const existing = scoreMap.get(hit.id);
             if (existing) {
                 existing.rrfScore += contribution;
             }
             else {
-                scoreMap.set(hit.id, { hit, rrfScore: contribution });
+                const entry = { hit, rrfScore: contribution };
+                scoreMap.set(hit.id, entry);
+                allEntries.push(entry);
             }
         }
     };
     addSignal(vectorHits, config.vectorWeight);
     addSignal(ftsHits, config.textWeight);
     addSignal(fuzzyHits, 0.2); // fixed trigram weight
-    // Recency boost: rank all seen records by created_at (newest first), apply RRF
-    const allEntries = [...scoreMap.values()];
-    const byRecency = [...allEntries]
-        .filter((e) => e.hit.created_at != null)
-        .sort((a, b) => {
-        const dateA = a.hit.created_at instanceof Date
-            ? a.hit.created_at
-            : new Date(a.hit.created_at);
-        const dateB = b.hit.created_at instanceof Date
-            ? b.hit.created_at
-            : new Date(b.hit.created_at);
-        return dateB.getTime() - dateA.getTime(); // newest first
-    });
-    byRecency.forEach((entry, idx) => {
-        entry.rrfScore += config.recencyWeight / (RRF_K + idx + 1);
-    });
-    return allEntries
-        .sort((a, b) => b.rrfScore - a.rrfScore)
-        .filter((e) => e.rrfScore > Math.max(minScore, 0.001))
-        .slice(0, maxResults)
-        .map((e) => ({ ...e.hit, rrfScore: e.rrfScore }));
+    // Recency boost: rank all seen records by created_at (newest first), apply RRF.
+    // Timestamps are parsed once up front rather than on every comparison.
+    if (config.recencyWeight !== 0) {
+        const byRecency = [];
+        for (const entry of allEntries) {
+            const created = entry.hit.created_at;
+            if (created == null)
+                continue;
+            byRecency.push({ entry, time: (created instanceof Date ? created : new Date(created)).getTime() });
+        }
+        byRecency.sort((a, b) => b.time - a.time); // newest first
+        for (let idx = 0; idx < byRecency.length; idx++) {
+            byRecency[idx].entry.rrfScore += config.recencyWeight * (table[idx + 1] ?? 1 / (RRF_K + idx + 1));
+        }
+    }
+    // Keep a sorted top-maxResults window instead of sorting every candidate
+    // (up to ~150) to return a handful. Equal scores keep first-seen order,
+    // as a stable sort would.
+    const floor = Math.max(minScore, 0.001);
+    const limit = Math.max(0, Math.floor(maxResults) || 0);
+    if (limit === 0)
+        return [];
+    const top = [];
+    for (const entry of allEntries) {
+        if (entry.rrfScore <= floor)
+            continue;
+        if (top.length === limit && entry.rrfScore <= top[limit - 1].rrfScore)
+            continue;
+        let i = top.length;
+        while (i > 0 && top[i - 1].rrfScore < entry.rrfScore)
+            i--;
+        top.splice(i, 0, entry);
+        if (top.length > limit)
+            top.pop();
+    }
+    return top.map((e) => ({ ...e.hit, rrfScore: e.rrfScore }));
 }
 //# sourceMappingURL=rrf.js.map
\ No newline at end of file
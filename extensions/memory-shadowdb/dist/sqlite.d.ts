@@ -10,6 +10,7 @@
  * Dependencies:
  * - better-sqlite3: synchronous SQLite driver (fast, no async overhead)
  * - sqlite-vec: vector search extension (loaded at runtime)
+ * - vectorlite: optional HNSW index for the vector leg (hnsw option)
  *
  * DESIGN NOTES:
  * - Single-file database: zero config, no server process
@@ -25,7 +26,8 @@
  * - WAL mode for concurrent read safety
  */
 import { MemoryStore, type RankedHit, type PrimerRow, type StoreConfig, type StoreLogger } from "./store.js";
-import type { EmbeddingClient } from "./embedder.js";
+import { type EmbeddingClient } from "./embedder.js";
+import type { SearchFilters } from "./types.js";
 /**
  * SQLite-backed memory store.
  *
@@ -37,16 +39,88 @@ export declare class SQLiteStore extends MemoryStore {
     private db;
     private dbPath;
     private hasVec;
+    private int8Vectors;
+    private binaryCandidates;
+    private hnsw;
+    private hasHnsw;
+    /** True while `<table>_hnsw` holds every stored embedding (see backfillHnsw). */
+    private hnswComplete;
+    private statements;
+    /**
+     * @param params.int8Vectors - Keep embeddings as int8 (1 byte per dimension
+     *   instead of 4) in a separate `<table>_vec_i8` vec0 table ranked by cosine
+     *   distance. The vector scan reads a quarter of the bytes. initialize()
+     *   quantizes embeddings already in `<table>_vec` into it (default: false).
+     * @param params.binaryCandidates - When > 0, embeddings are also kept as
+     *   1-bit sign codes in `<table>_vec_bit`, and the vector leg first takes
+     *   this many nearest rows by Hamming distance there, then re-ranks only
+     *   those against the full vectors. Codes for embeddings stored before
+     *   the option was on are filled in by initialize() (default: 0 = off).
+     * @param params.hnsw - Also index embeddings in a vectorlite HNSW table
+     *   (`<table>_hnsw`, graph persisted next to the database file) and answer
+     *   the vector leg from it instead of sqlite-vec's brute-force scan.
+     *   initialize() copies in embeddings stored before the option was on. The
+     *   graph holds at most 100,000 vectors (HNSW_MAX_ELEMENTS); past that, or
+     *   when vectorlite isn't installed, the vector leg uses sqlite-vec. Takes
+     *   precedence over int8Vectors and binaryCandidates for search
+     *   (default: false).
+     */
     constructor(params: {
         dbPath: string;
         embedder: EmbeddingClient;
         config: StoreConfig;
         logger: StoreLogger;
+        int8Vectors?: boolean;
+        binaryCandidates?: number;
+        hnsw?: boolean;
     });
+    /** vec0 table holding this store's embeddings. */
+    private get vecTable();
     initialize(): Promise<void>;
-    protected vectorSearch(query: string, embedding: number[], limit: number): Promise<RankedHit[]>;
-    protected textSearch(query: string, limit: number): Promise<RankedHit[]>;
-    protected fuzzySearch(query: string, limit: number): Promise<RankedHit[]>;
+    /**
+     * Quantize embeddings stored before int8Vectors was turned on from the
+     * float `<table>_vec` into `<table>_vec_i8`, in id-ordered batches. Every
+     * read goes to the int8 table (as do the _vec_bit and HNSW backfills), so
+     * without this the vector leg finds nothing until a re-embed.
+     */
+    private backfillInt8;
+    /**
+     * Copy embeddings the HNSW index doesn't have yet (stored before hnsw was
+     * turned on) from the vec0 table, in id-ordered batches. The index is only
+     * searched once it holds every embedding: if it fills up or can't be
+     * written, hnswComplete stays false and the vector leg keeps scanning vec0.
+     */
+    private backfillHnsw;
+    /**
+     * Compiled statement for `sql`, prepared on first use and reused after, so
+     * repeat queries skip SQLite's parse and plan. better-sqlite3 statements
+     * stay valid for the handle's lifetime (SQLite re-prepares them itself
+     * after a schema change).
+     */
+    private statement;
+    /**
+     * Category filter as a rowid prefilter on the leg's virtual table. The
+     * subquery reads the live-row category index, so FTS5 and vec0 only
+     * consider rows in that category — for vec0 this also keeps a rare
+     * category from being filtered out of the top k after the KNN probe.
+     */
+    private categoryPrefilter;
+    protected vectorSearch(query: string, embedding: number[], limit: number, filters?: SearchFilters): Promise<RankedHit[]>;
+    /**
+     * Vector leg over the vectorlite HNSW graph: an approximate k-NN walk that
+     * touches O(log n) vectors instead of scanning all of them. Distances are
+     * cosine, so 1 - distance is cosine similarity.
+     */
+    private hnswVectorSearch;
+    /**
+     * Two-stage vector leg: Hamming distance over the 1-bit codes (32x fewer
+     * bytes than float32) picks candidates, and only those are scored against
+     * the full vectors with the table's own metric, so the final order
+     * matches a single-stage search over the candidate set.
+     */
+    private binaryVectorSearch;
+    protected textSearch(query: string, limit: number, filters?: SearchFilters): Promise<RankedHit[]>;
+    protected fuzzySearch(query: string, limit: number, filters?: SearchFilters): Promise<RankedHit[]>;
     get(id: number): Promise<{
         text: string;
         path: string;
@@ -55,6 +129,7 @@ export declare class SQLiteStore extends MemoryStore {
         text: string;
         path: string;
     }>;
+    protected fetchContentByIds(ids: number[], snippetOnly?: boolean): Promise<Map<number, string>>;
     protected getPrimerRows(): Promise<PrimerRow[]>;
     protected findByOperationId(operationId: string): Promise<number | null>;
     protected insertRecord(params: {
@@ -31,6 +31,8 @@ export declare const MAX_TITLE_LENGTH = 500;
 export declare const MAX_CATEGORY_LENGTH = 100;
 /** RRF constant k — standard value from the original RRF paper. */
 export declare const RRF_K = 60;
+/** Characters of content a search snippet shows at most (formatSnippet). */
+export declare const SNIPPET_MAX_CHARS = 700;
 /**
  * A single ranked hit from one search signal (vector, FTS, fuzzy).
  * Each backend returns these; the base class merges them via RRF.
@@ -70,6 +72,27 @@ export interface PrimerRow {
     key: string;
     content: string;
 }
+/** Cache counters reported by MemoryStore.stats(). */
+export interface StoreStats {
+    primerHits: number;
+    primerMisses: number;
+    searchHits: number;
+    searchMisses: number;
+    /** searchHits served for a different but semantically near query */
+    semanticHits: number;
+    /** Moving average of search() latency when served from cache (ms; null before the first hit) */
+    avgCachedSearchMs: number | null;
+    /** Moving average of search() latency when the backend ran (ms; null before the first miss) */
+    avgUncachedSearchMs: number | null;
+    /** Query-embedding LRU counters from the embedder */
+    embedCache: {
+        size: number;
+        capacity: number;
+        hits: number;
+        misses: number;
+        shortCircuits: number;
+    };
+}
 /** Logger interface — subset of what OpenClaw provides. */
 export interface StoreLogger {
     info: (msg: string) => void;
@@ -100,7 +123,43 @@ export interface StoreConfig {
      * before formatting. Undefined = reranking disabled.
      */
     reranker?: import("./reranker.js").RerankerConfig;
+    /**
+     * How long getPrimerContext() reuses primer rows before re-reading the DB
+     * (default: 60000ms; 0 = always re-read). The primer table is near-static
+     * identity text, so this saves a round-trip on nearly every agent turn.
+     */
+    primerRowsTtlMs?: number;
+    /**
+     * How long search() serves a repeated identical query from memory
+     * (default: 60000ms; 0 = no result cache). Writes through this store
+     * clear the cache, so the TTL only bounds staleness from other writers.
+     */
+    searchCacheTtlMs?: number;
+    /** Max distinct queries kept in the search result cache (default: 256). */
+    searchCacheSize?: number;
+    /**
+     * Cosine similarity at or above which search() reuses the cached results
+     * of a different query with the same arguments (default: 0 = exact matches
+     * only; e.g. 0.97). Each cache miss then embeds the query before the
+     * lookup, which the embedder LRU absorbs for the search that follows.
+     */
+    semanticCacheThreshold?: number;
+    /**
+     * Backend FTS score (rawScore: ts_rank_cd, MATCH relevance, or negated
+     * bm25 for SQLite) at which a top text hit that also scores at least twice
+     * the runner-up ends the search without embedding the query or running
+     * the vector leg (default: 0 = always run every leg). Enabling it makes
+     * the text leg finish before embedding starts, so searches that do not
+     * short-circuit give up that overlap. Tune it per backend.
+     */
+    ftsDominanceScore?: number;
 }
+/** Default TTL for cached primer rows (ms). */
+export declare const PRIMER_ROWS_TTL_MS = 60000;
+/** Default TTL for cached search results (ms). */
+export declare const SEARCH_CACHE_TTL_MS = 60000;
+/** Default number of queries kept in the search result cache. */
+export declare const SEARCH_CACHE_SIZE = 256;
 /**
  * Abstract memory store — the contract all backends implement.
  *
@@ -114,6 +173,18 @@ export declare abstract class MemoryStore {
     protected embedder: EmbeddingClient;
     protected config: StoreConfig;
     protected logger: StoreLogger;
+    /** Primer rows from the last DB read, reused until primerRowsTtlMs elapses. */
+    private primerRowsCache;
+    /** In-flight primer read shared by concurrent cache misses. */
+    private primerRowsPending;
+    /** Recent search() results keyed by their arguments; Map order = LRU order. */
+    private searchCache;
+    /** Bumped on every invalidation so searches racing a write are not cached. */
+    private searchGeneration;
+    /** Cache hit/miss counters and latency averages exposed via stats(). */
+    private counters;
+    /** updateSql() text by patch column list. */
+    private updateSqls;
     constructor(embedder: EmbeddingClient, config: StoreConfig, logger: StoreLogger);
     /**
      * Hybrid search: run backend-specific search legs, merge via RRF.
@@ -130,6 +201,49 @@ export declare abstract class MemoryStore {
      * @returns Ranked, deduplicated results with snippets and citations
      */
     search(query: string, maxResults: number, minScore: number, filters?: SearchFilters, detailLevel?: "summary" | "snippet" | "section" | "full"): Promise<SearchResult[]>;
+    /**
+     * Run search() for several queries at once.
+     *
+     * All query embeddings are fetched up front with one embedBatch() request,
+     * which seeds the embedder LRU, so each search() below reuses its vector
+     * instead of calling the provider. The searches then run concurrently. If
+     * the batch embed fails, each search() embeds (or degrades) on its own.
+     *
+     * @returns One result list per query, in input order
+     */
+    searchBatch(queries: string[], maxResults: number, minScore: number, filters?: SearchFilters, detailLevel?: "summary" | "snippet" | "section" | "full"): Promise<SearchResult[][]>;
+    /**
+     * Cache hit/miss counters for the primer, search and embedding caches,
+     * plus moving-average search latency split by cache outcome. Cheap to
+     * call; intended for logging when tuning cache sizes and TTLs.
+     */
+    stats(): StoreStats;
+    /**
+     * Fresh cache entry with the same non-query arguments whose query
+     * embedding is most similar to `vector`, if it reaches `threshold`.
+     * A linear scan: the cache holds at most searchCacheSize entries.
+     *
+     * Each dot product is summed in blocks, and abandoned as soon as the
+     * partial sum plus the most the remaining dimensions could add (the
+     * product of both vectors' remaining norms) can no longer reach the
+     * threshold or the best match so far. Unrelated queries usually drop out
+     * after the first block.
+     */
+    private nearestCachedSearch;
+    /** Count one search() call and fold its latency into the matching average. */
+    private recordSearch;
+    /**
+     * Drop cached search results so the next search() hits the backend.
+     * Called by write/update/delete/undelete; call it after out-of-band edits.
+     */
+    invalidateSearchCache(): void;
+    /**
+     * search() without the result cache — embed, run legs, merge, rerank, format.
+     * If the query can't be embedded the text legs still run, and a leg that
+     * throws contributes no hits; `complete` is then false so the degraded
+     * results aren't cached.
+     */
+    private searchUncached;
     /**
      * Reciprocal Rank Fusion — merge ranked lists from multiple signals.
      *
@@ -194,6 +308,18 @@ export declare abstract class MemoryStore {
         skippedKeys: string[];
         truncated: boolean;
     } | null>;
+    /**
+     * Drop cached primer rows so the next getPrimerContext() re-reads the DB.
+     * Call after editing the primer table out-of-band (admin flows, migrations).
+     */
+    invalidatePrimerCache(): void;
+    /**
+     * Primer rows, served from cache while younger than primerRowsTtlMs.
+     * Misses while a read is in flight (e.g. several sessions starting at
+     * once) await that read; a read that an invalidation overtook is returned
+     * to its callers but not cached.
+     */
+    private loadPrimerRows;
     /**
      * Decay confidence on stale graph edges.
      *
@@ -295,6 +421,9 @@ export declare abstract class MemoryStore {
     /**
      * Re-embed all non-deleted records with the current embedding configuration.
      * Cursor-based iteration to keep memory bounded. Errors are logged and skipped.
+     *
+     * Each page is embedded with one embedBatch() request. If the batch fails,
+     * that page is retried record-by-record so one bad record can't sink 99 good ones.
      */
     reembedAll(onProgress?: (done: number, total: number) => void): Promise<{
         success: number;
@@ -370,6 +499,18 @@ export declare abstract class MemoryStore {
     }>;
     /** Fetch primer rows ordered by priority. */
     protected abstract getPrimerRows(): Promise<PrimerRow[]>;
+    /**
+     * Fetch content for the given record ids, keyed by id.
+     *
+     * Backends whose search legs leave `content` empty (so oversampled rows
+     * that RRF discards never cross the wire) override this; search() calls
+     * it once for the merged hits. Default null = legs already carry content.
+     *
+     * `snippetOnly` is set when the caller only needs the first
+     * SNIPPET_MAX_CHARS (snippet output, no reranker); backends may then
+     * return a stored prefix instead of the full text.
+     */
+    protected fetchContentByIds(_ids: number[], _snippetOnly?: boolean): Promise<Map<number, string> | null>;
     /** Insert a new record, return the new ID. */
     /** List records with optional filters. */
     abstract list(params: {
@@ -411,6 +552,17 @@ export declare abstract class MemoryStore {
     }): Promise<number>;
     /** Update record fields by ID. */
     protected abstract updateRecord(id: number, patch: Record<string, unknown>): Promise<void>;
+    /**
+     * `UPDATE <table> SET col = <p>, ...[, extraSet] WHERE id = <p>` for a patch
+     * with these columns, assembled once per column list and reused after that.
+     * update() only patches a fixed set of fields, so there are few shapes, and
+     * identical text per shape lets each backend's statement cache hit.
+     *
+     * @param columns     - Patch keys, in the order their values are bound
+     * @param placeholder - Backend parameter marker for 1-based position i
+     * @param extraSet    - Extra assignment appended to SET (e.g. updated_at)
+     */
+    protected updateSql(columns: string[], placeholder: (i: number) => string, extraSet?: string): string;
     /** Set deleted_at = now() on a record. */
     protected abstract softDeleteRecord(id: number): Promise<void>;
     /** Clear deleted_at on a record. */
@@ -43,6 +43,45 @@ export const MAX_TITLE_LENGTH = 500;
 export const MAX_CATEGORY_LENGTH = 100;
 /** RRF constant k — standard value from the original RRF paper. */
 export const RRF_K = 60;
+/** Characters of content a search snippet shows at most (formatSnippet). */
+export const SNIPPET_MAX_CHARS = 700;
+/** Default TTL for cached primer rows (ms). */
+export const PRIMER_ROWS_TTL_MS = 60_000;
+/** Default TTL for cached search results (ms). */
+export const SEARCH_CACHE_TTL_MS = 60_000;
+/** Default number of queries kept in the search result cache. */
+export const SEARCH_CACHE_SIZE = 256;
+/** Weight of the newest sample in the stats() latency moving averages. */
+const LATENCY_EWMA_ALPHA = 0.2;
+/** Dimensions summed between early-abort checks in nearestCachedSearch(). */
+const SEMANTIC_SCAN_BLOCK = 64;
+/**
+ * tails[b] = norm of unit[b * SEMANTIC_SCAN_BLOCK ..]: by Cauchy-Schwarz, the
+ * most the remaining dimensions can add to a dot product with a unit vector.
+ */
+function blockTailNorms(unit) {
+    const blocks = Math.ceil(unit.length / SEMANTIC_SCAN_BLOCK);
+    const tails = new Float64Array(blocks + 1);
+    let sum = 0;
+    for (let b = blocks - 1; b >= 0; b--) {
+        const end = Math.min((b + 1) * SEMANTIC_SCAN_BLOCK, unit.length);
+        for (let i = b * SEMANTIC_SCAN_BLOCK; i < end; i++)
+            sum += unit[i] * unit[i];
+        tails[b] = Math.sqrt(sum);
+    }
+    return tails;
+}
+/** Copy of `vector` scaled to unit length, so a dot product is cosine similarity. */
+function unitVector(vector) {
+    const unit = Float32Array.from(vector);
+    let norm = 0;
+    for (let i = 0; i < unit.length; i++)
+        norm += unit[i] * unit[i];
+    norm = Math.sqrt(norm) || 1;
+    for (let i = 0; i < unit.length; i++)
+        unit[i] /= norm;
+    return unit;
+}
 // ============================================================================
 // Abstract Base Class
 // ============================================================================
@@ -59,6 +98,26 @@ export class MemoryStore {
     embedder;
     config;
     logger;
+    /** Primer rows from the last DB read, reused until primerRowsTtlMs elapses. */
+    primerRowsCache = null;
+    /** In-flight primer read shared by concurrent cache misses. */
+    primerRowsPending = null;
+    /** Recent search() results keyed by their arguments; Map order = LRU order. */
+    searchCache = new Map();
+    /** Bumped on every invalidation so searches racing a write are not cached. */
+    searchGeneration = 0;
+    /** Cache hit/miss counters and latency averages exposed via stats(). */
+    counters = {
+        primerHits: 0,
+        primerMisses: 0,
+        searchHits: 0,
+        searchMisses: 0,
+        semanticHits: 0,
+        avgCachedSearchMs: null,
+        avgUncachedSearchMs: null,
+    };
+    /** updateSql() text by patch column list. */
+    updateSqls = new Map();
     constructor(embedder, config, logger) {
         this.embedder = embedder;
         this.config = config;
@@ -82,33 +141,245 @@ export class MemoryStore {
      * @returns Ranked, deduplicated results with snippets and citations
      */
     async search(query, maxResults, minScore, filters, detailLevel) {
+        const started = performance.now();
+        const ttl = this.config.searchCacheTtlMs ?? SEARCH_CACHE_TTL_MS;
+        const size = this.config.searchCacheSize ?? SEARCH_CACHE_SIZE;
+        if (ttl <= 0 || size <= 0) {
+            const { results } = await this.searchUncached(query, maxResults, minScore, filters, detailLevel);
+            this.recordSearch(false, started);
+            return results;
+        }
+        const args = JSON.stringify([maxResults, minScore, filters ?? null, detailLevel || "snippet"]);
+        const key = `${query}\0${args}`;
+        const cached = this.searchCache.get(key);
+        if (cached && Date.now() - cached.at < ttl) {
+            // Re-insert to mark as most recently used
+            this.searchCache.delete(key);
+            this.searchCache.set(key, cached);
+            this.logger.info(`memory-shadowdb: search cache hit — query="${query.slice(0, 80)}"`);
+            const results = cached.results.map((r) => ({ ...r }));
+            this.recordSearch(true, started);
+            return results;
+        }
+        const threshold = this.config.semanticCacheThreshold ?? 0;
+        let vector;
+        if (threshold > 0) {
+            try {
+                vector = unitVector(await this.embedder.embed(query, "query"));
+            }
+            catch {
+                // searchUncached retries the embed and logs the failure
+            }
+            const near = vector && this.nearestCachedSearch(vector, args, ttl, threshold);
+            if (near) {
+                this.searchCache.delete(near.key);
+                this.searchCache.set(near.key, near.entry);
+                this.logger.info(`memory-shadowdb: semantic search cache hit — query="${query.slice(0, 80)}", similarity=${near.similarity.toFixed(3)}`);
+                const results = near.entry.results.map((r) => ({ ...r }));
+                this.counters.semanticHits++;
+                this.recordSearch(true, started);
+                return results;
+            }
+        }
+        const generation = this.searchGeneration;
+        const { results, complete } = await this.searchUncached(query, maxResults, minScore, filters, detailLevel);
+        // Don't cache results missing the vector leg, or missing a write that
+        // landed while the legs ran
+        if (complete && generation === this.searchGeneration) {
+            this.searchCache.delete(key);
+            this.searchCache.set(key, { results: results.map((r) => ({ ...r })), at: Date.now(), args, vector });
+            while (this.searchCache.size > size) {
+                this.searchCache.delete(this.searchCache.keys().next().value);
+            }
+        }
+        this.recordSearch(false, started);
+        return results;
+    }
+    /**
+     * Run search() for several queries at once.
+     *
+     * All query embeddings are fetched up front with one embedBatch() request,
+     * which seeds the embedder LRU, so each search() below reuses its vector
+     * instead of calling the provider. The searches then run concurrently. If
+     * the batch embed fails, each search() embeds (or degrades) on its own.
+     *
+     * @returns One result list per query, in input order
+     */
+    async searchBatch(queries, maxResults, minScore, filters, detailLevel) {
+        if (queries.length > 1) {
+            try {
+                await this.embedder.embedBatch(queries, "query");
+            }
+            catch (err) {
+                this.logger.warn(`memory-shadowdb: searchBatch embedding failed, embedding per query: ${err instanceof Error ? err.message : String(err)}`);
+            }
+        }
+        return Promise.all(queries.map((query) => this.search(query, maxResults, minScore, filters, detailLevel)));
+    }
+    /**
+     * Cache hit/miss counters for the primer, search and embedding caches,
+     * plus moving-average search latency split by cache outcome. Cheap to
+     * call; intended for logging when tuning cache sizes and TTLs.
+     */
+    stats() {
+        return { ...this.counters, embedCache: this.embedder.stats() };
+    }
+    /**
+     * Fresh cache entry with the same non-query arguments whose query
+     * embedding is most similar to `vector`, if it reaches `threshold`.
+     * A linear scan: the cache holds at most searchCacheSize entries.
+     *
+     * Each dot product is summed in blocks, and abandoned as soon as the
+     * partial sum plus the most the remaining dimensions could add (the
+     * product of both vectors' remaining norms) can no longer reach the
+     * threshold or the best match so far. Unrelated queries usually drop out
+     * after the first block.
+     */
+    nearestCachedSearch(vector, args, ttl, threshold) {
+        const now = Date.now();
+        const n = vector.length;
+        const tails = blockTailNorms(vector);
+        let best = null;
+        scan: for (const [key, entry] of this.searchCache) {
+            if (!entry.vector || entry.args !== args || now - entry.at >= ttl)
+                continue;
+            if (entry.vector.length !== n)
+                continue;
+            const cached = entry.vector;
+            const floor = best ? Math.max(threshold, best.similarity) : threshold;
+            let similarity = 0;
+            let cachedHead = 0;
+            for (let start = 0, b = 1; start < n; start += SEMANTIC_SCAN_BLOCK, b++) {
+                const end = Math.min(start + SEMANTIC_SCAN_BLOCK, n);
+                // Four independent accumulators keep the adds from serializing on
+                // one register, which is the bulk of a scalar dot product's cost
+                let s0 = 0, s1 = 0, s2 = 0, s3 = 0;
+                let i = start;
+                for (; i + 3 < end; i += 4) {
+                    s0 += vector[i] * cached[i];
+                    s1 += vector[i + 1] * cached[i + 1];
+                    s2 += vector[i + 2] * cached[i + 2];
+                    s3 += vector[i + 3] * cached[i + 3];
+                    cachedHead += cached[i] * cached[i] + cached[i + 1] * cached[i + 1]
+                        + cached[i + 2] * cached[i + 2] + cached[i + 3] * cached[i + 3];
+                }
+                for (; i < end; i++) {
+                    s0 += vector[i] * cached[i];
+                    cachedHead += cached[i] * cached[i];
+                }
+                similarity += (s0 + s1) + (s2 + s3);
+                // 1e-6 absorbs float32 rounding in the unit vectors' norms
+                const bound = similarity + tails[b] * Math.sqrt(Math.max(0, 1 - cachedHead)) + 1e-6;
+                if (end < n && bound < floor)
+                    continue scan;
+            }
+            if (similarity >= threshold && (!best || similarity > best.similarity)) {
+                best = { key, entry, similarity };
+            }
+        }
+        return best;
+    }
+    /** Count one search() call and fold its latency into the matching average. */
+    recordSearch(cached, started) {
+        const ms = performance.now() - started;
+        const field = cached ? "avgCachedSearchMs" : "avgUncachedSearchMs";
+        const prev = this.counters[field];
+        this.counters[field] = prev === null ? ms : prev + LATENCY_EWMA_ALPHA * (ms - prev);
+        if (cached)
+            this.counters.searchHits++;
+        else
+            this.counters.searchMisses++;
+    }
+    /**
+     * Drop cached search results so the next search() hits the backend.
+     * Called by write/update/delete/undelete; call it after out-of-band edits.
+     */
+    invalidateSearchCache() {
+        this.searchCache.clear();
+        this.searchGeneration++;
+    }
+    /**
+     * search() without the result cache — embed, run legs, merge, rerank, format.
+     * If the query can't be embedded the text legs still run, and a leg that
+     * throws contributes no hits; `complete` is then false so the degraded
+     * results aren't cached.
+     */
+    async searchUncached(query, maxResults, minScore, filters, detailLevel) {
         const searchStart = Date.now();
         this.logger.info(`memory-shadowdb: search start — query="${query.slice(0, 80)}", maxResults=${maxResults}, minScore=${minScore}, filters=${filters ? JSON.stringify(filters) : "none"}, detailLevel=${detailLevel || "snippet"}`);
-        const embedStart = Date.now();
-        const embedding = await this.embedder.embed(query, "query");
-        const embedMs = Date.now() - embedStart;
-        this.logger.info(`memory-shadowdb: embedding generated in ${embedMs}ms (dims=${embedding.length})`);
         const oversample = maxResults * 5;
-        // Run all search legs in parallel — backends return [] for unsupported signals
+        const embedQuery = () => this.embedder.embed(query, "query").catch((err) => {
+            this.logger.warn(`memory-shadowdb: query embedding failed, searching text legs only: ${err instanceof Error ? err.message : String(err)}`);
+            return null;
+        });
+        // Exact-match short-circuit: a dominant FTS hit (e.g. a rare proper
+        // noun) ranks first regardless, so embedding + the vector leg are skipped
+        const dominance = this.config.ftsDominanceScore ?? 0;
+        // Without that gate the embedding request goes out first. A synchronous
+        // driver (better-sqlite3) runs the text legs to completion inside the
+        // calls below, so the request must already be in flight to overlap them.
         const legStart = Date.now();
+        let embedStart = legStart;
+        const embedPending = dominance > 0 ? null : embedQuery();
+        // Text and fuzzy legs don't need the embedding, so they run while the
+        // query is embedded; only the vector leg waits for it.
+        // Backends return [] for unsupported signals. A leg that throws
+        // contributes nothing, and legFailed keeps the result out of the cache.
+        let legFailed = false;
+        const ftsPending = this.textSearch(query, oversample, filters).catch((err) => {
+            legFailed = true;
+            this.logger.warn(`memory-shadowdb: textSearch failed: ${err instanceof Error ? err.message : String(err)}`);
+            return [];
+        });
+        const fuzzyPending = this.fuzzySearch(query, oversample, filters).catch((err) => {
+            legFailed = true;
+            this.logger.warn(`memory-shadowdb: fuzzySearch failed: ${err instanceof Error ? err.message : String(err)}`);
+            return [];
+        });
+        let ftsDominant = false;
+        if (dominance > 0) {
+            const fts = await ftsPending;
+            const top = fts[0]?.rawScore ?? 0;
+            ftsDominant = top >= dominance && top >= 2 * (fts[1]?.rawScore ?? 0);
+            if (ftsDominant) {
+                this.logger.info(`memory-shadowdb: FTS top hit dominates (score=${top}), skipping embedding and vector leg`);
+            }
+        }
+        let embedding = null;
+        if (embedPending) {
+            embedding = await embedPending;
+        }
+        else if (!ftsDominant) {
+            embedStart = Date.now();
+            embedding = await embedQuery();
+        }
+        const embedMs = Date.now() - embedStart;
+        if (embedding) {
+            this.logger.info(`memory-shadowdb: embedding generated in ${embedMs}ms (dims=${embedding.length})`);
+        }
         const [vectorHits, ftsHits, fuzzyHits] = await Promise.all([
-            this.vectorSearch(query, embedding, oversample, filters).catch((err) => {
+            (embedding ? this.vectorSearch(query, embedding, oversample, filters) : Promise.resolve([])).catch((err) => {
+                legFailed = true;
                 this.logger.warn(`memory-shadowdb: vectorSearch failed: ${err instanceof Error ? err.message : String(err)}`);
                 return [];
             }),
-            this.textSearch(query, oversample, filters).catch((err) => {
-                this.logger.warn(`memory-shadowdb: textSearch failed: ${err instanceof Error ? err.message : String(err)}`);
-                return [];
-            }),
-            this.fuzzySearch(query, oversample, filters).catch((err) => {
-                this.logger.warn(`memory-shadowdb: fuzzySearch failed: ${err instanceof Error ? err.message : String(err)}`);
-                return [];
-            }),
+            ftsPending,
+            fuzzyPending,
         ]);
         const legMs = Date.now() - legStart;
         this.logger.info(`memory-shadowdb: search legs completed in ${legMs}ms — vector=${vectorHits.length}, fts=${ftsHits.length}, fuzzy=${fuzzyHits.length}`);
         // Merge via RRF
         const merged = mergeRRF(vectorHits, ftsHits, fuzzyHits, maxResults, minScore, this.config);
+        // Backends whose legs skip `content` hydrate just the merged hits here —
+        // summary output never shows content, so it only needs it for reranking
+        if (merged.length > 0 && (detailLevel !== "summary" || this.config.reranker?.enabled)) {
+            const snippetOnly = (detailLevel || "snippet") === "snippet" && !this.config.reranker?.enabled;
+            const contents = await this.fetchContentByIds(merged.map((h) => h.id), snippetOnly);
+            if (contents) {
+                for (const hit of merged)
+                    hit.content = contents.get(hit.id) ?? hit.content;
+            }
+        }
         // Rerank: send top rerankTopK RRF candidates through cross-encoder
         // Degrades gracefully — if reranker is down/slow, returns RRF order unchanged
         const rerankStart = Date.now();
@@ -159,7 +430,7 @@ export class MemoryStore {
         this.logger.info(`memory-shadowdb: search complete in ${totalMs}ms — ${scoredHits.length} results (embed=${embedMs}ms, legs=${legMs}ms, scoring=${scoringMs}ms)`);
         const level = detailLevel || "snippet";
         // Format as SearchResult[]
-        return scoredHits.map((hit) => {
+        const results = scoredHits.map((hit) => {
             let snippet;
             if (level === "summary") {
                 // Summary: title + category + tags + metadata only, NO content
@@ -198,6 +469,7 @@ export class MemoryStore {
                 citation: `shadowdb:${this.config.table}#${hit.id}`,
             };
         });
+        return { results, complete: !legFailed && (embedding !== null || ftsDominant) };
     }
     /**
      * Reciprocal Rank Fusion — merge ranked lists from multiple signals.
@@ -374,8 +646,8 @@ export class MemoryStore {
      */
     async getPrimerContext(maxChars) {
         const primerStart = Date.now();
-        const rows = await this.getPrimerRows();
-        this.logger.info(`memory-shadowdb: getPrimerContext — ${rows.length} rows from DB, maxChars=${maxChars}`);
+        const { rows, cached } = await this.loadPrimerRows();
+        this.logger.info(`memory-shadowdb: getPrimerContext — ${rows.length} rows from ${cached ? "cache" : "DB"}, maxChars=${maxChars}`);
         if (rows.length === 0)
             return null;
         // Format each row as a markdown section: ## {key}\n{content}
@@ -426,6 +698,43 @@ export class MemoryStore {
         this.logger.info(`memory-shadowdb: getPrimerContext complete — ${included.length}/${formatted.length} sections, ${text.length}/${fullText.length} chars, skipped=[${skippedKeys.join(",")}], digest=${digest}, ${primerMs}ms`);
         return { text, digest, totalChars: fullText.length, rowCount: formatted.length, includedCount: included.length, skippedKeys, truncated };
     }
+    /**
+     * Drop cached primer rows so the next getPrimerContext() re-reads the DB.
+     * Call after editing the primer table out-of-band (admin flows, migrations).
+     */
+    invalidatePrimerCache() {
+        this.primerRowsCache = null;
+        this.primerRowsPending = null;
+    }
+    /**
+     * Primer rows, served from cache while younger than primerRowsTtlMs.
+     * Misses while a read is in flight (e.g. several sessions starting at
+     * once) await that read; a read that an invalidation overtook is returned
+     * to its callers but not cached.
+     */
+    async loadPrimerRows() {
+        const ttl = this.config.primerRowsTtlMs ?? PRIMER_ROWS_TTL_MS;
+        const now = Date.now();
+        if (ttl > 0 && this.primerRowsCache && now - this.primerRowsCache.at < ttl) {
+            this.counters.primerHits++;
+            return { rows: this.primerRowsCache.rows, cached: true };
+        }
+        this.counters.primerMisses++;
+        if (!this.primerRowsPending) {
+            const pending = this.getPrimerRows()
+                .then((rows) => {
+                if (this.primerRowsPending === pending)
+                    this.primerRowsCache = ttl > 0 ? { rows, at: now } : null;
+                return rows;
+            })
+                .finally(() => {
+                if (this.primerRowsPending === pending)
+                    this.primerRowsPending = null;
+            });
+            this.primerRowsPending = pending;
+        }
+        return { rows: await this.primerRowsPending, cached: false };
+    }
     /**
      * Decay confidence on stale graph edges.
      *
@@ -531,6 +840,7 @@ export class MemoryStore {
             const embedMs = Date.now() - embedStart;
             this.logger.info(`memory-shadowdb: write embed — id=${newId}, success=${embedded}, ${embedMs}ms`);
         }
+        this.invalidateSearchCache();
         const totalMs = Date.now() - writeStart;
         const path = `shadowdb/${category}/${newId}`;
         this.logger.info(`memory-shadowdb: write complete — id=${newId}, embedded=${embedded}, ${totalMs}ms (insert=${insertMs}ms)`);
@@ -596,6 +906,7 @@ export class MemoryStore {
             embedded = await this.tryEmbed(params.id, patch.content);
             this.logger.info(`memory-shadowdb: update embed — id=${params.id}, success=${embedded}, ${Date.now() - embedStart}ms`);
         }
+        this.invalidateSearchCache();
         const totalMs = Date.now() - updateStart;
         const category = patch.category || existing.category || "general";
         const path = `shadowdb/${category}/${params.id}`;
@@ -628,6 +939,7 @@ export class MemoryStore {
         }
         this.logger.info(`memory-shadowdb: delete — id=${params.id}, category="${category}"`);
         await this.softDeleteRecord(params.id);
+        this.invalidateSearchCache();
         const purgeNote = this.config.purgeAfterDays > 0
             ? ` Permanent removal in ${this.config.purgeAfterDays} days.`
             : " No auto-purge configured.";
@@ -655,6 +967,7 @@ export class MemoryStore {
         }
         this.logger.info(`memory-shadowdb: undelete — id=${params.id}, category="${category}"`);
         await this.restoreRecord(params.id);
+        this.invalidateSearchCache();
         return {
             ok: true, operation: "write", id: params.id, path, embedded: false,
             message: `Restored record ${params.id} — now active and searchable`,
@@ -752,6 +1065,9 @@ export class MemoryStore {
     /**
      * Re-embed all non-deleted records with the current embedding configuration.
      * Cursor-based iteration to keep memory bounded. Errors are logged and skipped.
+     *
+     * Each page is embedded with one embedBatch() request. If the batch fails,
+     * that page is retried record-by-record so one bad record can't sink 99 good ones.
      */
     async reembedAll(onProgress) {
         let lastId = 0;
@@ -762,9 +1078,17 @@ export class MemoryStore {
             const batch = await this.getRecordBatch(lastId, batchSize);
             if (batch.length === 0)
                 break;
-            for (const row of batch) {
+            let embeddings = null;
+            try {
+                embeddings = await this.embedder.embedBatch(batch.map((row) => row.content), "document");
+            }
+            catch (err) {
+                const message = err instanceof Error ? err.message : String(err);
+                this.logger.warn(`memory-shadowdb: batch re-embed failed after id ${lastId}, retrying per record: ${message}`);
+            }
+            for (const [i, row] of batch.entries()) {
                 try {
-                    const embedding = await this.embedder.embed(row.content, "document");
+                    const embedding = embeddings ? embeddings[i] : await this.embedder.embed(row.content, "document");
                     await this.storeEmbedding(row.id, embedding);
                     success++;
                 }
@@ -779,6 +1103,7 @@ export class MemoryStore {
                 onProgress(success + errors, success + errors); // total unknown at this point
             }
         }
+        this.invalidateSearchCache();
         return { success, errors };
     }
     // ==========================================================================
@@ -789,7 +1114,7 @@ export class MemoryStore {
      * Compact: category|3d\n{content truncated to 700 chars}
      */
     formatSnippet(row) {
-        const maxChars = 700;
+        const maxChars = SNIPPET_MAX_CHARS;
         const header = [
             row.category || null,
             row.created_at ? formatRelativeAge(row.created_at) : null,
@@ -868,6 +1193,42 @@ export class MemoryStore {
         ].filter(Boolean).join("|");
         return (header ? `${header}\n` : "") + sectionText;
     }
+    /**
+     * Fetch content for the given record ids, keyed by id.
+     *
+     * Backends whose search legs leave `content` empty (so oversampled rows
+     * that RRF discards never cross the wire) override this; search() calls
+     * it once for the merged hits. Default null = legs already carry content.
+     *
+     * `snippetOnly` is set when the caller only needs the first
+     * SNIPPET_MAX_CHARS (snippet output, no reranker); backends may then
+     * return a stored prefix instead of the full text.
+     */
+    async fetchContentByIds(_ids, _snippetOnly = false) {
+        return null;
+    }
+    /**
+     * `UPDATE <table> SET col = <p>, ...[, extraSet] WHERE id = <p>` for a patch
+     * with these columns, assembled once per column list and reused after that.
+     * update() only patches a fixed set of fields, so there are few shapes, and
+     * identical text per shape lets each backend's statement cache hit.
+     *
+     * @param columns     - Patch keys, in the order their values are bound
+     * @param placeholder - Backend parameter marker for 1-based position i
+     * @param extraSet    - Extra assignment appended to SET (e.g. updated_at)
+     */
+    updateSql(columns, placeholder, extraSet) {
+        const key = columns.join(",");
+        let sql = this.updateSqls.get(key);
+        if (sql === undefined) {
+            const sets = columns.map((column, i) => `${column} = ${placeholder(i + 1)}`);
+            if (extraSet)
+                sets.push(extraSet);
+            sql = `UPDATE ${this.config.table} SET ${sets.join(", ")} WHERE id = ${placeholder(columns.length + 1)}`;
+            this.updateSqls.set(key, sql);
+        }
+        return sql;
+    }
 }
 // ============================================================================
 // Shared Helpers
@@ -86,6 +86,12 @@ export type PluginConfig = {
         commandArgs?: string[];
         /** Command timeout in milliseconds */
         commandTimeoutMs?: number;
+        /** Query-embedding LRU capacity in entries (default: 1024, 0 = disabled) */
+        cacheSize?: number;
+        /** File the query-embedding cache persists to across restarts ("" = don't persist) */
+        cacheFile?: string;
+        /** Queries to pre-embed at startup so their first search is a cache hit */
+        warmupQueries?: string[];
     };
     /** Database table name (default: "memories") */
     table?: string;
@@ -127,6 +133,57 @@ export type PluginConfig = {
          * Default: 0.15
          */
         recencyWeight?: number;
+        /**
+         * How long a repeated identical search is served from memory (ms).
+         * Writes through the plugin clear the cache; the TTL bounds staleness
+         * from other writers. Default: 60000. 0 = no result cache.
+         */
+        cacheTtlMs?: number;
+        /** Max distinct queries kept in the search result cache. Default: 256. */
+        cacheSize?: number;
+        /**
+         * Cosine similarity (0–1) at which a search reuses the cached results of
+         * a different query with the same arguments, e.g. 0.97. Each cache miss
+         * then embeds the query before the lookup. Default: 0 (exact matches only).
+         */
+        semanticCacheThreshold?: number;
+        /**
+         * Backend full-text score at which a top text hit that also scores at
+         * least twice the runner-up ends the search without embedding the query
+         * or running the vector leg. Scales differ per backend (ts_rank_cd,
+         * MATCH relevance, negated bm25), so tune it per backend.
+         * Default: 0 (always run every leg).
+         */
+        ftsDominanceScore?: number;
+    };
+    /**
+     * Opt-in vector index layouts (default: all off). Each needs its index in
+     * place first; backends ignore options they don't support.
+     */
+    vectorIndex?: {
+        /** Postgres: search the half-precision HNSW index (migration 006/011) */
+        halfvec?: boolean;
+        /**
+         * Postgres and SQLite: take this many nearest rows by Hamming distance
+         * over 1-bit codes (Postgres: migration 010's index; SQLite:
+         * `<table>_vec_bit`, filled in at startup), then rank them at full
+         * precision. On Postgres it takes precedence over halfvec.
+         * Default: 0 (off).
+         */
+        binaryCandidates?: number;
+        /**
+         * SQLite: keep embeddings as int8 in `<table>_vec_i8`, a quarter of the
+         * bytes per vector scan. Embeddings already in `<table>_vec` are
+         * quantized into it at startup. Default: false.
+         */
+        int8Vectors?: boolean;
+        /**
+         * SQLite: answer the vector leg from a vectorlite HNSW graph
+         * (`<table>_hnsw`), filled from the vec0 table at startup. Holds at most
+         * 100,000 vectors; past that, or without vectorlite installed, search
+         * uses the sqlite-vec scan. Default: false.
+         */
+        hnsw?: boolean;
     };
     /**
      * Reranker configuration — Qwen3-Reranker cross-encoder via embed-rerank service.
@@ -241,6 +298,8 @@ export type PluginConfig = {
         maxCharsByModel?: Record<string, number>;
         /** Cache TTL for digest mode (milliseconds) */
         cacheTtlMs?: number;
+        /** How long primer rows are reused before re-reading the DB (ms, default: 60000, 0 = always re-read) */
+        rowsTtlMs?: number;
     };
 };
 /**
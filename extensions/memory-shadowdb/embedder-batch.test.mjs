@@ -0,0 +1,139 @@
+/**
+ * embedder-batch.test.mjs — EmbeddingClient.embedBatch
+ *
+ * Tests: one /api/embed request per batch, cache hits are not re-sent,
+ * fallback to per-text /api/embeddings on old Ollama (404), OpenAI results
+ * reordered by index, dimension validation on batch output, one retry when a
+ * pooled Ollama socket was closed while idle, coalescing concurrent embed()
+ * calls, embed() and embedBatch() vectors having the same (unit) norm,
+ * coalesced and lone embeds of a text returning the same vector.
+ */
+
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { EmbeddingClient } from './dist/embedder.js';
+
+/** Stub fetch; `handler(url, body)` returns { status, json }. Returns the call log. */
+function stubFetch(t, handler) {
+  const calls = [];
+  const original = globalThis.fetch;
+  globalThis.fetch = async (url, init) => {
+    const body = JSON.parse(init.body);
+    calls.push({ url, body });
+    const { status = 200, json } = handler(url, body);
+    return { ok: status < 400, status, statusText: String(status), json: async () => json, text: async () => '' };
+  };
+  t.after(() => { globalThis.fetch = original; });
+  return calls;
+}
+
+/** `v` scaled to unit length, as embed() returns /api/embeddings output. */
+const unit = (v) => { const norm = Math.sqrt(v.reduce((sum, x) => sum + x * x, 0)); return v.map((x) => x / norm); };
+
+const ollamaEmbed = (url, body) => url.endsWith('/api/embed')
+  ? { json: { embeddings: body.input.map((text) => [text.length, 0, 0]) } }
+  : { json: { embedding: [body.prompt.length, 1, 1] } };
+
+test('ollama batch embeds all texts in one request', async (t) => {
+  const calls = stubFetch(t, ollamaEmbed);
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3 });
+  const out = await client.embedBatch(['a', 'bb', 'ccc'], 'document');
+  assert.equal(calls.length, 1);
+  assert.ok(calls[0].url.endsWith('/api/embed'));
+  assert.deepEqual(out, [[1, 0, 0], [2, 0, 0], [3, 0, 0]]);
+});
+
+test('cached query embeddings are not re-sent', async (t) => {
+  const calls = stubFetch(t, ollamaEmbed);
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3 });
+  await client.embed('bb');
+  const out = await client.embedBatch(['a', 'bb', 'ccc']);
+  assert.equal(calls.length, 2);
+  assert.deepEqual(calls[1].body.input, ['a', 'ccc']);
+  assert.deepEqual(out[1], unit([2, 1, 1]));
+});
+
+test('old ollama without /api/embed falls back to per-text requests', async (t) => {
+  const calls = stubFetch(t, (url, body) => url.endsWith('/api/embed')
+    ? { status: 404, json: {} }
+    : ollamaEmbed(url, body));
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3 });
+  const out = await client.embedBatch(['a', 'bb'], 'document');
+  assert.equal(calls.length, 3);
+  assert.deepEqual(out, [unit([1, 1, 1]), unit([2, 1, 1])]);
+  await client.embedBatch(['ccc'], 'document');
+  assert.equal(calls.length, 4, 'the missing batch endpoint is not probed again');
+  assert.ok(calls[3].url.endsWith('/api/embeddings'));
+});
+
+test('openai batch results are ordered by index', async (t) => {
+  stubFetch(t, () => ({
+    json: { data: [{ index: 1, embedding: [2, 2] }, { index: 0, embedding: [1, 1] }] },
+  }));
+  const client = new EmbeddingClient({ provider: 'openai', model: 'm', dimensions: 2, apiKey: 'k', baseUrl: 'http://x' });
+  assert.deepEqual(await client.embedBatch(['a', 'b'], 'document'), [[1, 1], [2, 2]]);
+});
+
+test('batch output with wrong dimensions is rejected', async (t) => {
+  stubFetch(t, () => ({ json: { embeddings: [[1, 2]] } }));
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3 });
+  await assert.rejects(client.embedBatch(['a'], 'document'));
+});
+
+test('ollama request is retried once on a stale keep-alive socket', async (t) => {
+  let attempts = 0;
+  const original = globalThis.fetch;
+  globalThis.fetch = async () => {
+    attempts++;
+    if (attempts === 1) throw new TypeError('fetch failed', { cause: Object.assign(new Error('other side closed'), { code: 'UND_ERR_SOCKET' }) });
+    return { ok: true, status: 200, json: async () => ({ embedding: [1, 2, 3] }) };
+  };
+  t.after(() => { globalThis.fetch = original; });
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3, ollamaUrl: 'http://x/' });
+  assert.deepEqual(await client.embed('a', 'document'), unit([1, 2, 3]));
+  assert.equal(attempts, 2);
+});
+
+test('ollama connection refused is not retried', async (t) => {
+  let attempts = 0;
+  const original = globalThis.fetch;
+  globalThis.fetch = async () => {
+    attempts++;
+    throw new TypeError('fetch failed', { cause: Object.assign(new Error('refused'), { code: 'ECONNREFUSED' }) });
+  };
+  t.after(() => { globalThis.fetch = original; });
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3 });
+  await assert.rejects(client.embed('a', 'document'));
+  assert.equal(attempts, 1);
+});
+
+test('concurrent embeds within coalesceWindowMs share one batch request', async (t) => {
+  const calls = stubFetch(t, ollamaEmbed);
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3, coalesceWindowMs: 5 });
+  const out = await Promise.all([client.embed('a'), client.embed('bb', 'document'), client.embed('ccc')]);
+  assert.deepEqual(out, [[1, 0, 0], unit([2, 1, 1]), [3, 0, 0]]);
+  assert.equal(calls.length, 2, 'one batch for queries, one lone document embed');
+  assert.deepEqual(calls[0].body.input, ['a', 'ccc']);
+});
+
+test('embed() and embedBatch() return vectors of the same norm', async (t) => {
+  // Like real Ollama: /api/embed normalizes, /api/embeddings returns raw norms
+  stubFetch(t, (url, body) => url.endsWith('/api/embed')
+    ? { json: { embeddings: body.input.map(() => unit([3, 4, 0])) } }
+    : { json: { embedding: [3, 4, 0] } });
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3, cacheSize: 0 });
+  const single = await client.embed('a', 'document');
+  const [batched] = await client.embedBatch(['a'], 'document');
+  assert.ok(Math.abs(Math.hypot(...single) - 1) < 1e-9);
+  assert.ok(Math.abs(Math.hypot(...single) - Math.hypot(...batched)) < 1e-9);
+});
+
+test('a coalesced query embeds to the same vector as a lone one', async (t) => {
+  stubFetch(t, (url, body) => url.endsWith('/api/embed')
+    ? { json: { embeddings: body.input.map(() => unit([3, 4, 0])) } }
+    : { json: { embedding: [3, 4, 0] } });
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'm', dimensions: 3, cacheSize: 0, coalesceWindowMs: 5 });
+  const [coalesced] = await Promise.all([client.embed('a'), client.embed('b')]);
+  const lone = await client.embed('a');
+  assert.deepEqual(coalesced, lone);
+});
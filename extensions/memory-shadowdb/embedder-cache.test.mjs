@@ -0,0 +1,223 @@
+/**
+ * embedder-cache.test.mjs — Query-embedding LRU in EmbeddingClient
+ *
+ * Tests: repeated queries skip the provider, documents are never cached,
+ * LRU eviction, in-flight dedup, failures not cached, cacheSize=0 disables,
+ * cache file round-trip across restarts, stats() counters, fail-fast while
+ * the provider is unreachable, whitespace-insensitive query keys, version 1
+ * cache files still loading, vectorText/vectorBlob memoizing cached vectors.
+ */
+
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { EmbeddingClient, vectorBlob, vectorText } from './dist/embedder.js';
+
+/** Stub fetch with an Ollama-shaped response; returns the call log. */
+function stubFetch(t, { fail = false } = {}) {
+  const calls = [];
+  const original = globalThis.fetch;
+  globalThis.fetch = async (url, init) => {
+    calls.push(JSON.parse(init.body));
+    if (fail) return { ok: false, status: 500, statusText: 'boom' };
+    return { ok: true, json: async () => ({ embedding: [calls.length, 0, 0] }) };
+  };
+  t.after(() => { globalThis.fetch = original; });
+  return calls;
+}
+
+function makeClient(cacheSize) {
+  return new EmbeddingClient({ provider: 'ollama', model: 'test-model', dimensions: 3, cacheSize });
+}
+
+test('repeated query embeds hit the cache', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient();
+  const a = await client.embed('hello');
+  const b = await client.embed('hello');
+  assert.equal(calls.length, 1);
+  assert.deepEqual(b, a);
+});
+
+test('document embeds bypass the cache', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient();
+  await client.embed('hello', 'document');
+  await client.embed('hello', 'document');
+  assert.equal(calls.length, 2);
+});
+
+test('least recently used entry is evicted at capacity', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient(2);
+  await client.embed('a');
+  await client.embed('b');
+  await client.embed('a'); // refresh a → b is now oldest
+  await client.embed('c'); // evicts b
+  assert.equal(calls.length, 3);
+  await client.embed('a');
+  assert.equal(calls.length, 3);
+  await client.embed('b');
+  assert.equal(calls.length, 4);
+});
+
+test('concurrent identical queries share one request', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient();
+  const [a, b] = await Promise.all([client.embed('same'), client.embed('same')]);
+  assert.equal(calls.length, 1);
+  assert.deepEqual(a, b);
+});
+
+test('failed embeds are not cached', async (t) => {
+  const calls = stubFetch(t, { fail: true });
+  const client = makeClient();
+  await assert.rejects(client.embed('oops'));
+  await assert.rejects(client.embed('oops'));
+  assert.equal(calls.length, 2);
+});
+
+test('cacheSize 0 disables caching', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient(0);
+  await client.embed('hello');
+  await client.embed('hello');
+  assert.equal(calls.length, 2);
+});
+
+function tmpCacheFile(t) {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'embed-cache-'));
+  t.after(() => fs.rmSync(dir, { recursive: true, force: true }));
+  return path.join(dir, 'nested', 'embed-cache.json');
+}
+
+test('saved cache file seeds a fresh client', async (t) => {
+  const calls = stubFetch(t);
+  const file = tmpCacheFile(t);
+  const first = makeClient();
+  const vec = await first.embed('hello');
+  assert.equal(await first.saveCacheFile(file), 1);
+  assert.ok(!fs.readFileSync(file, 'utf8').includes('hello'), 'query text is not persisted');
+
+  const second = makeClient();
+  assert.equal(await second.loadCacheFile(file), 1);
+  assert.deepEqual(await second.embed('hello'), vec);
+  assert.equal(calls.length, 1);
+});
+
+test('cache file from another model is ignored', async (t) => {
+  stubFetch(t);
+  const file = tmpCacheFile(t);
+  const first = makeClient();
+  await first.embed('hello');
+  await first.saveCacheFile(file);
+
+  const other = new EmbeddingClient({ provider: 'ollama', model: 'other-model', dimensions: 3 });
+  assert.equal(await other.loadCacheFile(file), 0);
+});
+
+test('version 1 cache file with JSON vectors still loads', async (t) => {
+  const calls = stubFetch(t);
+  const file = tmpCacheFile(t);
+  const first = makeClient();
+  await first.embed('hello');
+  await first.saveCacheFile(file);
+  const saved = JSON.parse(fs.readFileSync(file, 'utf8'));
+  const v1 = { ...saved, version: 1, entries: saved.entries.map(([key]) => [key, [0.5, 0.25, 0]]) };
+  fs.writeFileSync(file, JSON.stringify(v1));
+
+  const second = makeClient();
+  assert.equal(await second.loadCacheFile(file), 1);
+  assert.deepEqual(await second.embed('hello'), [0.5, 0.25, 0]);
+  assert.equal(calls.length, 1);
+});
+
+test('missing cache file loads nothing', async (t) => {
+  const client = makeClient();
+  assert.equal(await client.loadCacheFile(tmpCacheFile(t)), 0);
+});
+
+test('warmup pre-embeds queries', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient();
+  assert.equal(await client.warmup(['a', 'b']), 2);
+  await client.embed('a');
+  assert.equal(calls.length, 2);
+});
+
+test('stats reports cache hits and misses', async (t) => {
+  stubFetch(t);
+  const client = makeClient(4);
+  await client.embed('a');
+  await client.embed('a');
+  await client.embed('b', 'document');
+  assert.deepEqual(client.stats(), { size: 1, capacity: 4, hits: 1, misses: 1, shortCircuits: 0 });
+});
+
+/** Stub fetch that fails like an unreachable server; returns the call log. */
+function stubUnreachable(t) {
+  const calls = [];
+  const original = globalThis.fetch;
+  globalThis.fetch = async (url, init) => {
+    calls.push(JSON.parse(init.body));
+    throw new TypeError('fetch failed', { cause: Object.assign(new Error('refused'), { code: 'ECONNREFUSED' }) });
+  };
+  t.after(() => { globalThis.fetch = original; });
+  return calls;
+}
+
+test('unreachable provider fails fast during the cooldown', async (t) => {
+  const calls = stubUnreachable(t);
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'test-model', dimensions: 3 });
+  await assert.rejects(client.embed('a'));
+  await assert.rejects(client.embed('b', 'document'), /unreachable/);
+  assert.equal(calls.length, 1);
+  assert.equal(client.stats().shortCircuits, 1);
+});
+
+test('provider is probed again once the cooldown ends', async (t) => {
+  const calls = stubUnreachable(t);
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'test-model', dimensions: 3, failureCooldownMs: 20 });
+  await assert.rejects(client.embed('a'));
+  await new Promise((resolve) => setTimeout(resolve, 30));
+  await assert.rejects(client.embed('a'));
+  assert.equal(calls.length, 2);
+});
+
+test('failureCooldownMs 0 disables fail-fast', async (t) => {
+  const calls = stubUnreachable(t);
+  const client = new EmbeddingClient({ provider: 'ollama', model: 'test-model', dimensions: 3, failureCooldownMs: 0 });
+  await assert.rejects(client.embed('a'));
+  await assert.rejects(client.embed('a'));
+  assert.equal(calls.length, 2);
+});
+
+test('queries differing only in whitespace share a cache entry', async (t) => {
+  const calls = stubFetch(t);
+  const client = makeClient();
+  await client.embed('hello   world');
+  await client.embed('  hello world\n');
+  assert.equal(calls.length, 1);
+  assert.equal(calls[0].prompt, 'hello world');
+});
+
+test('vectorText formats a cached query vector once', async (t) => {
+  stubFetch(t);
+  const client = makeClient();
+  const a = await client.embed('hello');
+  const b = await client.embed('hello');
+  assert.equal(vectorText(a), '[1,0,0]');
+  assert.equal(vectorText(b), vectorText(a));
+  assert.equal(vectorText([0.5, -2]), '[0.5,-2]');
+});
+
+test('vectorBlob packs a cached query vector once as float32 bytes', async (t) => {
+  stubFetch(t);
+  const client = makeClient();
+  const a = await client.embed('hello');
+  const blob = vectorBlob(a);
+  assert.equal(vectorBlob(await client.embed('hello')), blob);
+  assert.deepEqual([...new Float32Array(blob.buffer)], [1, 0, 0]);
+});
@@ -19,6 +19,8 @@
  * - command: external process via stdin/stdout JSON
  *
  * DATA FLOW:
+ * 0. Query embeddings are served from an in-memory LRU when possible
+ *    (keyed on the whitespace-normalized query text)
  * 1. Text input (truncated to 6000 chars)
  * 2. Provider-specific API call or command execution
  * 3. Parse response → extract embedding vector
@@ -27,9 +29,115 @@
  */
 
 import { spawn } from "node:child_process";
+import { createHash } from "node:crypto";
+import { mkdir, readFile, rename, writeFile } from "node:fs/promises";
+import { dirname } from "node:path";
 import type { EmbeddingProvider } from "./types.js";
 import { validateEmbeddingDimensions } from "./config.js";
 
+/** Default capacity of the in-memory query-embedding LRU (entries). */
+export const EMBED_CACHE_SIZE = 1024;
+
+/** Default time embed() fails fast after the provider was unreachable (ms). */
+export const EMBED_FAILURE_COOLDOWN_MS = 5_000;
+
+/** Most embed() calls one coalesced batch carries; a full batch is sent at once. */
+export const EMBED_COALESCE_MAX = 16;
+
+/** Socket error codes meaning a kept-alive connection died before the request was sent. */
+const STALE_SOCKET_CODES = new Set(["ECONNRESET", "EPIPE", "UND_ERR_SOCKET"]);
+
+/** True if fetch failed because a pooled keep-alive socket had been closed. */
+function isStaleSocketError(err: unknown): boolean {
+  if (!(err instanceof TypeError)) return false;
+  const code = (err.cause as { code?: unknown } | undefined)?.code;
+  return typeof code === "string" && STALE_SOCKET_CODES.has(code);
+}
+
+/** embed() calls waiting on one coalesced provider request. */
+interface PendingBatch {
+  texts: string[];
+  waiters: Array<{ resolve: (embedding: number[]) => void; reject: (err: unknown) => void }>;
+  timer: ReturnType<typeof setTimeout>;
+}
+
+/**
+ * Canonical form of a query for embedding and cache lookup: trimmed, with
+ * whitespace runs collapsed. Queries that differ only in spacing embed to
+ * the same vector, so they should share one LRU entry.
+ */
+function normalizeQuery(text: string): string {
+  return text.trim().replace(/\s+/g, " ");
+}
+
+const vectorTexts = new WeakMap<number[], string>();
+
+/**
+ * pgvector / MySQL VECTOR text form of an embedding ("[a,b,...]"), memoized
+ * per array. Query vectors come back from the LRU as the same shared array
+ * on every repeat search, so each is formatted once rather than per leg
+ * call. Relies on embeddings being treated as read-only (see CACHING).
+ */
+export function vectorText(embedding: number[]): string {
+  let text = vectorTexts.get(embedding);
+  if (text === undefined) {
+    text = `[${embedding.join(",")}]`;
+    vectorTexts.set(embedding, text);
+  }
+  return text;
+}
+
+const vectorBlobs = new WeakMap<number[], Uint8Array>();
+
+/**
+ * sqlite-vec BLOB form of an embedding (little-endian float32 bytes),
+ * memoized per array like vectorText(), so a repeat query's vector is
+ * converted once instead of on every vector leg call.
+ */
+export function vectorBlob(embedding: number[]): Uint8Array {
+  let blob = vectorBlobs.get(embedding);
+  if (blob === undefined) {
+    blob = new Uint8Array(new Float32Array(embedding).buffer);
+    vectorBlobs.set(embedding, blob);
+  }
+  return blob;
+}
+
+/** Cache file format written by saveCacheFile(); version 1 (JSON number arrays) still loads. */
+const CACHE_FILE_VERSION = 2;
+
+/** Embedding → base64 of its float32 bytes (cache file v2 entry). */
+function encodeVector(vector: number[]): string {
+  return Buffer.from(Float32Array.from(vector).buffer).toString("base64");
+}
+
+/** Inverse of encodeVector(); null if the payload isn't whole float32s. */
+function decodeVector(encoded: string): number[] | null {
+  const bytes = Buffer.from(encoded, "base64");
+  if (bytes.byteLength % 4 !== 0) return null;
+  // Copy into a fresh ArrayBuffer: pooled Buffers may not be 4-byte aligned
+  return Array.from(new Float32Array(new Uint8Array(bytes).buffer));
+}
+
+/**
+ * Copy of `vector` scaled to unit L2 norm. Ollama's /api/embed already
+ * returns unit-length vectors; /api/embeddings does not, so its output is
+ * scaled to match and a text embeds to the same vector on either endpoint.
+ * That matters for SQLite, whose vec0 tables rank by L2 distance.
+ */
+function unitLength(vector: number[]): number[] {
+  let norm = 0;
+  for (const x of vector) norm += x * x;
+  norm = Math.sqrt(norm);
+  return norm === 0 ? vector : vector.map((x) => x / norm);
+}
+
+/** True if the provider was never reached (network failure or timeout), not a bad response. */
+function isUnreachableError(err: unknown): boolean {
+  if (err instanceof TypeError) return err.cause !== undefined;
+  return err instanceof Error && (err.name === "TimeoutError" || err.name === "AbortError");
+}
+
 /**
  * Unified embedding client supporting multiple providers
  *
@@ -43,9 +151,32 @@ import { validateEmbeddingDimensions } from "./config.js";
  * - Dimension validation ensures output matches pgvector schema
  *
  * CONCURRENCY:
- * - This client is stateless and safe for concurrent embed() calls
- * - No connection pooling (HTTP requests are one-shot via fetch)
+ * - Safe for concurrent embed() calls
+ * - HTTP connections are pooled and kept alive by fetch's global dispatcher,
+ *   so only the first request to a host pays the TCP (and TLS) handshake
+ * - Ollama requests are retried once if a pooled socket was closed by the
+ *   server while idle (the request never reached Ollama)
  * - Command-based provider spawns a new process per embed() call
+ *
+ * CACHING:
+ * - Query embeddings are kept in an LRU keyed by sha256(provider, model,
+ *   purpose, text), so a repeated search skips the provider round-trip
+ * - Concurrent embed() calls for the same key share one in-flight request
+ * - Document embeddings are not cached (one-off writes would just churn it)
+ * - Cached vectors are shared between callers — treat them as read-only
+ * - saveCacheFile()/loadCacheFile() carry the LRU across restarts so the
+ *   first searches after startup don't all pay a provider round-trip
+ * - stats() reports LRU hit/miss counts for tuning cacheSize
+ *
+ * BATCHING:
+ * - With coalesceWindowMs > 0, embed() calls arriving within that window are
+ *   sent as one embedBatch-style request (up to EMBED_COALESCE_MAX texts),
+ *   so bursts of concurrent searches or writes share a round-trip
+ *
+ * OUTAGES:
+ * - If the provider can't be reached (connection refused, DNS, timeout), calls
+ *   fail immediately for failureCooldownMs instead of each waiting on a dead
+ *   endpoint; the first call after the window probes the provider again
  */
 export class EmbeddingClient {
   private provider: EmbeddingProvider;
@@ -60,6 +191,18 @@ export class EmbeddingClient {
   private command?: string;
   private commandArgs: string[];
   private commandTimeoutMs: number;
+  private cacheSize: number;
+  private cache = new Map<string, number[]>();
+  private inflight = new Map<string, Promise<number[]>>();
+  private cacheHits = 0;
+  private cacheMisses = 0;
+  private failureCooldownMs: number;
+  private unreachableUntil = 0;
+  private shortCircuits = 0;
+  private coalesceWindowMs: number;
+  private pendingBatches = new Map<"query" | "document", PendingBatch>();
+  /** False once the server has answered /api/embed with 404 (pre-0.3 Ollama). */
+  private ollamaBatchEndpoint = true;
 
   constructor(params: {
     provider: EmbeddingProvider;
@@ -74,12 +217,18 @@ export class EmbeddingClient {
     command?: string;
     commandArgs?: string[];
     commandTimeoutMs?: number;
+    /** Query-embedding LRU capacity (default 1024, 0 = disabled) */
+    cacheSize?: number;
+    /** Fail-fast window after the provider was unreachable (default 5000ms, 0 = disabled) */
+    failureCooldownMs?: number;
+    /** Window for coalescing concurrent embed() calls into one batch (default 0 = disabled) */
+    coalesceWindowMs?: number;
   }) {
     this.provider = params.provider;
     this.model = params.model;
     this.dimensions = params.dimensions;
     this.apiKey = params.apiKey || "";
-    this.ollamaUrl = params.ollamaUrl || "http://localhost:11434";
+    this.ollamaUrl = (params.ollamaUrl || "http://localhost:11434").replace(/\/$/, "");
     this.baseUrl = params.baseUrl || "";
     this.headers = params.headers || {};
     this.voyageInputType = params.voyageInputType || "query";
@@ -87,6 +236,9 @@ export class EmbeddingClient {
     this.command = params.command;
     this.commandArgs = params.commandArgs || [];
     this.commandTimeoutMs = params.commandTimeoutMs || 15_000;
+    this.cacheSize = Math.max(0, Math.floor(params.cacheSize ?? EMBED_CACHE_SIZE));
+    this.failureCooldownMs = Math.max(0, params.failureCooldownMs ?? EMBED_FAILURE_COOLDOWN_MS);
+    this.coalesceWindowMs = Math.max(0, params.coalesceWindowMs ?? 0);
   }
 
   /**
@@ -105,11 +257,285 @@ export class EmbeddingClient {
    * SECURITY: Input is truncated to 6000 chars to prevent DoS.
    * This limit is enforced in each provider method.
    *
+   * Query embeddings are served from the LRU when present; misses for the
+   * same key while a request is in flight await that request instead of
+   * issuing another. Failures are never cached, but while the provider is
+   * unreachable calls fail fast (see OUTAGES above).
+   *
    * @param text - Input text to embed
    * @returns Embedding vector (validated to match expected dimensions)
    * @throws Error if provider fails or dimensions don't match
    */
   async embed(text: string, purpose: "query" | "document" = "query"): Promise<number[]> {
+    if (purpose !== "query" || this.cacheSize === 0) {
+      return this.request(text, purpose);
+    }
+
+    text = normalizeQuery(text);
+    const key = this.cacheKey(text, purpose);
+    const hit = this.recall(key);
+    if (hit) return hit;
+
+    const pending = this.inflight.get(key);
+    if (pending) return pending;
+
+    const request = this.request(text, purpose)
+      .then((embedding) => {
+        this.remember(key, embedding);
+        return embedding;
+      })
+      .finally(() => {
+        this.inflight.delete(key);
+      });
+    this.inflight.set(key, request);
+    return request;
+  }
+
+  /**
+   * Embed many texts, using the provider's batch endpoint where it has one.
+   *
+   * ollama (/api/embed), openai/openai-compatible and voyage embed the whole
+   * list in one HTTP request instead of one per text. gemini, command, and
+   * Ollama servers too old for /api/embed fall back to sequential requests.
+   * Query embeddings already in the LRU are served from it; only misses go
+   * to the provider.
+   *
+   * Ollama vectors are unit length on both endpoints (see unitLength), so a
+   * batch-embedded text matches its embed() vector.
+   *
+   * @param texts - Input texts (each truncated to 6000 chars)
+   * @returns One validated embedding per input, in input order
+   * @throws Error if the provider fails or any dimension doesn't match
+   */
+  async embedBatch(texts: string[], purpose: "query" | "document" = "query"): Promise<number[][]> {
+    const useCache = purpose === "query" && this.cacheSize > 0;
+    if (useCache) texts = texts.map(normalizeQuery);
+    const results: number[][] = new Array(texts.length);
+    const missIndices: number[] = [];
+
+    for (let i = 0; i < texts.length; i++) {
+      const hit = useCache ? this.recall(this.cacheKey(texts[i], purpose)) : undefined;
+      if (hit) results[i] = hit;
+      else missIndices.push(i);
+    }
+    if (missIndices.length === 0) return results;
+
+    const fresh = await this.callProvider(() => this.embedManyUncached(missIndices.map((i) => texts[i]), purpose));
+    missIndices.forEach((idx, j) => {
+      results[idx] = fresh[j];
+      if (useCache) this.remember(this.cacheKey(texts[idx], purpose), fresh[j]);
+    });
+    return results;
+  }
+
+  /** Drop all cached query embeddings. */
+  clearCache(): void {
+    this.cache.clear();
+  }
+
+  /**
+   * Query-embedding LRU occupancy and hit/miss counts since construction.
+   * `shortCircuits` counts calls failed fast while the provider was unreachable.
+   */
+  stats(): { size: number; capacity: number; hits: number; misses: number; shortCircuits: number } {
+    return {
+      size: this.cache.size,
+      capacity: this.cacheSize,
+      hits: this.cacheHits,
+      misses: this.cacheMisses,
+      shortCircuits: this.shortCircuits,
+    };
+  }
+
+  /**
+   * Embed queries ahead of time so their first real search is a cache hit.
+   * Failures are swallowed — warmup is best-effort.
+   *
+   * @param texts - Query strings expected to recur (e.g. common searches)
+   * @returns Number of queries now cached
+   */
+  async warmup(texts: string[]): Promise<number> {
+    let warmed = 0;
+    for (const text of texts) {
+      try {
+        await this.embed(text, "query");
+        warmed++;
+      } catch {
+        // Provider down or slow — the real search will retry
+      }
+    }
+    return warmed;
+  }
+
+  /**
+   * Seed the query-embedding LRU from a file written by saveCacheFile().
+   *
+   * The file records provider, model and dimensions; if any differ from this
+   * client the whole file is ignored, so a model change simply starts cold.
+   * Missing or corrupt files are ignored too.
+   *
+   * @param filePath - Cache file path
+   * @returns Number of entries loaded
+   */
+  async loadCacheFile(filePath: string): Promise<number> {
+    if (this.cacheSize === 0) return 0;
+
+    let parsed: {
+      version?: number;
+      provider?: string;
+      model?: string;
+      dimensions?: number;
+      entries?: unknown;
+    };
+    try {
+      parsed = JSON.parse(await readFile(filePath, "utf8"));
+    } catch {
+      return 0;
+    }
+
+    if (
+      (parsed?.version !== 1 && parsed?.version !== CACHE_FILE_VERSION) ||
+      parsed.provider !== this.provider ||
+      parsed.model !== this.model ||
+      parsed.dimensions !== this.dimensions ||
+      !Array.isArray(parsed.entries)
+    ) {
+      return 0;
+    }
+
+    let loaded = 0;
+    // Entries are stored oldest-first; keep only the newest cacheSize
+    for (const entry of parsed.entries.slice(-this.cacheSize)) {
+      if (!Array.isArray(entry) || typeof entry[0] !== "string") continue;
+      const vector = parsed.version === 1
+        ? (Array.isArray(entry[1]) ? entry[1] as number[] : null)
+        : (typeof entry[1] === "string" ? decodeVector(entry[1]) : null);
+      if (!vector || (this.dimensions > 0 && vector.length !== this.dimensions)) continue;
+      this.cache.delete(entry[0]);
+      this.cache.set(entry[0], vector);
+      loaded++;
+    }
+    while (this.cache.size > this.cacheSize) {
+      this.cache.delete(this.cache.keys().next().value as string);
+    }
+    return loaded;
+  }
+
+  /**
+   * Write the query-embedding LRU to disk (atomic: temp file + rename).
+   *
+   * Only sha256 keys are written, never the query text itself. Vectors are
+   * stored as base64 float32 bytes, a fraction of the size of JSON decimals
+   * and faster to load. The file is created owner-readable only.
+   *
+   * @param filePath - Cache file path (parent directories are created)
+   * @returns Number of entries written
+   */
+  async saveCacheFile(filePath: string): Promise<number> {
+    const payload = JSON.stringify({
+      version: CACHE_FILE_VERSION,
+      provider: this.provider,
+      model: this.model,
+      dimensions: this.dimensions,
+      entries: [...this.cache].map(([key, vector]) => [key, encodeVector(vector)]),
+    });
+    await mkdir(dirname(filePath), { recursive: true });
+    const tmpPath = `${filePath}.${process.pid}.tmp`;
+    await writeFile(tmpPath, payload, { mode: 0o600 });
+    await rename(tmpPath, filePath);
+    return this.cache.size;
+  }
+
+  /**
+   * Run a provider call unless a recent one found the provider unreachable.
+   * Starts the cooldown on network failures/timeouts only — an HTTP error
+   * or bad response means the provider is up, so later calls still try.
+   */
+  private async callProvider<T>(call: () => Promise<T>): Promise<T> {
+    if (Date.now() < this.unreachableUntil) {
+      this.shortCircuits++;
+      throw new Error(`Embedding provider ${this.provider} unreachable — skipping until cooldown ends`);
+    }
+    try {
+      const result = await call();
+      this.unreachableUntil = 0;
+      return result;
+    } catch (err) {
+      if (this.failureCooldownMs > 0 && isUnreachableError(err)) {
+        this.unreachableUntil = Date.now() + this.failureCooldownMs;
+      }
+      throw err;
+    }
+  }
+
+  /** One uncached embed, coalesced with concurrent ones when enabled. */
+  private request(text: string, purpose: "query" | "document"): Promise<number[]> {
+    if (this.coalesceWindowMs === 0) {
+      return this.callProvider(() => this.embedUncached(text, purpose));
+    }
+    let batch = this.pendingBatches.get(purpose);
+    if (!batch) {
+      batch = { texts: [], waiters: [], timer: setTimeout(() => this.flushBatch(purpose), this.coalesceWindowMs) };
+      this.pendingBatches.set(purpose, batch);
+    }
+    const queued = batch;
+    return new Promise<number[]>((resolve, reject) => {
+      queued.texts.push(text);
+      queued.waiters.push({ resolve, reject });
+      if (queued.texts.length >= EMBED_COALESCE_MAX) this.flushBatch(purpose);
+    });
+  }
+
+  /** Send the pending batch for `purpose` and settle each caller with its slice. */
+  private flushBatch(purpose: "query" | "document"): void {
+    const batch = this.pendingBatches.get(purpose);
+    if (!batch) return;
+    this.pendingBatches.delete(purpose);
+    clearTimeout(batch.timer);
+
+    // A lone text keeps the single-text endpoint for each provider. Both
+    // endpoints give the same vector (see unitLength), so a query ranks the
+    // same whether or not it was coalesced.
+    const request = batch.texts.length === 1
+      ? this.callProvider(() => this.embedUncached(batch.texts[0], purpose)).then((embedding) => [embedding])
+      : this.callProvider(() => this.embedManyUncached(batch.texts, purpose));
+    request.then(
+      (embeddings) => batch.waiters.forEach((waiter, i) => waiter.resolve(embeddings[i])),
+      (err) => batch.waiters.forEach((waiter) => waiter.reject(err)),
+    );
+  }
+
+  /** LRU lookup; a hit becomes most-recently used. */
+  private recall(key: string): number[] | undefined {
+    const hit = this.cache.get(key);
+    if (hit) {
+      // Refresh recency: Map iteration order is insertion order
+      this.cache.delete(key);
+      this.cache.set(key, hit);
+      this.cacheHits++;
+    } else {
+      this.cacheMisses++;
+    }
+    return hit;
+  }
+
+  /** LRU insert, evicting the least-recently used entries over capacity. */
+  private remember(key: string, embedding: number[]): void {
+    this.cache.set(key, embedding);
+    while (this.cache.size > this.cacheSize) {
+      this.cache.delete(this.cache.keys().next().value as string);
+    }
+  }
+
+  /** LRU key: provider, model and purpose all change the vector for a text. */
+  private cacheKey(text: string, purpose: "query" | "document"): string {
+    return createHash("sha256")
+      .update(`${this.provider}\0${this.model}\0${purpose}\0${text}`)
+      .digest("hex");
+  }
+
+  /** Provider dispatch + dimension validation, bypassing the cache. */
+  private async embedUncached(text: string, purpose: "query" | "document"): Promise<number[]> {
     let embedding: number[];
     const taskPrefix = this.resolveTaskPrefix(purpose);
 
@@ -143,6 +569,43 @@ export class EmbeddingClient {
     );
   }
 
+  /**
+   * Batch dispatch + dimension validation, bypassing the cache.
+   * Providers without a batch endpoint get one request per text.
+   */
+  private async embedManyUncached(texts: string[], purpose: "query" | "document"): Promise<number[][]> {
+    const taskPrefix = this.resolveTaskPrefix(purpose);
+    let embeddings: number[][] | null = null;
+
+    switch (this.provider) {
+      case "ollama":
+        embeddings = await this.embedOllamaBatch(texts, taskPrefix);
+        break;
+      case "openai":
+      case "openai-compatible":
+        embeddings = await this.embedOpenAICompatibleBatch(texts, taskPrefix);
+        break;
+      case "voyage":
+        embeddings = await this.embedVoyageBatch(texts);
+        break;
+    }
+
+    if (!embeddings) {
+      const sequential: number[][] = [];
+      for (const text of texts) {
+        sequential.push(await this.embedUncached(text, purpose));
+      }
+      return sequential;
+    }
+
+    if (embeddings.length !== texts.length) {
+      throw new Error(`${this.provider} batch returned ${embeddings.length} embeddings for ${texts.length} inputs`);
+    }
+    return embeddings.map((embedding) =>
+      validateEmbeddingDimensions(embedding, this.dimensions, `${this.provider}:${this.model}`),
+    );
+  }
+
   /**
    * Ollama provider implementation
    *
@@ -179,11 +642,7 @@ export class EmbeddingClient {
     // "search_document: " for documents. Other models ignore unknown prefixes.
     const prompt = taskPrefix ? `${taskPrefix}${truncated}` : truncated;
     
-    const response = await fetch(`${this.ollamaUrl.replace(/\/$/, "")}/api/embeddings`, {
-      method: "POST",
-      headers: { "Content-Type": "application/json", ...this.headers },
-      body: JSON.stringify({ model: this.model, prompt }),
-    });
+    const response = await this.postOllama("/api/embeddings", { model: this.model, prompt });
     
     if (!response.ok) {
       throw new Error(`Ollama embedding failed: ${response.status} ${response.statusText}`);
@@ -195,7 +654,65 @@ export class EmbeddingClient {
       throw new Error("Ollama embedding response missing `embedding` array");
     }
     
-    return data.embedding;
+    // Match /api/embed, which normalizes
+    return unitLength(data.embedding);
+  }
+
+  /**
+   * Ollama batch implementation
+   *
+   * API: POST /api/embed with JSON {model, input: [...]} → {embeddings: [...]}
+   * (Ollama 0.3+). Returns null on 404 so callers fall back to /api/embeddings;
+   * the 404 is remembered, so later batches skip the probe round trip.
+   */
+  private async embedOllamaBatch(texts: string[], taskPrefix?: string): Promise<number[][] | null> {
+    if (!this.ollamaBatchEndpoint) return null;
+
+    // SECURITY: Truncate each input to prevent DoS via large text
+    const input = texts.map((text) => {
+      const truncated = text.slice(0, 6000);
+      return taskPrefix ? `${taskPrefix}${truncated}` : truncated;
+    });
+
+    const response = await this.postOllama("/api/embed", { model: this.model, input });
+
+    // Older Ollama without the batch endpoint
+    if (response.status === 404) {
+      this.ollamaBatchEndpoint = false;
+      return null;
+    }
+
+    if (!response.ok) {
+      throw new Error(`Ollama batch embedding failed: ${response.status} ${response.statusText}`);
+    }
+
+    const data = (await response.json()) as { embeddings?: number[][] };
+
+    if (!Array.isArray(data.embeddings)) {
+      throw new Error("Ollama batch embedding response missing `embeddings` array");
+    }
+
+    return data.embeddings;
+  }
+
+  /**
+   * POST JSON to the Ollama server over fetch's keep-alive pool.
+   *
+   * Ollama closes idle connections on its own schedule; if the pooled socket
+   * turns out to be dead, the request is sent once more on a fresh one.
+   */
+  private async postOllama(path: string, body: Record<string, unknown>): Promise<Response> {
+    const init = {
+      method: "POST",
+      headers: { "Content-Type": "application/json", ...this.headers },
+      body: JSON.stringify(body),
+    };
+    try {
+      return await fetch(`${this.ollamaUrl}${path}`, init);
+    } catch (err) {
+      if (!isStaleSocketError(err)) throw err;
+      return fetch(`${this.ollamaUrl}${path}`, init);
+    }
   }
 
   /**
@@ -273,6 +790,62 @@ export class EmbeddingClient {
     return embedding;
   }
 
+  /**
+   * OpenAI-compatible batch implementation
+   *
+   * Same endpoint as embedOpenAICompatible() with `input` as an array.
+   * Results are ordered by their `index` field, not response order.
+   */
+  private async embedOpenAICompatibleBatch(texts: string[], taskPrefix?: string): Promise<number[][]> {
+    if (!this.apiKey) {
+      throw new Error(`API key missing for embedding provider ${this.provider}`);
+    }
+
+    // SECURITY: Truncate each input to prevent DoS
+    const input = texts.map((text) => (taskPrefix ? `${taskPrefix}${text}` : text).slice(0, 6000));
+
+    const body: Record<string, unknown> = { model: this.model, input };
+    if (this.dimensions > 0) {
+      body.dimensions = this.dimensions;
+    }
+
+    const base = this.baseUrl.replace(/\/$/, "");
+    const embeddingsUrl = base.endsWith("/v1")
+      ? `${base}/embeddings`
+      : `${base}/v1/embeddings`;
+
+    const response = await fetch(embeddingsUrl, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        // SECURITY: API key in Authorization header, never logged
+        Authorization: `Bearer ${this.apiKey}`,
+        ...this.headers,
+      },
+      body: JSON.stringify(body),
+    });
+
+    if (!response.ok) {
+      const errText = await response.text().catch(() => "");
+      throw new Error(
+        `${this.provider} batch embedding failed: ${response.status} ${response.statusText}${errText ? ` — ${errText.slice(0, 300)}` : ""}`,
+      );
+    }
+
+    const data = (await response.json()) as {
+      data?: Array<{ index?: number; embedding?: number[] }>;
+    };
+
+    const items = [...(data?.data ?? [])].sort((a, b) => (a.index ?? 0) - (b.index ?? 0));
+    const embeddings = items.map((item) => item.embedding);
+
+    if (embeddings.some((embedding) => !Array.isArray(embedding))) {
+      throw new Error(`${this.provider} batch response missing data[].embedding`);
+    }
+
+    return embeddings as number[][];
+  }
+
   /**
    * Voyage AI provider implementation
    *
@@ -286,13 +859,24 @@ export class EmbeddingClient {
    * @throws Error if API key missing, HTTP fails, or response invalid
    */
   private async embedVoyage(text: string): Promise<number[]> {
+    const [embedding] = await this.embedVoyageBatch([text]);
+    return embedding;
+  }
+
+  /**
+   * Voyage batch implementation — the API takes an array of inputs natively.
+   *
+   * @param texts - Input texts (each truncated to 6000 chars)
+   * @returns Embedding vectors in input order
+   */
+  private async embedVoyageBatch(texts: string[]): Promise<number[][]> {
     // SECURITY: API key validation
     if (!this.apiKey) {
       throw new Error("VOYAGE_API_KEY (or embedding.apiKey) is required for provider=voyage");
     }
     
     // SECURITY: Truncate input
-    const truncated = text.slice(0, 6000);
+    const input = texts.map((text) => text.slice(0, 6000));
     
     const response = await fetch(`${this.baseUrl.replace(/\/$/, "")}/v1/embeddings`, {
       method: "POST",
@@ -304,7 +888,7 @@ export class EmbeddingClient {
       },
       body: JSON.stringify({
         model: this.model,
-        input: [truncated], // Voyage expects array of strings
+        input, // Voyage expects array of strings
         input_type: this.voyageInputType,
       }),
     });
@@ -321,14 +905,14 @@ export class EmbeddingClient {
       embeddings?: number[][];
     };
     
-    // Voyage may return either data[0].embedding or embeddings[0]
-    const embedding = data?.data?.[0]?.embedding || data?.embeddings?.[0];
+    // Voyage may return either data[i].embedding or embeddings[i]
+    const embeddings = texts.map((_, i) => data?.data?.[i]?.embedding || data?.embeddings?.[i]);
     
-    if (!Array.isArray(embedding)) {
+    if (embeddings.some((embedding) => !Array.isArray(embedding))) {
       throw new Error("Voyage response missing embedding vector");
     }
     
-    return embedding;
+    return embeddings as number[][];
   }
 
   /**
@@ -4,6 +4,7 @@
 
 import test from 'node:test';
 import assert from 'node:assert/strict';
+import { createHash } from 'node:crypto';
 import { __test__ } from './dist/index.js';
 
 const { computeEmbeddingFingerprint } = __test__;
@@ -43,3 +44,11 @@ test('computeEmbeddingFingerprint uses task-prefix for nomic models', () => {
   const other = computeEmbeddingFingerprint({ provider: 'ollama', model: 'mxbai-embed-large', dimensions: 768 });
   assert.notEqual(nomic, other);
 });
+
+test('computeEmbeddingFingerprint changes for ollama once vectors are unit-normalized', () => {
+  // Stores embedded before normalization hold this fingerprint and must re-embed
+  const raw = createHash('sha256').update('ollama:nomic-embed-text:768:task-prefix').digest('hex').slice(0, 16);
+  assert.notEqual(computeEmbeddingFingerprint({ provider: 'ollama', model: 'nomic-embed-text', dimensions: 768 }), raw);
+  const openai = createHash('sha256').update('openai:text-embedding-3-small:1536:none').digest('hex').slice(0, 16);
+  assert.equal(computeEmbeddingFingerprint({ provider: 'openai', model: 'text-embedding-3-small', dimensions: 1536 }), openai);
+});
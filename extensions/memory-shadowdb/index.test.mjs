@@ -6,6 +6,8 @@ const {
   normalizeEmbeddingProvider,
   resolveEmbeddingConfig,
   resolvePrimerConfig,
+  resolveSearchConfig,
+  resolveVectorIndexConfig,
   validateEmbeddingDimensions,
 } = __test__;
 
@@ -143,3 +145,59 @@ test('resolvePrimerConfig defaults and normalization', () => {
   assert.equal(bad.maxChars, 4000);
   assert.equal(bad.cacheTtlMs, 600000);
 });
+
+test('resolvePrimerConfig primer row cache TTL', () => {
+  assert.equal(resolvePrimerConfig({}).rowsTtlMs, 60000);
+  assert.equal(resolvePrimerConfig({ primer: { rowsTtlMs: 0 } }).rowsTtlMs, 0);
+  assert.equal(resolvePrimerConfig({ primer: { rowsTtlMs: 1500.7 } }).rowsTtlMs, 1500);
+  assert.equal(resolvePrimerConfig({ primer: { rowsTtlMs: -1 } }).rowsTtlMs, 60000);
+});
+
+test('resolveSearchConfig result cache defaults and validation', () => {
+  const defaults = resolveSearchConfig({});
+  assert.equal(defaults.cacheTtlMs, 60000);
+  assert.equal(defaults.cacheSize, 256);
+
+  const custom = resolveSearchConfig({ search: { cacheTtlMs: 0, cacheSize: 32.9 } });
+  assert.equal(custom.cacheTtlMs, 0);
+  assert.equal(custom.cacheSize, 32);
+
+  const bad = resolveSearchConfig({ search: { cacheTtlMs: -5, cacheSize: Number.NaN } });
+  assert.equal(bad.cacheTtlMs, 60000);
+  assert.equal(bad.cacheSize, 256);
+});
+
+test('resolveSearchConfig semantic cache threshold', () => {
+  assert.equal(resolveSearchConfig({}).semanticCacheThreshold, 0);
+  assert.equal(resolveSearchConfig({ search: { semanticCacheThreshold: 0.97 } }).semanticCacheThreshold, 0.97);
+  assert.equal(resolveSearchConfig({ search: { semanticCacheThreshold: 1.5 } }).semanticCacheThreshold, 0);
+  assert.equal(resolveSearchConfig({ search: { semanticCacheThreshold: -0.1 } }).semanticCacheThreshold, 0);
+});
+
+test('resolveSearchConfig FTS dominance score', () => {
+  assert.equal(resolveSearchConfig({}).ftsDominanceScore, 0);
+  assert.equal(resolveSearchConfig({ search: { ftsDominanceScore: 0.4 } }).ftsDominanceScore, 0.4);
+  assert.equal(resolveSearchConfig({ search: { ftsDominanceScore: -1 } }).ftsDominanceScore, 0);
+});
+
+test('resolveVectorIndexConfig halfvec is opt-in', () => {
+  assert.equal(resolveVectorIndexConfig({}).halfvec, false);
+  assert.equal(resolveVectorIndexConfig({ vectorIndex: { halfvec: true } }).halfvec, true);
+  assert.equal(resolveVectorIndexConfig({ vectorIndex: { halfvec: 'yes' } }).halfvec, false);
+});
+
+test('resolveVectorIndexConfig binaryCandidates', () => {
+  assert.equal(resolveVectorIndexConfig({}).binaryCandidates, 0);
+  assert.equal(resolveVectorIndexConfig({ vectorIndex: { binaryCandidates: 200.5 } }).binaryCandidates, 200);
+  assert.equal(resolveVectorIndexConfig({ vectorIndex: { binaryCandidates: -3 } }).binaryCandidates, 0);
+});
+
+test('resolveVectorIndexConfig int8Vectors is opt-in', () => {
+  assert.equal(resolveVectorIndexConfig({}).int8Vectors, false);
+  assert.equal(resolveVectorIndexConfig({ vectorIndex: { int8Vectors: true } }).int8Vectors, true);
+});
+
+test('resolveVectorIndexConfig hnsw is opt-in', () => {
+  assert.equal(resolveVectorIndexConfig({}).hnsw, false);
+  assert.equal(resolveVectorIndexConfig({ vectorIndex: { hnsw: true } }).hnsw, true);
+});
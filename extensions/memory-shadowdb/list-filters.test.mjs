@@ -70,6 +70,14 @@ test('buildSortClause generates metadata CASE expression', () => {
   assert.ok(clause.includes('NULLS LAST'));
 });
 
+test('buildSortClause reuses metadata clauses and still rejects bad fields', () => {
+  assert.equal(buildSortClause('metadata.tier', 'asc'), buildSortClause('metadata.tier', 'asc'));
+  assert.ok(buildSortClause('metadata.tier', 'desc').includes('DESC NULLS LAST'));
+  for (let i = 0; i < 2; i++) {
+    assert.throws(() => buildSortClause("metadata.x'; DROP", 'asc'), /Invalid metadata sort field/);
+  }
+});
+
 test('buildSortClause throws for invalid metadata field name', () => {
   assert.throws(() => buildSortClause('metadata.bad;drop', 'asc'), /invalid metadata sort field/i);
   assert.throws(() => buildSortClause('metadata.has space', 'asc'), /invalid metadata sort field/i);
@@ -73,6 +73,14 @@ export function buildListConditions(
 /** Allowed plain-column sort fields (whitelist against SQL injection). */
 const ALLOWED_SORTS = ["created_at", "updated_at", "priority", "title"];
 
+/**
+ * Metadata ORDER BY clauses already built, keyed by field and direction.
+ * Listing pages re-sort by the same field over and over; the field name is
+ * tool input, so the cache is capped and drops its oldest entry when full.
+ */
+const metadataSortClauses = new Map<string, string>();
+const MAX_METADATA_SORT_CLAUSES = 256;
+
 /**
  * Build ORDER BY clause for memory_list queries.
  *
@@ -90,13 +98,21 @@ export function buildSortClause(sort?: string, sort_order?: "asc" | "desc"): str
 
   if (sort && sort.startsWith("metadata.")) {
     const fieldName = sort.slice("metadata.".length);
+    const key = `${fieldName} ${sortDir}`;
+    const cached = metadataSortClauses.get(key);
+    if (cached !== undefined) return cached; // only validated fields are stored
     if (!/^[a-zA-Z_][a-zA-Z0-9_]*$/.test(fieldName)) {
       throw new Error(`Invalid metadata sort field: ${fieldName}`);
     }
-    return `ORDER BY
+    const clause = `ORDER BY
         CASE WHEN metadata->>'${fieldName}' ~ '^-?[0-9]+(\\.[0-9]+)?$'
              THEN (metadata->>'${fieldName}')::numeric ELSE NULL END ${sortDir} NULLS LAST,
         metadata->>'${fieldName}' ${sortDir} NULLS LAST`;
+    if (metadataSortClauses.size >= MAX_METADATA_SORT_CLAUSES) {
+      metadataSortClauses.delete(metadataSortClauses.keys().next().value!);
+    }
+    metadataSortClauses.set(key, clause);
+    return clause;
   }
 
   const sortCol = ALLOWED_SORTS.includes(sort as string) ? sort! : "created_at";
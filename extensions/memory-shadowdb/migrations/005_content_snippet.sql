@@ -0,0 +1,14 @@
+-- Migration 005: content_snippet generated column
+-- Search results only show the first few hundred characters of content.
+-- Slicing `content` at read time makes Postgres detoast the whole value
+-- (large content is stored out of line in TOAST) for every candidate row.
+-- A stored prefix is computed once at write time and small enough to stay
+-- inline in the heap tuple, so result projections never touch TOAST.
+--
+-- Note: adding a STORED generated column rewrites the table; run it in a
+-- maintenance window on large databases.
+--
+-- UP
+
+ALTER TABLE memories ADD COLUMN IF NOT EXISTS content_snippet TEXT
+  GENERATED ALWAYS AS (left(content, 800)) STORED;
@@ -0,0 +1,15 @@
+-- Migration 006: half-precision HNSW index on embedding
+-- HNSW probes are memory-bandwidth bound. Indexing embedding::halfvec stores
+-- 2 bytes per dimension instead of 4, halving the graph pgvector walks per
+-- query for well under 1% recall loss on cosine search.
+--
+-- Only the index is quantized: the full-precision `embedding` column is kept
+-- for writes, scoring and reembed. Requires pgvector >= 0.7.0.
+-- Queries use it when plugin config sets vectorIndex.halfvec: true;
+-- after switching, memories_embedding_hnsw_idx can be dropped.
+--
+-- UP
+
+CREATE INDEX IF NOT EXISTS memories_embedding_halfvec_hnsw_idx
+  ON memories USING hnsw ((embedding::halfvec(768)) halfvec_cosine_ops)
+  WHERE embedding IS NOT NULL;
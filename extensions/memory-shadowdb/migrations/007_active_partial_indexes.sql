@@ -0,0 +1,22 @@
+-- Migration 007: restrict FTS and HNSW indexes to live rows
+-- Every search leg filters deleted_at IS NULL, but the original indexes also
+-- cover soft-deleted rows. The FTS bitmap then carries trash rows that are
+-- dropped after the heap fetch. HNSW is worse: deleted neighbours take up
+-- ef_search candidate slots and are discarded after the probe, so a trash-heavy
+-- table returns fewer live hits. Partial indexes on the live set are smaller
+-- and prune trash before the probe.
+--
+-- These replace memories_fts_idx and memories_embedding_hnsw_idx.
+--
+-- UP
+
+CREATE INDEX IF NOT EXISTS memories_fts_active_idx
+  ON memories USING GIN (fts)
+  WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS memories_embedding_active_hnsw_idx
+  ON memories USING hnsw (embedding vector_cosine_ops)
+  WHERE embedding IS NOT NULL AND deleted_at IS NULL;
+
+DROP INDEX IF EXISTS memories_fts_idx;
+DROP INDEX IF EXISTS memories_embedding_hnsw_idx;
@@ -0,0 +1,8 @@
+-- Migration 008: index matching the primer read order
+-- getPrimerRows() reads the whole primer table ordered by (priority, key)
+-- on every primer-cache refresh. An index in that order lets Postgres return
+-- rows already sorted instead of sorting them each time.
+--
+-- UP
+
+CREATE INDEX IF NOT EXISTS primer_priority_key_idx ON primer (priority, key);
@@ -0,0 +1,56 @@
+-- Migration 009: semantic query cache for scripts/hybrid-search.py
+-- Paraphrased queries ("Watson's army service" / "Watson military service")
+-- embed within a small cosine distance of each other. hybrid-search.py looks
+-- up the nearest recent query embedding here before running its legs and, on
+-- a close enough match with the same options, returns the stored results.
+--
+-- Entries are only trusted for a short TTL (enforced by the script, which
+-- also deletes expired rows). args also carries memories_generation.gen,
+-- a counter bumped once per INSERT/UPDATE/DELETE/TRUNCATE statement on
+-- memories and read by primary key, so any write to memories invalidates
+-- every entry stored before it without scanning memories on each search.
+--
+-- UP
+
+CREATE TABLE IF NOT EXISTS query_cache (
+  id BIGSERIAL PRIMARY KEY,
+  qemb vector(768) NOT NULL,
+  args TEXT NOT NULL,
+  results JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS query_cache_qemb_hnsw_idx
+  ON query_cache USING hnsw (qemb vector_cosine_ops);
+
+-- An HNSW scan post-filters on args, so entries from other generations or
+-- options can crowd a real match out of its candidates. The lookup instead
+-- fetches the matching rows through this index and ranks just those.
+CREATE INDEX IF NOT EXISTS query_cache_args_created_idx
+  ON query_cache (args, created_at);
+
+CREATE TABLE IF NOT EXISTS memories_generation (
+  id INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  gen BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO memories_generation (id) VALUES (1) ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION shadowdb_bump_memories_generation()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE memories_generation SET gen = gen + 1 WHERE id = 1;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS memories_bump_generation ON memories;
+CREATE TRIGGER memories_bump_generation
+AFTER INSERT OR UPDATE OR DELETE ON memories
+FOR EACH STATEMENT
+EXECUTE FUNCTION shadowdb_bump_memories_generation();
+
+DROP TRIGGER IF EXISTS memories_bump_generation_truncate ON memories;
+CREATE TRIGGER memories_bump_generation_truncate
+AFTER TRUNCATE ON memories
+FOR EACH STATEMENT
+EXECUTE FUNCTION shadowdb_bump_memories_generation();
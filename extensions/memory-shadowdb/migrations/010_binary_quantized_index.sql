@@ -0,0 +1,15 @@
+-- Migration 010: binary-quantized HNSW index for two-stage vector search
+-- binary_quantize() keeps one bit per dimension (96 bytes for 768 dims vs
+-- 3 KB of float32), so a Hamming-distance HNSW walk touches a fraction of
+-- the memory. Its ranking is coarse: with vectorIndex.binaryCandidates = N in
+-- plugin config, search pulls N candidates from this index, then re-ranks them
+-- by full-precision cosine on `embedding`, recovering the recall the
+-- quantization loses.
+--
+-- Requires pgvector >= 0.7.0.
+--
+-- UP
+
+CREATE INDEX IF NOT EXISTS memories_embedding_bit_hnsw_idx
+  ON memories USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops)
+  WHERE embedding IS NOT NULL AND deleted_at IS NULL;
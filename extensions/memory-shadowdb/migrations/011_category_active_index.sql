@@ -0,0 +1,24 @@
+-- Migration 011: live-row category index; halfvec HNSW restricted to live rows
+-- category is free text chosen by the agent (write() accepts any value), so it
+-- stays TEXT rather than becoming an ENUM or lookup table: every new category
+-- would otherwise need DDL. It is always bound as a parameter, never spliced.
+-- What a category filter does need is an index over the rows it can match:
+-- every read filters deleted_at IS NULL, and the category listing orders by
+-- id DESC LIMIT 20, so (category, id DESC) on live rows answers both from the
+-- index without touching trash.
+--
+-- The halfvec index from 006 predates 007 and still covers soft-deleted
+-- rows, which take ef_search slots and are discarded after the probe. It is
+-- rebuilt with the same live-row predicate as the other vector indexes.
+--
+-- UP
+
+CREATE INDEX IF NOT EXISTS memories_category_active_idx
+  ON memories (category, id DESC)
+  WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS memories_embedding_halfvec_active_hnsw_idx
+  ON memories USING hnsw ((embedding::halfvec(768)) halfvec_cosine_ops)
+  WHERE embedding IS NOT NULL AND deleted_at IS NULL;
+
+DROP INDEX IF EXISTS memories_embedding_halfvec_hnsw_idx;
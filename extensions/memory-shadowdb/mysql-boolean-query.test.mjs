@@ -0,0 +1,19 @@
+/**
+ * mysql-boolean-query.test.mjs — toBooleanPrefixQuery (MySQL text-search fallback)
+ */
+
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { toBooleanPrefixQuery } from './dist/mysql.js';
+
+test('every term becomes a required prefix', () => {
+  assert.equal(toBooleanPrefixQuery('deploy pipeline'), '+deploy* +pipeline*');
+});
+
+test('boolean operators in user text are stripped', () => {
+  assert.equal(toBooleanPrefixQuery('-foo +bar "baz" (qux)~ a*b @3'), '+foo* +bar* +baz* +qux* +a* +b* +3*');
+});
+
+test('operator-only input yields an empty query', () => {
+  assert.equal(toBooleanPrefixQuery('  +-*"  '), '');
+});
@@ -0,0 +1,59 @@
+/**
+ * mysql-optimize.test.mjs — MySQLStore.optimize() (ANALYZE + token-size check)
+ *
+ * The pool is stubbed below query(), so statements take the same
+ * pool.execute() (prepared protocol) path they do against a real server.
+ */
+
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { MySQLStore } from './dist/mysql.js';
+
+function makeStore(minTokenSize) {
+  const warnings = [];
+  const store = new MySQLStore({
+    connectionString: 'mysql://unused',
+    embedder: {},
+    config: { table: 'memories' },
+    logger: { info: () => {}, warn: (msg) => warnings.push(msg) },
+  });
+  store.sql = [];
+  store.pool = {
+    execute: async (sql) => {
+      store.sql.push(sql.trim());
+      // Like MySQL: SHOW statements can't go through the prepared protocol
+      if (/^\s*SHOW\b/i.test(sql)) {
+        throw Object.assign(new Error('This command is not supported in the prepared statement protocol yet'), { code: 'ER_UNSUPPORTED_PS' });
+      }
+      if (sql.startsWith('ANALYZE')) return [[{ Msg_type: 'status', Msg_text: 'OK' }]];
+      if (sql.includes('@@innodb_ft_min_token_size')) return [[{ min_token_size: minTokenSize }]];
+      return [[]];
+    },
+  };
+  return { store, warnings };
+}
+
+test('optimize analyzes the table and counts short-term searches', async () => {
+  const { store, warnings } = makeStore(3);
+  await store.textSearch('go to deploy', 5);
+  await store.textSearch('deploy pipeline', 5);
+  const result = await store.optimize();
+  assert.ok(store.sql.includes('ANALYZE TABLE memories'));
+  assert.deepEqual(result, { minTokenSize: 3, textQueries: 2, shortTermQueries: 1 });
+  assert.equal(warnings.length, 1);
+});
+
+test('optimize resets its counters', async () => {
+  const { store, warnings } = makeStore(3);
+  await store.textSearch('go', 5);
+  await store.optimize();
+  assert.deepEqual(await store.optimize(), { minTokenSize: 3, textQueries: 0, shortTermQueries: 0 });
+  assert.equal(warnings.length, 1);
+});
+
+test('optimize counts short terms against a large innodb_ft_min_token_size', async () => {
+  const { store } = makeStore(10);
+  await store.textSearch('deployment pipeline', 5);
+  await store.textSearch('internationalization', 5);
+  assert.deepEqual(await store.optimize(), { minTokenSize: 10, textQueries: 2, shortTermQueries: 1 });
+});
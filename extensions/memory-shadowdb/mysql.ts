@@ -15,9 +15,15 @@
  * - Server variable ngram_token_size=3 recommended (default is 2)
  * - FULLTEXT index on (title, content) for text search
  * - FULLTEXT index WITH PARSER ngram on (title, content) for fuzzy search
+ * - MATCH() column lists must equal an index's column list exactly, so the
+ *   legs always score (title, content); there is no smaller summary column
+ *   to narrow to, and a new index would break MATCH on existing tables
+ * - Terms shorter than innodb_ft_min_token_size (default 3) are not indexed;
+ *   optimize() reports how often searches hit that limit
  *
  * SECURITY:
- * - All queries use parameterized SQL (? placeholders)
+ * - All queries use parameterized SQL (? placeholders), prepared once per
+ *   pooled connection via pool.execute()
  * - Table name comes from config only (not user input)
  * - Connection pool capped at 3 to prevent resource exhaustion
  * - Connection string may contain credentials — never logged
@@ -27,14 +33,125 @@
  * - VECTOR type stores embeddings natively (no extension needed in 9.2+)
  * - LAST_INSERT_ID() instead of RETURNING (MySQL doesn't support RETURNING)
  * - deleted_at uses DATETIME type (MySQL's TIMESTAMP has 2038 limitation)
+ * - Search legs skip `content`; only the merged top hits fetch it
  */
 
 import { MemoryStore, type RankedHit, type PrimerRow, type StoreConfig, type StoreLogger } from "./store.js";
-import type { EmbeddingClient } from "./embedder.js";
+import { vectorText, type EmbeddingClient } from "./embedder.js";
 
 // mysql2 types
 type Pool = any;
 
+/**
+ * Map a search-leg row to a RankedHit. Legs select ids + metadata only;
+ * content is hydrated for the merged hits by fetchContentByIds().
+ */
+function toRankedHit(r: any, idx: number): RankedHit {
+  return {
+    id: r.id,
+    content: "",
+    category: r.category,
+    title: r.title,
+    record_type: r.record_type,
+    created_at: r.created_at,
+    rank: idx + 1,
+    // MATCH/DISTANCE scores arrive as JS numbers already; parseFloat() would
+    // round-trip each one through a string. Coerce only if a string shows up.
+    rawScore: typeof r.score === "number" ? r.score : Number(r.score),
+  };
+}
+
+/**
+ * Turn free text into a boolean-mode FULLTEXT query requiring every term as
+ * a prefix: `foo bar-baz` → `+foo* +bar* +baz*`. Boolean operators in the
+ * input are stripped so user text can't change the query's meaning or make
+ * it a syntax error. Returns "" when no usable terms remain.
+ */
+export function toBooleanPrefixQuery(query: string): string {
+  return query
+    .split(/[\s+\-<>()~*"@]+/)
+    .filter((term) => term.length > 0)
+    .map((term) => `+${term}*`)
+    .join(" ");
+}
+
+/**
+ * Search-leg SQL for one table. The legs run on every search, so the text is
+ * built once per store instead of per call; the identical strings also keep
+ * hitting mysql2's per-connection prepared-statement cache.
+ */
+function buildSearchSql(table: string) {
+  return {
+    // ORDER BY the score alias so the (multi-KB) vector literal is bound once.
+    vector: `
+      SELECT id, category, title, record_type, created_at,
+             1 - DISTANCE(embedding, STRING_TO_VECTOR(?), 'COSINE') AS score
+      FROM ${table}
+      WHERE embedding IS NOT NULL AND deleted_at IS NULL
+      ORDER BY score DESC
+      LIMIT ?
+    `,
+    text: `
+      SELECT id, category, title, record_type, created_at,
+             MATCH(title, content) AGAINST(? IN NATURAL LANGUAGE MODE) AS score
+      FROM ${table}
+      WHERE MATCH(title, content) AGAINST(? IN NATURAL LANGUAGE MODE)
+        AND deleted_at IS NULL
+      ORDER BY score DESC
+      LIMIT ?
+    `,
+    textFallback: `
+      SELECT id, category, title, record_type, created_at,
+             MATCH(title, content) AGAINST(? IN BOOLEAN MODE) AS score
+      FROM ${table} FORCE INDEX(idx_ft_content)
+      WHERE MATCH(title, content) AGAINST(? IN BOOLEAN MODE)
+        AND deleted_at IS NULL
+      ORDER BY score DESC
+      LIMIT ?
+    `,
+    fuzzy: `
+      SELECT id, category, title, record_type, created_at,
+             MATCH(title, content) AGAINST(? IN BOOLEAN MODE) AS score
+      FROM ${table} FORCE INDEX(idx_ft_ngram)
+      WHERE MATCH(title, content) AGAINST(? IN BOOLEAN MODE)
+        AND deleted_at IS NULL
+      ORDER BY score DESC
+      LIMIT ?
+    `,
+  };
+}
+
+/**
+ * Pools shared by every MySQLStore in the process, keyed by connection
+ * URI: mysql2 parses a URI once, when its pool is created, and stores on
+ * the same database reuse its warm connections. A pool ends when the last
+ * store using it closes.
+ */
+const sharedPools = new Map<string, { pool: Promise<Pool>; refs: number }>();
+
+/**
+ * Connections are returned to the pool after each execute() rather than
+ * closed, so only the first query pays TCP + auth. Keep-alive plus a
+ * bounded idle timeout keeps warm connections from being silently dropped
+ * by the server's wait_timeout between agent turns.
+ */
+async function createPool(uri: string): Promise<Pool> {
+  // eslint-disable-next-line @typescript-eslint/ban-ts-comment
+  // @ts-ignore — mysql2 is an optional peer dependency; not installed in all environments
+  const mysql = await import("mysql2/promise");
+  return mysql.createPool({
+    uri,
+    connectionLimit: 3,
+    maxIdle: 3,
+    idleTimeout: 60_000,
+    waitForConnections: true,
+    connectTimeout: 5_000,
+    maxPreparedStatements: 64,
+    enableKeepAlive: true,
+    keepAliveInitialDelay: 10_000,
+  });
+}
+
 /**
  * MySQL-backed memory store.
  *
@@ -43,8 +160,17 @@ type Pool = any;
  */
 export class MySQLStore extends MemoryStore {
   private pool: Pool = null;
+  private poolInit: Promise<Pool> | null = null;
+  /** Whether this store holds one of its shared pool's refs (taken in getPool, released by close). */
+  private holdsRef = false;
   private connectionString: string;
   private hasVector: boolean = false;
+  private searchSql: ReturnType<typeof buildSearchSql>;
+  /**
+   * Text searches since the last optimize(), counted by their shortest
+   * term's length, so any innodb_ft_min_token_size is checked exactly.
+   */
+  private shortestTermCounts = new Map<number, number>();
 
   constructor(params: {
     connectionString: string;
@@ -54,28 +180,63 @@ export class MySQLStore extends MemoryStore {
   }) {
     super(params.embedder, params.config, params.logger);
     this.connectionString = params.connectionString;
+    this.searchSql = buildSearchSql(params.config.table);
   }
 
   // ==========================================================================
   // Connection pool
   // ==========================================================================
 
+  /**
+   * Lazily take this database's pool from sharedPools, creating it on first
+   * use. Concurrent first callers await the same init promise so a burst of
+   * searches at startup can't create (and leak) more than one pool.
+   */
   private async getPool(): Promise<Pool> {
-    if (!this.pool) {
-      // eslint-disable-next-line @typescript-eslint/ban-ts-comment
-      // @ts-ignore — mysql2 is an optional peer dependency; not installed in all environments
-      const mysql = await import("mysql2/promise");
-      this.pool = mysql.createPool({
-        uri: this.connectionString,
-        connectionLimit: 3,
-        waitForConnections: true,
-        connectTimeout: 5_000,
-      });
+    if (this.pool) return this.pool;
+    if (!this.poolInit) {
+      const key = this.connectionString;
+      let shared = sharedPools.get(key);
+      if (!shared) {
+        const entry = { pool: createPool(key), refs: 0 };
+        // A failed import isn't kept, so the next store retries
+        entry.pool.catch(() => {
+          if (sharedPools.get(key) === entry) sharedPools.delete(key);
+        });
+        sharedPools.set(key, entry);
+        shared = entry;
+      }
+      shared.refs++;
+      this.holdsRef = true;
+      this.poolInit = shared.pool
+        .then(
+          (pool) => {
+            // close() may have released the ref while the pool was created
+            if (this.holdsRef) this.pool = pool;
+            return pool;
+          },
+          (err) => {
+            // The failed entry is dropped from sharedPools, ref and all
+            this.holdsRef = false;
+            throw err;
+          },
+        )
+        .finally(() => {
+          this.poolInit = null;
+        });
     }
-    return this.pool;
+    return this.poolInit;
   }
 
-  /** Execute a query and return rows. */
+  /**
+   * Execute a query and return rows.
+   *
+   * pool.execute() prepares each distinct SQL string once per pooled
+   * connection and reuses the server-side handle afterwards, so SQL text
+   * must stay stable: values go in `params`, never in the string.
+   * LIMIT/OFFSET values are bound as strings — MySQL 8.0.22+ rejects a
+   * DOUBLE (how mysql2 sends JS numbers) for LIMIT in prepared statements.
+   */
   private async query(sql: string, params: unknown[] = []): Promise<any[]> {
     const pool = await this.getPool();
     const [rows] = await pool.execute(sql, params);
@@ -154,53 +315,33 @@ export class MySQLStore extends MemoryStore {
   protected async vectorSearch(query: string, embedding: number[], limit: number): Promise<RankedHit[]> {
     if (!this.hasVector) return [];
 
-    // MySQL 9.2+ vector search using cosine distance
-    const vecString = `[${embedding.join(",")}]`;
-    const sql = `
-      SELECT id, content, category, title, record_type, created_at,
-             1 - DISTANCE(embedding, STRING_TO_VECTOR(?), 'COSINE') AS score
-      FROM ${this.config.table}
-      WHERE embedding IS NOT NULL AND deleted_at IS NULL
-      ORDER BY DISTANCE(embedding, STRING_TO_VECTOR(?), 'COSINE') ASC
-      LIMIT ?
-    `;
-
-    const rows = await this.query(sql, [vecString, vecString, limit]);
-    return rows.map((r: any, idx: number) => ({
-      id: r.id,
-      content: r.content,
-      category: r.category,
-      title: r.title,
-      record_type: r.record_type,
-      created_at: r.created_at,
-      rank: idx + 1,
-      rawScore: parseFloat(r.score),
-    }));
+    // MySQL 9.2+ vector search using cosine distance.
+    const vecString = vectorText(embedding);
+    const rows = await this.query(this.searchSql.vector, [vecString, String(limit)]);
+    return rows.map(toRankedHit);
   }
 
   protected async textSearch(query: string, limit: number): Promise<RankedHit[]> {
-    // MySQL FULLTEXT with MATCH AGAINST in natural language mode
-    const sql = `
-      SELECT id, content, category, title, record_type, created_at,
-             MATCH(title, content) AGAINST(? IN NATURAL LANGUAGE MODE) AS score
-      FROM ${this.config.table}
-      WHERE MATCH(title, content) AGAINST(? IN NATURAL LANGUAGE MODE)
-        AND deleted_at IS NULL
-      ORDER BY score DESC
-      LIMIT ?
-    `;
-
-    const rows = await this.query(sql, [query, query, limit]);
-    return rows.map((r: any, idx: number) => ({
-      id: r.id,
-      content: r.content,
-      category: r.category,
-      title: r.title,
-      record_type: r.record_type,
-      created_at: r.created_at,
-      rank: idx + 1,
-      rawScore: parseFloat(r.score),
-    }));
+    // MySQL FULLTEXT with MATCH AGAINST in natural language mode.
+    // The query is bound twice: AGAINST() only accepts a constant, so it can't
+    // read a derived-table column, and a user variable would need SET on a
+    // pinned connection (an extra round-trip) — costlier than a short string.
+    const shortest = Math.min(...query.split(/\s+/).filter(Boolean).map((t) => t.length));
+    if (Number.isFinite(shortest)) {
+      this.shortestTermCounts.set(shortest, (this.shortestTermCounts.get(shortest) ?? 0) + 1);
+    }
+    const rows = await this.query(this.searchSql.text, [query, query, String(limit)]);
+    if (rows.length > 0) return rows.map(toRankedHit);
+
+    // Natural language mode silently drops words found in >50% of rows and
+    // never matches partial words, so common or truncated queries come back
+    // empty. Retry on the same index in boolean mode with every term required
+    // as a prefix (`+term*`) — still an indexed lookup, no table scan.
+    const booleanQuery = toBooleanPrefixQuery(query);
+    if (!booleanQuery) return [];
+
+    const fallbackRows = await this.query(this.searchSql.textFallback, [booleanQuery, booleanQuery, String(limit)]);
+    return fallbackRows.map(toRankedHit);
   }
 
   protected async fuzzySearch(query: string, limit: number): Promise<RankedHit[]> {
@@ -211,28 +352,9 @@ export class MySQLStore extends MemoryStore {
     // recommended: SET GLOBAL ngram_token_size=3 for trigram behavior).
     if (query.length < 2) return [];
 
-    const sql = `
-      SELECT id, content, category, title, record_type, created_at,
-             MATCH(title, content) AGAINST(? IN BOOLEAN MODE) AS score
-      FROM ${this.config.table} FORCE INDEX(idx_ft_ngram)
-      WHERE MATCH(title, content) AGAINST(? IN BOOLEAN MODE)
-        AND deleted_at IS NULL
-      ORDER BY score DESC
-      LIMIT ?
-    `;
-
     try {
-      const rows = await this.query(sql, [query, query, limit]);
-      return rows.map((r: any, idx: number) => ({
-        id: r.id,
-        content: r.content,
-        category: r.category,
-        title: r.title,
-        record_type: r.record_type,
-        created_at: r.created_at,
-        rank: idx + 1,
-        rawScore: parseFloat(r.score),
-      }));
+      const rows = await this.query(this.searchSql.fuzzy, [query, query, String(limit)]);
+      return rows.map(toRankedHit);
     } catch {
       // ngram parser may not be available on older MySQL — degrade gracefully
       return [];
@@ -290,6 +412,16 @@ export class MySQLStore extends MemoryStore {
     return { text: text || "No records found", path: pathQuery };
   }
 
+  protected async fetchContentByIds(ids: number[]): Promise<Map<number, string>> {
+    if (ids.length === 0) return new Map();
+    const placeholders = ids.map(() => "?").join(", ");
+    const rows = await this.query(
+      `SELECT id, content FROM ${this.config.table} WHERE id IN (${placeholders})`,
+      ids,
+    );
+    return new Map(rows.map((r: any) => [r.id, r.content]));
+  }
+
   protected async getPrimerRows(): Promise<PrimerRow[]> {
     try {
       return await this.query(
@@ -305,11 +437,11 @@ export class MySQLStore extends MemoryStore {
   // ==========================================================================
 
   protected async findByOperationId(operationId: string): Promise<number | null> {
-    const [rows] = await (this.pool as any).query(
-      `SELECT id FROM memories WHERE JSON_UNQUOTE(JSON_EXTRACT(metadata, '$.operationId')) = ? AND deleted_at IS NULL ORDER BY id ASC LIMIT 1`,
+    const rows = await this.query(
+      `SELECT id FROM ${this.config.table} WHERE JSON_UNQUOTE(JSON_EXTRACT(metadata, '$.operationId')) = ? AND deleted_at IS NULL ORDER BY id ASC LIMIT 1`,
       [operationId],
     );
-    return (rows as any[])[0]?.id ?? null;
+    return rows[0]?.id ?? null;
   }
 
   protected async insertRecord(params: {
@@ -366,7 +498,7 @@ export class MySQLStore extends MemoryStore {
        WHERE ${where}
        ORDER BY priority ASC, created_at DESC
        LIMIT ? OFFSET ?`,
-      [...values, lim, off]
+      [...values, String(lim), String(off)]
     ) as Record<string, unknown>[];
 
     return rows.map((row) => ({
@@ -385,20 +517,10 @@ export class MySQLStore extends MemoryStore {
   }
 
   protected async updateRecord(id: number, patch: Record<string, unknown>): Promise<void> {
-    const setClauses: string[] = [];
-    const values: unknown[] = [];
-
-    for (const [key, value] of Object.entries(patch)) {
-      setClauses.push(`${key} = ?`);
-      values.push(key === "tags" ? JSON.stringify(value) : value);
-    }
-
+    const values = Object.entries(patch).map(([key, value]) => (key === "tags" ? JSON.stringify(value) : value));
     // updated_at auto-updates via ON UPDATE CURRENT_TIMESTAMP
     values.push(id);
-    await this.exec(
-      `UPDATE ${this.config.table} SET ${setClauses.join(", ")} WHERE id = ?`,
-      values,
-    );
+    await this.exec(this.updateSql(Object.keys(patch), () => "?"), values);
   }
 
   protected async softDeleteRecord(id: number): Promise<void> {
@@ -434,7 +556,7 @@ export class MySQLStore extends MemoryStore {
   protected async storeEmbedding(id: number, embedding: number[]): Promise<void> {
     if (!this.hasVector) return;
 
-    const vecString = `[${embedding.join(",")}]`;
+    const vecString = vectorText(embedding);
     await this.exec(
       `UPDATE ${this.config.table} SET embedding = STRING_TO_VECTOR(?) WHERE id = ?`,
       [vecString, id],
@@ -458,6 +580,49 @@ export class MySQLStore extends MemoryStore {
   // Lifecycle
   // ==========================================================================
 
+  /**
+   * Refresh table statistics and check FULLTEXT token limits.
+   *
+   * ANALYZE TABLE re-samples index statistics, which drift after heavy
+   * inserts and can mislead the optimizer on the search legs. It also reads
+   * innodb_ft_min_token_size: terms shorter than it are never indexed, so
+   * queries made of them fall through to the fuzzy leg. If such queries
+   * are common, lower the variable and rebuild the FULLTEXT index.
+   * Counters reset after each call.
+   *
+   * @returns Token size (null if unreadable) and text-search counts since the last call
+   */
+  async optimize(): Promise<{ minTokenSize: number | null; textQueries: number; shortTermQueries: number }> {
+    const analyzed = await this.query(`ANALYZE TABLE ${this.config.table}`);
+    for (const row of analyzed) {
+      if (row.Msg_type === "error") {
+        this.logger.warn(`memory-shadowdb: ANALYZE TABLE ${this.config.table} failed: ${row.Msg_text}`);
+      }
+    }
+
+    // Not SHOW VARIABLES: query() prepares every statement, and SHOW
+    // VARIABLES is rejected by the prepared protocol (ER_UNSUPPORTED_PS)
+    const vars = await this.query("SELECT @@innodb_ft_min_token_size AS min_token_size");
+    const parsed = Number(vars[0]?.min_token_size);
+    const minTokenSize = Number.isFinite(parsed) ? parsed : null;
+
+    let textQueries = 0;
+    let shortTermQueries = 0;
+    for (const [length, count] of this.shortestTermCounts) {
+      textQueries += count;
+      if (minTokenSize !== null && length < minTokenSize) shortTermQueries += count;
+    }
+    this.shortestTermCounts.clear();
+
+    if (shortTermQueries > 0) {
+      this.logger.warn(
+        `memory-shadowdb: ${shortTermQueries}/${textQueries} text searches had terms shorter than innodb_ft_min_token_size=${minTokenSize} (not indexed)`,
+      );
+    }
+    this.logger.info(`memory-shadowdb: optimize — analyzed ${this.config.table}`);
+    return { minTokenSize, textQueries, shortTermQueries };
+  }
+
   async ping(): Promise<boolean> {
     try {
       await this.query("SELECT 1");
@@ -468,9 +633,15 @@ export class MySQLStore extends MemoryStore {
   }
 
   async close(): Promise<void> {
-    if (this.pool) {
-      await this.pool.end();
-      this.pool = null;
+    // Keyed on the ref, not this.pool: getPool() takes it before the pool
+    // resolves, and a close() in between must still release it
+    if (!this.holdsRef) return;
+    this.holdsRef = false;
+    this.pool = null;
+    const shared = sharedPools.get(this.connectionString);
+    if (shared && --shared.refs === 0) {
+      sharedPools.delete(this.connectionString);
+      await (await shared.pool).end();
     }
   }
 
@@ -496,7 +667,7 @@ export class MySQLStore extends MemoryStore {
   protected async getRecordBatch(afterId: number, limit: number): Promise<Array<{ id: number; content: string }>> {
     return await this.query(
       `SELECT id, content FROM ${this.config.table} WHERE deleted_at IS NULL AND id > ? ORDER BY id ASC LIMIT ?`,
-      [afterId, limit],
+      [afterId, String(limit)],
     ) as Array<{ id: number; content: string }>;
   }
 }
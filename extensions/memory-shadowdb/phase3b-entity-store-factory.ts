@@ -77,6 +77,29 @@ class NullEntityStore implements EntityStore {
 // Factory
 // ============================================================================
 
+/**
+ * PostgreSQL stores by connection string. Each owns a pg pool, so repeat
+ * createEntityStore() calls share one pool per database instead of opening
+ * a new one every time.
+ */
+const postgresStores = new Map<string, Promise<PostgresEntry>>();
+
+/** A cached PostgreSQL store and the pool it owns. */
+interface PostgresEntry {
+  store: EntityStore;
+  pool: { end: () => Promise<void> };
+}
+
+/**
+ * Forget cached stores and end their pools; the next createEntityStore()
+ * builds fresh ones. Stores handed out earlier can't query afterwards.
+ */
+export async function clearEntityStoreCache(): Promise<void> {
+  const entries = [...postgresStores.values()];
+  postgresStores.clear();
+  await Promise.allSettled(entries.map(async (entry) => (await entry).pool.end()));
+}
+
 /**
  * Create an EntityStore for the given backend.
  *
@@ -85,6 +108,7 @@ class NullEntityStore implements EntityStore {
  * @returns                 - EntityStore (real or stub)
  *
  * Never throws — returns NullEntityStore on unknown backend.
+ * PostgreSQL stores are reused per connection string (see clearEntityStoreCache).
  */
 export async function createEntityStore(
   backend: string,
@@ -94,13 +118,15 @@ export async function createEntityStore(
 
   switch (backend) {
     case "postgres": {
-      // Real implementation — uses pg pool + memory_edges table
-      const { createPostgresEntityStore } = await import(
-        "./phase3b-postgres-entity-store.js"
-      );
-      const { Pool } = await import("pg");
-      const pool = new Pool({ connectionString: options.connectionString, max: 3 });
-      return createPostgresEntityStore(pool);
+      const key = options.connectionString ?? "";
+      let entry = postgresStores.get(key);
+      if (!entry) {
+        entry = createPostgresStore(options.connectionString);
+        postgresStores.set(key, entry);
+        // A failed import isn't cached, so the next call retries
+        entry.catch(() => postgresStores.delete(key));
+      }
+      return (await entry).store;
     }
 
     case "sqlite":
@@ -120,3 +146,13 @@ export async function createEntityStore(
       return new NullEntityStore(backend, logger);
   }
 }
+
+/** Real implementation — uses pg pool + memory_edges table. */
+async function createPostgresStore(connectionString: string | undefined): Promise<PostgresEntry> {
+  const { createPostgresEntityStore } = await import(
+    "./phase3b-postgres-entity-store.js"
+  );
+  const { Pool } = await import("pg");
+  const pool = new Pool({ connectionString, max: 3 });
+  return { store: createPostgresEntityStore(pool), pool };
+}
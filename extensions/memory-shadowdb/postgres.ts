@@ -10,18 +10,56 @@
  * SECURITY:
  * - All queries use parameterized SQL ($1, $2, ...) — no user input interpolation
  * - Table name interpolation is safe: comes from plugin config only (not user input)
- * - Connection pool capped at 3 to prevent resource exhaustion
+ * - Connection pool capped at 3 to prevent resource exhaustion, shared by
+ *   every store in the process that uses the same database
  * - Connection string may contain credentials — never logged
  */
 
+import { createHash } from "node:crypto";
 import pg from "pg";
 import { MemoryStore, type RankedHit, type PrimerRow, type StoreConfig, type StoreLogger } from "./store.js";
-import type { EmbeddingClient } from "./embedder.js";
+import { vectorText, type EmbeddingClient } from "./embedder.js";
 import type { SearchFilters } from "./types.js";
 import { buildFilterClauses } from "./filters.js";
 import { buildListConditions, buildSortClause } from "./list-filters.js";
 import { buildEdgeQuery, extractConnectedEntity, normalizeEntitySlug, type GraphEdge } from "./graph-queries.js";
 
+/**
+ * Default `hnsw.ef_search` for pooled connections. pgvector's built-in 40
+ * caps the HNSW candidate list below the 5× oversampled vector leg
+ * (maxResults * 5), so the leg would return fewer, lower-recall hits.
+ */
+export const HNSW_EF_SEARCH = 80;
+
+/**
+ * Primer queries with decreasing schema assumptions. The first matches the
+ * primer_priority_key_idx ordering (migration 008).
+ */
+const PRIMER_QUERIES = [
+  `SELECT key, content FROM primer WHERE (enabled IS NULL OR enabled IS TRUE) ORDER BY priority ASC NULLS LAST, key ASC`,
+  `SELECT key, content FROM primer ORDER BY priority ASC NULLS LAST, key ASC`,
+  `SELECT key, content FROM primer ORDER BY key ASC`,
+];
+
+/**
+ * Named prepared statement for a search leg or a by-id read/write. pg
+ * parses and plans a named statement once per pooled connection; later
+ * calls send only Bind/Execute. The name is a hash of the SQL text, so each
+ * filter combination gets its own statement and a name is never reused for
+ * different text.
+ */
+function prepared(text: string, values: unknown[]): pg.QueryConfig {
+  return { name: `sdb_${createHash("sha1").update(text).digest("hex").slice(0, 16)}`, text, values };
+}
+
+/**
+ * Pools shared by every PostgresStore in the process, keyed by ef_search
+ * (set on each new connection) and connection string. A second store on
+ * the same database reuses the warm connections instead of opening its
+ * own; the pool ends when the last store using it closes.
+ */
+const sharedPools = new Map<string, { pool: pg.Pool; refs: number }>();
+
 /**
  * PostgreSQL-backed memory store.
  *
@@ -31,33 +69,89 @@ import { buildEdgeQuery, extractConnectedEntity, normalizeEntitySlug, type Graph
 export class PostgresStore extends MemoryStore {
   private pool: pg.Pool | null = null;
   private connectionString: string;
+  private efSearch: number;
+  private halfvec: boolean;
+  private binaryCandidates: number;
+  /** Index into PRIMER_QUERIES of the first query this schema can run. */
+  private primerQuery = 0;
+  /** Cleared once a query finds no content_snippet column. */
+  private hasContentSnippet = true;
 
+  /**
+   * @param params.efSearch - hnsw.ef_search set on every pooled connection
+   *   (default: HNSW_EF_SEARCH). Higher improves vector recall at the cost of
+   *   latency; 0 keeps the server's setting.
+   * @param params.halfvec - Order the vector leg by embedding::halfvec so it
+   *   uses the half-precision HNSW index from migration 006/011 (default: false).
+   * @param params.binaryCandidates - When > 0, the vector leg first takes this
+   *   many nearest rows by Hamming distance on binary_quantize(embedding)
+   *   (migration 010's index), then ranks only those by full-precision cosine.
+   *   Takes precedence over halfvec (default: 0 = off).
+   */
   constructor(params: {
     connectionString: string;
     embedder: EmbeddingClient;
     config: StoreConfig;
     logger: StoreLogger;
+    efSearch?: number;
+    halfvec?: boolean;
+    binaryCandidates?: number;
   }) {
     super(params.embedder, params.config, params.logger);
     this.connectionString = params.connectionString;
+    this.efSearch = Math.max(0, Math.floor(params.efSearch ?? HNSW_EF_SEARCH));
+    this.halfvec = params.halfvec ?? false;
+    this.binaryCandidates = Math.max(0, Math.floor(params.binaryCandidates ?? 0));
   }
 
   // ==========================================================================
   // Connection pool — lazy init, capped at 3
   // ==========================================================================
 
+  /**
+   * Connections go back to the pool after each query rather than closing,
+   * so only the first query pays TCP + TLS + auth. The idle timeout outlives
+   * a typical gap between agent turns, and TCP keep-alive stops NATs and
+   * firewalls from silently dropping the warm sockets in between.
+   *
+   * hnsw.ef_search is set once per new connection. pg queues queries per
+   * client, so the SET runs before the first query the pool hands it.
+   *
+   * The pool is shared with other stores on the same database (sharedPools).
+   */
   protected getPool(): pg.Pool {
     if (!this.pool) {
-      this.pool = new pg.Pool({
-        connectionString: this.connectionString,
-        max: 3,
-        idleTimeoutMillis: 30_000,
-        connectionTimeoutMillis: 5_000,
-      });
+      let shared = sharedPools.get(this.poolKey);
+      if (!shared) {
+        const pool = new pg.Pool({
+          connectionString: this.connectionString,
+          max: 3,
+          idleTimeoutMillis: 60_000,
+          connectionTimeoutMillis: 5_000,
+          keepAlive: true,
+          keepAliveInitialDelayMillis: 10_000,
+        });
+        if (this.efSearch > 0) {
+          pool.on("connect", (client) => {
+            client.query(`SET hnsw.ef_search = ${this.efSearch}`).catch((err) => {
+              this.logger.warn(`memory-shadowdb: could not set hnsw.ef_search: ${err instanceof Error ? err.message : String(err)}`);
+            });
+          });
+        }
+        shared = { pool, refs: 0 };
+        sharedPools.set(this.poolKey, shared);
+      }
+      shared.refs++;
+      this.pool = shared.pool;
     }
     return this.pool;
   }
 
+  /** sharedPools key for this store's connection settings. */
+  private get poolKey(): string {
+    return `${this.efSearch}\0${this.connectionString}`;
+  }
+
   /**
    * Expose pool for legacy compatibility (index.ts shared pool pattern).
    * TODO: Remove once index.ts is fully migrated to use MemoryStore directly.
@@ -101,33 +195,52 @@ export class PostgresStore extends MemoryStore {
   // ==========================================================================
   // Search legs
   // ==========================================================================
+  // Legs select ids + metadata only. Long content is TOASTed, and reading it
+  // for every candidate would detoast rows RRF then discards; search()
+  // hydrates just the merged hits via fetchContentByIds().
 
   protected async vectorSearch(query: string, embedding: number[], limit: number, filters?: SearchFilters): Promise<RankedHit[]> {
-    const vecLiteral = `[${embedding.join(",")}]`;
+    const vecLiteral = vectorText(embedding);
     const baseConds = ["embedding IS NOT NULL", "deleted_at IS NULL"];
     const { clauses, values, nextIdx } = buildFilterClauses(filters, 3);
     const allConds = [...baseConds, ...clauses].join(" AND ");
+    // The ORDER BY must match the halfvec index expression for the planner
+    // to use it; the score is still computed at full precision
+    const distance = this.halfvec && this.binaryCandidates === 0
+      ? `embedding::halfvec(${embedding.length}) <=> $1::halfvec(${embedding.length})`
+      : "embedding <=> $1::vector";
+    // Two-stage: Hamming distance over 1-bit codes (32x smaller than float32)
+    // picks candidates cheaply, and only those are re-ranked by cosine
+    const candidates = this.binaryCandidates > 0
+      ? `WITH candidates AS (
+        SELECT id FROM ${this.config.table}
+        WHERE ${allConds}
+        ORDER BY binary_quantize(embedding)::bit(${embedding.length}) <~> binary_quantize($1::vector)
+        LIMIT ${Math.max(this.binaryCandidates, limit)}
+      )`
+      : "";
+    const from = candidates ? `${this.config.table} JOIN candidates USING (id)` : this.config.table;
     // Phase 0: SELECT confidence/decay/tier columns for scoring pipeline.
     // COALESCE to safe defaults in case migration hasn't run (backward compat).
-    const sql = `
-      SELECT id, content, category, title, record_type, created_at,
+    const sql = `${candidates}
+      SELECT id, category, title, record_type, created_at,
              1 - (embedding <=> $1::vector) AS score,
-             ROW_NUMBER() OVER (ORDER BY embedding <=> $1::vector) AS rank,
+             ROW_NUMBER() OVER (ORDER BY ${distance}) AS rank,
              COALESCE(confidence, 1.0)              AS confidence,
              COALESCE(confidence_decay_rate, 0.0)   AS confidence_decay_rate,
              COALESCE(is_timeless, FALSE)            AS is_timeless,
              COALESCE(relevance_tier, 1)             AS relevance_tier,
              last_verified_at
-      FROM ${this.config.table}
+      FROM ${from}
       WHERE ${allConds}
-      ORDER BY embedding <=> $1::vector
+      ORDER BY ${distance}
       LIMIT $2
     `;
-    const result = await this.getPool().query(sql, [vecLiteral, limit, ...values]);
+    const result = await this.getPool().query(prepared(sql, [vecLiteral, limit, ...values]));
     const minVec = this.config.minVectorScore || 0;
     const rows = result.rows.map((r: any) => ({
       id: r.id,
-      content: r.content,
+      content: "",
       category: r.category,
       title: r.title,
       record_type: r.record_type,
@@ -151,28 +264,33 @@ export class PostgresStore extends MemoryStore {
   }
 
   protected async textSearch(query: string, limit: number, filters?: SearchFilters): Promise<RankedHit[]> {
-    const baseConds = ["fts IS NOT NULL", "fts @@ plainto_tsquery('english', $1)", "deleted_at IS NULL"];
+    const baseConds = ["fts IS NOT NULL", "fts @@ q", "deleted_at IS NULL"];
     const { clauses, values, nextIdx } = buildFilterClauses(filters, 3);
     const allConds = [...baseConds, ...clauses].join(" AND ");
+    // tsquery and rank are computed once per row; ROW_NUMBER only sees the
+    // top $2 rows instead of every match.
     // Phase 0: include confidence/tier columns (COALESCE for backward compat)
     const sql = `
-      SELECT id, content, category, title, record_type, created_at,
-             ts_rank_cd(fts, plainto_tsquery('english', $1)) AS score,
-             ROW_NUMBER() OVER (ORDER BY ts_rank_cd(fts, plainto_tsquery('english', $1)) DESC) AS rank,
-             COALESCE(confidence, 1.0)              AS confidence,
-             COALESCE(confidence_decay_rate, 0.0)   AS confidence_decay_rate,
-             COALESCE(is_timeless, FALSE)            AS is_timeless,
-             COALESCE(relevance_tier, 1)             AS relevance_tier,
-             last_verified_at
-      FROM ${this.config.table}
-      WHERE ${allConds}
-      ORDER BY score DESC
-      LIMIT $2
+      SELECT t.*, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank
+      FROM (
+        SELECT id, category, title, record_type, created_at,
+               ts_rank_cd(fts, q) AS score,
+               COALESCE(confidence, 1.0)              AS confidence,
+               COALESCE(confidence_decay_rate, 0.0)   AS confidence_decay_rate,
+               COALESCE(is_timeless, FALSE)            AS is_timeless,
+               COALESCE(relevance_tier, 1)             AS relevance_tier,
+               last_verified_at
+        FROM ${this.config.table}, plainto_tsquery('english', $1) AS q
+        WHERE ${allConds}
+        ORDER BY score DESC
+        LIMIT $2
+      ) t
+      ORDER BY rank
     `;
-    const result = await this.getPool().query(sql, [query, limit, ...values]);
+    const result = await this.getPool().query(prepared(sql, [query, limit, ...values]));
     return result.rows.map((r: any) => ({
       id: r.id,
-      content: r.content,
+      content: "",
       category: r.category,
       title: r.title,
       record_type: r.record_type,
@@ -193,7 +311,7 @@ export class PostgresStore extends MemoryStore {
     const allConds = [...baseConds, ...clauses].join(" AND ");
     // Phase 0: include confidence/tier columns (COALESCE for backward compat)
     const sql = `
-      SELECT id, content, category, title, record_type, created_at,
+      SELECT id, category, title, record_type, created_at,
              similarity(content, $1) AS score,
              ROW_NUMBER() OVER (ORDER BY content <-> $1) AS rank,
              COALESCE(confidence, 1.0)              AS confidence,
@@ -206,10 +324,10 @@ export class PostgresStore extends MemoryStore {
       ORDER BY content <-> $1
       LIMIT $2
     `;
-    const result = await this.getPool().query(sql, [query, limit, ...values]);
+    const result = await this.getPool().query(prepared(sql, [query, limit, ...values]));
     return result.rows.map((r: any) => ({
       id: r.id,
-      content: r.content,
+      content: "",
       category: r.category,
       title: r.title,
       record_type: r.record_type,
@@ -230,7 +348,7 @@ export class PostgresStore extends MemoryStore {
 
   async get(id: number, opts?: { include_children?: boolean; section?: string }): Promise<{ text: string; path: string } | null> {
     const sql = `SELECT id, content, category, title, record_type FROM ${this.config.table} WHERE id = $1 AND deleted_at IS NULL`;
-    const result = await this.getPool().query(sql, [id]);
+    const result = await this.getPool().query(prepared(sql, [id]));
     if (result.rows.length === 0) return null;
 
     const row = result.rows[0];
@@ -245,7 +363,7 @@ export class PostgresStore extends MemoryStore {
         WHERE parent_id = $1 AND deleted_at IS NULL AND metadata->>'section_name' = $2
         LIMIT 1
       `;
-      const sectionResult = await this.getPool().query(sectionSql, [id, opts.section]);
+      const sectionResult = await this.getPool().query(prepared(sectionSql, [id, opts.section]));
       if (sectionResult.rows.length > 0) {
         text = this.formatFullRecord(sectionResult.rows[0]);
       } else {
@@ -262,7 +380,7 @@ export class PostgresStore extends MemoryStore {
         WHERE parent_id = $1 AND deleted_at IS NULL
         ORDER BY priority ASC, id ASC
       `;
-      const childResult = await this.getPool().query(childSql, [id]);
+      const childResult = await this.getPool().query(prepared(childSql, [id]));
       if (childResult.rows.length > 0) {
         text += "\n\n---\n## Children\n";
         for (const child of childResult.rows) {
@@ -306,21 +424,35 @@ export class PostgresStore extends MemoryStore {
     return { text: text || "No records found", path: pathQuery };
   }
 
+  protected async fetchContentByIds(ids: number[], snippetOnly = false): Promise<Map<number, string>> {
+    if (ids.length === 0) return new Map();
+    // Snippets read the stored content_snippet prefix (migration 005), which
+    // stays inline in the heap tuple, instead of detoasting long content
+    const column = snippetOnly && this.hasContentSnippet ? "content_snippet" : "content";
+    try {
+      const result = await this.getPool().query(
+        prepared(`SELECT id, ${column} AS content FROM ${this.config.table} WHERE id = ANY($1::bigint[])`, [ids]),
+      );
+      return new Map(result.rows.map((r: any) => [r.id, r.content]));
+    } catch (err) {
+      if (column === "content" || (err as { code?: string }).code !== "42703") throw err;
+      this.hasContentSnippet = false; // migration 005 not applied
+      return this.fetchContentByIds(ids);
+    }
+  }
+
   protected async getPrimerRows(): Promise<PrimerRow[]> {
     // Try queries with decreasing schema assumptions (graceful degradation)
-    const queries = [
-      `SELECT key, content FROM primer WHERE (enabled IS NULL OR enabled IS TRUE) ORDER BY priority ASC NULLS LAST, key ASC`,
-      `SELECT key, content FROM primer ORDER BY priority ASC NULLS LAST, key ASC`,
-      `SELECT key, content FROM primer ORDER BY key ASC`,
-    ];
-
-    for (const sql of queries) {
+    for (let i = this.primerQuery; i < PRIMER_QUERIES.length; i++) {
       try {
-        const result = await this.getPool().query(sql);
+        const result = await this.getPool().query(PRIMER_QUERIES[i]);
         return result.rows as PrimerRow[];
       } catch (err) {
         const code = (err as { code?: string }).code;
         if (code === "42P01") return []; // table doesn't exist
+        // Missing column: this schema can never run the query, so later
+        // refreshes start at the next one instead of failing again
+        if (code === "42703") this.primerQuery = i + 1;
         continue;
       }
     }
@@ -425,54 +557,43 @@ export class PostgresStore extends MemoryStore {
   }
 
   protected async updateRecord(id: number, patch: Record<string, unknown>): Promise<void> {
-    const setClauses: string[] = [];
-    const values: unknown[] = [];
-    let paramIdx = 1;
-
-    for (const [key, value] of Object.entries(patch)) {
-      setClauses.push(`${key} = $${paramIdx++}`);
-      values.push(value);
-    }
-
-    setClauses.push(`updated_at = NOW()`);
-    values.push(id);
-
-    const sql = `UPDATE ${this.config.table} SET ${setClauses.join(", ")} WHERE id = $${paramIdx}`;
-    await this.getPool().query(sql, values);
+    const sql = this.updateSql(Object.keys(patch), (i) => `$${i}`, "updated_at = NOW()");
+    await this.getPool().query(prepared(sql, [...Object.values(patch), id]));
   }
 
   protected async softDeleteRecord(id: number): Promise<void> {
-    await this.getPool().query(
+    await this.getPool().query(prepared(
       `UPDATE ${this.config.table} SET deleted_at = NOW() WHERE id = $1`, [id],
-    );
+    ));
   }
 
   protected async restoreRecord(id: number): Promise<void> {
-    await this.getPool().query(
+    await this.getPool().query(prepared(
       `UPDATE ${this.config.table} SET deleted_at = NULL WHERE id = $1`, [id],
-    );
+    ));
   }
 
   protected async fetchExpiredRecords(days: number) {
     const result = await this.getPool().query(
-      `SELECT id, content, category, title, deleted_at FROM ${this.config.table} WHERE deleted_at IS NOT NULL AND deleted_at < NOW() - INTERVAL '${days} days'`,
+      `SELECT id, content, category, title, deleted_at FROM ${this.config.table} WHERE deleted_at IS NOT NULL AND deleted_at < NOW() - $1 * INTERVAL '1 day'`, [days],
     );
     return result.rows;
   }
 
   protected async purgeExpiredRecords(days: number): Promise<number> {
     const result = await this.getPool().query(
-      `DELETE FROM ${this.config.table} WHERE deleted_at IS NOT NULL AND deleted_at < NOW() - INTERVAL '${days} days' RETURNING id`,
+      `DELETE FROM ${this.config.table} WHERE deleted_at IS NOT NULL AND deleted_at < NOW() - $1 * INTERVAL '1 day' RETURNING id`, [days],
     );
     return result.rowCount ?? 0;
   }
 
   protected async storeEmbedding(id: number, embedding: number[]): Promise<void> {
-    const vecLiteral = `[${embedding.join(",")}]`;
-    await this.getPool().query(
+    // Prepared: reembedAll() runs this once per record
+    const vecLiteral = vectorText(embedding);
+    await this.getPool().query(prepared(
       `UPDATE ${this.config.table} SET embedding = $1::vector WHERE id = $2`,
       [vecLiteral, id],
-    );
+    ));
   }
 
   protected async getRecordMeta(id: number): Promise<{
@@ -481,9 +602,9 @@ export class PostgresStore extends MemoryStore {
     category: string | null;
     deleted_at: string | Date | null;
   } | null> {
-    const result = await this.getPool().query(
+    const result = await this.getPool().query(prepared(
       `SELECT id, content, category, deleted_at FROM ${this.config.table} WHERE id = $1`, [id],
-    );
+    ));
     return result.rows[0] || null;
   }
 
@@ -502,8 +623,12 @@ export class PostgresStore extends MemoryStore {
 
   async close(): Promise<void> {
     if (this.pool) {
-      await this.pool.end();
       this.pool = null;
+      const shared = sharedPools.get(this.poolKey);
+      if (shared && --shared.refs === 0) {
+        sharedPools.delete(this.poolKey);
+        await shared.pool.end();
+      }
     }
   }
 
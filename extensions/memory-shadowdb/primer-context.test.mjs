@@ -68,3 +68,41 @@ test('getPrimerContext includes rowCount and includedCount metadata', async () =
   assert.equal(typeof result.digest, 'string');
   assert.equal(result.digest.length, 16);
 });
+
+function makeCountingStore(rows, config = {}) {
+  const store = makeStore(rows);
+  Object.assign(store.config, config);
+  store.primerReads = 0;
+  const getPrimerRows = store.getPrimerRows.bind(store);
+  store.getPrimerRows = async () => { store.primerReads++; return getPrimerRows(); };
+  return store;
+}
+
+test('getPrimerContext reuses cached primer rows within TTL', async () => {
+  const store = makeCountingStore([{ key: 'soul', content: 'Soul content.' }]);
+  const first = await store.getPrimerContext(0);
+  const second = await store.getPrimerContext(0);
+  assert.equal(store.primerReads, 1);
+  assert.equal(second.digest, first.digest);
+});
+
+test('invalidatePrimerCache forces a fresh primer read', async () => {
+  const store = makeCountingStore([{ key: 'soul', content: 'Soul content.' }]);
+  await store.getPrimerContext(0);
+  store.invalidatePrimerCache();
+  await store.getPrimerContext(0);
+  assert.equal(store.primerReads, 2);
+});
+
+test('primerRowsTtlMs = 0 disables primer row caching', async () => {
+  const store = makeCountingStore([{ key: 'soul', content: 'Soul content.' }], { primerRowsTtlMs: 0 });
+  await store.getPrimerContext(0);
+  await store.getPrimerContext(0);
+  assert.equal(store.primerReads, 2);
+});
+
+test('concurrent primer cache misses share one read', async () => {
+  const store = makeCountingStore([{ key: 'soul', content: 'Soul content.' }]);
+  await Promise.all([store.getPrimerContext(0), store.getPrimerContext(0), store.getPrimerContext(0)]);
+  assert.equal(store.primerReads, 1);
+});
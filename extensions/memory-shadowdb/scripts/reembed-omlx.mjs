@@ -44,24 +44,31 @@ async function main() {
   console.log(`Records to embed: ${count}`);
   if (DRY_RUN) { console.log("DRY RUN — no writes"); await db.end(); return; }
 
-  // Update vector column dimensions if needed
-  // Check current dim
-  const { rows: sample } = await db.query(
-    `SELECT id, title, content FROM memories WHERE deleted_at IS NULL ORDER BY id LIMIT 1`
-  );
-  if (!sample.length) { console.log("No records"); await db.end(); return; }
+  // The count above already says whether there is anything to embed; no
+  // second query (and content fetch) just to see one row
+  if (Number(count) === 0) { console.log("No records"); await db.end(); return; }
 
   let processed = 0, errors = 0;
   let lastId = 0;
 
-  while (true) {
-    const { rows } = await db.query(
+  const fetchBatch = (afterId) => {
+    const pending = db.query(
       `SELECT id, title, content, tags FROM memories 
        WHERE deleted_at IS NULL AND id > $1 
        ORDER BY id LIMIT $2`,
-      [lastId, BATCH_SIZE]
+      [afterId, BATCH_SIZE]
     );
+    pending.catch(() => {}); // surfaced when awaited
+    return pending;
+  };
+
+  // The next page is queued as soon as this one arrives, so the SELECT runs
+  // while the embedding request is out instead of after the UPDATE
+  let nextBatch = fetchBatch(lastId);
+  while (true) {
+    const { rows } = await nextBatch;
     if (!rows.length) break;
+    nextBatch = fetchBatch(rows[rows.length - 1].id);
 
     const texts = rows.map(r => {
       const tag = (r.tags || []).join(" ");
@@ -70,13 +77,13 @@ async function main() {
 
     try {
       const vectors = await embed(texts);
-      for (let i = 0; i < rows.length; i++) {
-        const vec = `[${vectors[i].join(",")}]`;
-        await db.query(
-          `UPDATE memories SET embedding = $1::vector WHERE id = $2`,
-          [vec, rows[i].id]
-        );
-      }
+      // One UPDATE per batch: unnest() pairs the id and vector arrays back up
+      await db.query(
+        `UPDATE memories AS m SET embedding = v.embedding::vector
+         FROM unnest($1::bigint[], $2::text[]) AS v(id, embedding)
+         WHERE m.id = v.id`,
+        [rows.map(r => r.id), vectors.map(v => `[${v.join(",")}]`)]
+      );
       processed += rows.length;
       lastId = rows[rows.length - 1].id;
       process.stdout.write(`\rEmbedded ${processed}/${count} (id up to ${lastId})`);
@@ -21,6 +21,7 @@
  *   --model=MODEL    Embedding model (default: nomic-embed-text)
  *   --start-id=N     Resume from this record ID (skip lower IDs)
  *   --dims=N         Expected embedding dimensions (default: 768)
+ *   --concurrency=N  Embedding requests in flight at once (default: 4)
  */
 
 import pg from "pg";
@@ -44,6 +45,7 @@ const OLLAMA_URL = (args["ollama-url"] || "http://localhost:11434").replace(/\/$
 const MODEL = args["model"] || "nomic-embed-text";
 const START_ID = parseInt(args["start-id"] || "0", 10);
 const EXPECTED_DIMS = parseInt(args["dims"] || "768", 10);
+const CONCURRENCY = Math.max(1, parseInt(args["concurrency"] || "4", 10));
 const PREFIX = "search_document: ";
 const MAX_TEXT_CHARS = 8000;
 
@@ -79,6 +81,83 @@ async function embedText(text) {
   return data.embedding;
 }
 
+/** False once the server has answered /api/embed with 404 (pre-0.3 Ollama). */
+let batchEndpoint = true;
+
+/**
+ * Embed a whole batch in one /api/embed request. `truncate: true` has Ollama
+ * cut each input at the model's context length with the model's own
+ * tokenizer, so long or multibyte-heavy records no longer fail the way they
+ * could when MAX_TEXT_CHARS was the only limit. That cap only bounds the
+ * request size now.
+ */
+async function embedTexts(texts) {
+  const res = await fetch(`${OLLAMA_URL}/api/embed`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      model: MODEL,
+      input: texts.map((text) => `${PREFIX}${text.slice(0, MAX_TEXT_CHARS)}`),
+      truncate: true,
+    }),
+  });
+
+  if (res.status === 404) {
+    batchEndpoint = false;
+    throw new Error("Ollama has no /api/embed");
+  }
+  if (!res.ok) {
+    const body = await res.text().catch(() => "");
+    throw new Error(`Ollama failed: ${res.status} ${body.slice(0, 200)}`);
+  }
+
+  const data = await res.json();
+  if (!Array.isArray(data.embeddings) || data.embeddings.length !== texts.length) {
+    throw new Error("Ollama response missing embeddings array");
+  }
+  for (const embedding of data.embeddings) {
+    if (embedding.length !== EXPECTED_DIMS) {
+      throw new Error(
+        `Dimension mismatch: got ${embedding.length}, expected ${EXPECTED_DIMS}`,
+      );
+    }
+  }
+
+  return data.embeddings;
+}
+
+/**
+ * Embed every row of a batch, in row order, as { embedding } or { error }.
+ * The batch goes out as a single /api/embed request. If that fails, or the
+ * server is too old for it, rows are embedded one by one with up to
+ * CONCURRENCY requests in flight, so one bad record only fails itself.
+ */
+async function embedRows(rows) {
+  if (batchEndpoint) {
+    try {
+      const embeddings = await embedTexts(rows.map((row) => row.content));
+      return embeddings.map((embedding) => ({ embedding }));
+    } catch {
+      // retried per record below, which reports the failing ids
+    }
+  }
+
+  const results = new Array(rows.length);
+  let next = 0;
+  async function worker() {
+    while (next < rows.length) {
+      const i = next++;
+      try {
+        results[i] = { embedding: await embedText(rows[i].content) };
+      } catch (error) {
+        results[i] = { error };
+      }
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(CONCURRENCY, rows.length) }, worker));
+  return results;
+}
+
 // ============================================================================
 // Format vector for pgvector
 // ============================================================================
@@ -86,6 +165,36 @@ function toPgVector(vec) {
   return `[${vec.join(",")}]`;
 }
 
+/**
+ * Store one batch's embeddings with a single UPDATE instead of one per row:
+ * ids and vectors travel as two parallel arrays that unnest() pairs back up
+ * server-side, so a batch costs one round trip and one plan.
+ */
+async function writeEmbeddings(pool, ids, vectors) {
+  await pool.query(
+    `UPDATE memories AS m SET embedding = v.embedding::vector, updated_at = NOW()
+     FROM unnest($1::bigint[], $2::text[]) AS v(id, embedding)
+     WHERE m.id = v.id`,
+    [ids, vectors],
+  );
+}
+
+/**
+ * Keyset page of records after `afterId`. Memory stays at one or two batches
+ * however large the table is, like a server-side cursor, but without holding a
+ * transaction open for the whole run.
+ */
+function fetchBatch(pool, afterId) {
+  const pending = pool.query(
+    `SELECT id, content FROM memories 
+     WHERE deleted_at IS NULL AND id > $1 
+     ORDER BY id ASC LIMIT $2`,
+    [afterId, BATCH_SIZE],
+  );
+  pending.catch(() => {}); // surfaced when awaited, not as an unhandled rejection
+  return pending;
+}
+
 // ============================================================================
 // Main
 // ============================================================================
@@ -95,6 +204,7 @@ async function main() {
   console.log(`  Model:      ${MODEL}`);
   console.log(`  Prefix:     "${PREFIX}"`);
   console.log(`  Batch size: ${BATCH_SIZE}`);
+  console.log(`  Concurrency: ${CONCURRENCY}`);
   console.log(`  Start ID:   ${START_ID || "(beginning)"}`);
   console.log(`  Dry run:    ${DRY_RUN}`);
   console.log();
@@ -129,49 +239,52 @@ async function main() {
     let lastId = START_ID;
     const startTime = Date.now();
 
+    // The next page is read on another pool connection while this one embeds
+    let nextBatch = fetchBatch(pool, lastId);
     while (true) {
-      // Fetch next batch (cursor-based pagination by id)
-      const batch = await pool.query(
-        `SELECT id, content FROM memories 
-         WHERE deleted_at IS NULL AND id > $1 
-         ORDER BY id ASC LIMIT $2`,
-        [lastId, BATCH_SIZE],
-      );
+      const batch = await nextBatch;
 
       if (batch.rows.length === 0) break;
+      nextBatch = fetchBatch(pool, batch.rows[batch.rows.length - 1].id);
 
-      for (const row of batch.rows) {
-        try {
-          const embedding = await embedText(row.content);
-
-          if (!DRY_RUN) {
-            await pool.query(
-              `UPDATE memories SET embedding = $1::vector, updated_at = NOW() WHERE id = $2`,
-              [toPgVector(embedding), row.id],
-            );
-          }
-
-          processed++;
-          lastId = row.id;
-
-          if (processed % 100 === 0) {
-            const elapsed = ((Date.now() - startTime) / 1000).toFixed(1);
-            const rate = (processed / (Date.now() - startTime) * 1000).toFixed(1);
-            const eta = ((total - processed) / (processed / (Date.now() - startTime) * 1000)).toFixed(0);
-            console.log(
-              `Progress: ${processed} / ${total} (${((processed / total) * 100).toFixed(1)}%) | ` +
-              `${elapsed}s elapsed | ${rate}/s | ETA: ${eta}s | last_id: ${lastId}`,
-            );
-          }
-        } catch (err) {
+      const batchStartId = lastId;
+      const ids = [];
+      const vectors = [];
+      const results = await embedRows(batch.rows);
+      batch.rows.forEach((row, i) => {
+        const { embedding, error } = results[i];
+        if (error) {
           errors++;
-          console.error(`  ✗ Record ${row.id}: ${err.message}`);
-          lastId = row.id; // Skip and continue
+          console.error(`  ✗ Record ${row.id}: ${error.message}`);
           if (errors > 50) {
             console.error("\nToo many errors (>50), aborting.");
             process.exit(1);
           }
+        } else {
+          ids.push(row.id);
+          vectors.push(toPgVector(embedding));
         }
+        lastId = row.id; // Failed records are skipped
+      });
+
+      if (!DRY_RUN && ids.length > 0) {
+        try {
+          await writeEmbeddings(pool, ids, vectors);
+        } catch (err) {
+          throw new Error(`writing batch failed (resume with --start-id=${batchStartId}): ${err.message}`);
+        }
+      }
+
+      const before = processed;
+      processed += ids.length;
+      if (Math.floor(processed / 100) > Math.floor(before / 100)) {
+        const elapsed = ((Date.now() - startTime) / 1000).toFixed(1);
+        const rate = (processed / (Date.now() - startTime) * 1000).toFixed(1);
+        const eta = ((total - processed) / (processed / (Date.now() - startTime) * 1000)).toFixed(0);
+        console.log(
+          `Progress: ${processed} / ${total} (${((processed / total) * 100).toFixed(1)}%) | ` +
+          `${elapsed}s elapsed | ${rate}/s | ETA: ${eta}s | last_id: ${lastId}`,
+        );
       }
     }
 
@@ -0,0 +1,293 @@
+/**
+ * search-pipeline.test.mjs — Unit tests for MemoryStore.search orchestration
+ *
+ * Tests: content hydration for backends whose legs skip content, search
+ * result cache (hits, key includes arguments, invalidation, TTL, LRU),
+ * stats() counters, text-only fallback when the query can't be embedded,
+ * failed legs keeping results out of the cache,
+ * text legs overlapping the embedding call (also with synchronous legs),
+ * semantic cache hits, searchBatch, FTS-dominance short-circuit, snippet-only
+ * hydration, semantic lookup with early-abort dot products.
+ */
+
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { MemoryStore } from './dist/store.js';
+
+const CONFIG = {
+  table: 'memories', vectorWeight: 1, textWeight: 1, recencyWeight: 0,
+  minVectorScore: 0, autoEmbed: false, purgeAfterDays: 0,
+};
+
+function hit(id, rank, content = '') {
+  return { id, content, category: 'general', title: `T${id}`, record_type: 'fact', created_at: null, rank };
+}
+
+/**
+ * Store whose legs return the given hits. `contents` (id → text), when set,
+ * is served by fetchContentByIds and the id lists it was asked for are logged.
+ */
+function makeStore({ vector = [], text = [], fuzzy = [], contents = null, config = {}, embed = async () => [1, 0, 0], embedBatch = async (texts) => texts.map(() => [1, 0, 0]) } = {}) {
+  class TestStore extends MemoryStore {
+    constructor() {
+      const embedder = { embed, embedBatch, stats: () => ({ size: 0, capacity: 0, hits: 0, misses: 0 }) };
+      super(embedder, { ...CONFIG, ...config }, { info: () => {}, warn: () => {} });
+      this.hydrated = [];
+      this.snippetOnly = [];
+      this.legRuns = 0;
+    }
+    async vectorSearch() { this.legRuns++; return vector; }
+    async textSearch() { return text; }
+    async fuzzySearch() { return fuzzy; }
+    async fetchContentByIds(ids, snippetOnly) {
+      if (!contents) return null;
+      this.hydrated.push(ids);
+      this.snippetOnly.push(snippetOnly);
+      return new Map(ids.map((id) => [id, contents[id]]));
+    }
+  }
+  return new TestStore();
+}
+
+test('search keeps leg content when the backend does not hydrate', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'inline body')] });
+  const [result] = await store.search('q', 5, 0);
+  assert.ok(result.snippet.includes('inline body'));
+});
+
+test('search hydrates content for merged hits only', async () => {
+  const store = makeStore({
+    text: [hit(1, 1), hit(2, 2), hit(3, 3)],
+    contents: { 1: 'body one', 2: 'body two', 3: 'body three' },
+  });
+  const results = await store.search('q', 2, 0);
+  assert.equal(results.length, 2);
+  assert.deepEqual(store.hydrated, [[1, 2]]);
+  assert.ok(results[0].snippet.includes('body one'));
+});
+
+test('only snippet output hydrates with a snippet-length prefix', async () => {
+  const store = makeStore({ text: [hit(1, 1)], contents: { 1: 'body' } });
+  await store.search('q', 5, 0);
+  await store.search('q', 5, 0, undefined, 'full');
+  await store.search('q', 5, 0, undefined, 'section');
+  assert.deepEqual(store.snippetOnly, [true, false, false]);
+});
+
+test('summary search skips hydration', async () => {
+  const store = makeStore({ text: [hit(1, 1)], contents: { 1: 'body' } });
+  await store.search('q', 5, 0, undefined, 'summary');
+  assert.equal(store.hydrated.length, 0);
+});
+
+test('repeated identical search is served from cache', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'body')] });
+  const first = await store.search('q', 5, 0);
+  const second = await store.search('q', 5, 0);
+  assert.equal(store.legRuns, 1);
+  assert.deepEqual(second, first);
+  second[0].snippet = 'mutated';
+  assert.notEqual((await store.search('q', 5, 0))[0].snippet, 'mutated');
+});
+
+test('cache key covers every search argument', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'body')] });
+  await store.search('q', 5, 0);
+  await store.search('q', 6, 0);
+  await store.search('q', 5, 0, { category: 'x' });
+  await store.search('q', 5, 0, undefined, 'summary');
+  assert.equal(store.legRuns, 4);
+});
+
+test('writes through the store invalidate the cache', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'body')] });
+  store.getRecordMeta = async () => ({ category: 'general', deleted_at: null });
+  store.softDeleteRecord = async () => {};
+  await store.search('q', 5, 0);
+  await store.delete({ id: 1 });
+  await store.search('q', 5, 0);
+  assert.equal(store.legRuns, 2);
+});
+
+test('searchCacheTtlMs 0 disables the cache', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'body')], config: { searchCacheTtlMs: 0 } });
+  await store.search('q', 5, 0);
+  await store.search('q', 5, 0);
+  assert.equal(store.legRuns, 2);
+});
+
+test('least recently used query is evicted at searchCacheSize', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'body')], config: { searchCacheSize: 2 } });
+  await store.search('a', 5, 0);
+  await store.search('b', 5, 0);
+  await store.search('a', 5, 0); // refresh a → b is now oldest
+  await store.search('c', 5, 0); // evicts b
+  assert.equal(store.legRuns, 3);
+  await store.search('a', 5, 0);
+  assert.equal(store.legRuns, 3);
+  await store.search('b', 5, 0);
+  assert.equal(store.legRuns, 4);
+});
+
+test('stats counts search hits and misses with latency averages', async () => {
+  const store = makeStore({ text: [hit(1, 1, 'body')] });
+  assert.equal(store.stats().avgCachedSearchMs, null);
+  await store.search('q', 5, 0);
+  await store.search('q', 5, 0);
+  await store.search('other', 5, 0);
+  const stats = store.stats();
+  assert.equal(stats.searchHits, 1);
+  assert.equal(stats.searchMisses, 2);
+  assert.ok(stats.avgCachedSearchMs >= 0);
+  assert.ok(stats.avgUncachedSearchMs >= 0);
+  assert.deepEqual(stats.embedCache, { size: 0, capacity: 0, hits: 0, misses: 0 });
+});
+
+test('search falls back to text legs when the query cannot be embedded', async () => {
+  const store = makeStore({
+    vector: [hit(9, 1, 'vector only')],
+    text: [hit(1, 1, 'text body')],
+    embed: async () => { throw new Error('provider down'); },
+  });
+  const results = await store.search('q', 5, 0);
+  assert.deepEqual(results.map((r) => r.citation), ['shadowdb:memories#1']);
+  assert.equal(store.legRuns, 0);
+  await store.search('q', 5, 0);
+  assert.equal(store.stats().searchHits, 0, 'degraded results are not cached');
+});
+
+test('results of a search whose leg failed are not cached', async () => {
+  for (const leg of ['vectorSearch', 'textSearch', 'fuzzySearch']) {
+    const store = makeStore({ text: [hit(1, 1, 'text body')] });
+    const original = store[leg];
+    store[leg] = async () => { throw new Error('connection reset'); };
+    await store.search('q', 5, 0);
+    store[leg] = original;
+    await store.search('q', 5, 0);
+    assert.equal(store.stats().searchHits, 0, `${leg} failure was cached`);
+  }
+});
+
+test('text legs start before the query embedding resolves', async () => {
+  const order = [];
+  const store = makeStore({
+    text: [hit(1, 1, 'body')],
+    embed: async () => {
+      order.push('embed start');
+      await new Promise((resolve) => setTimeout(resolve, 10));
+      order.push('embed done');
+      return [1, 0, 0];
+    },
+  });
+  const textSearch = store.textSearch.bind(store);
+  store.textSearch = async (...args) => { order.push('text'); return textSearch(...args); };
+  await store.search('q', 5, 0);
+  assert.ok(order.indexOf('text') < order.indexOf('embed done'));
+});
+
+test('embedding request goes out before a synchronous text leg runs', async () => {
+  const order = [];
+  const store = makeStore({
+    embed: async () => { order.push('embed'); return [1, 0, 0]; },
+  });
+  // better-sqlite3 legs finish inside the call, before any await
+  store.textSearch = (() => { order.push('text'); return Promise.resolve([hit(1, 1, 'body')]); });
+  await store.search('q', 5, 0);
+  assert.deepEqual(order, ['embed', 'text']);
+});
+
+test('semantically near query reuses cached results above the threshold', async () => {
+  const vectors = { a: [1, 0, 0], near: [0.99, 0.1, 0], far: [0, 1, 0] };
+  const store = makeStore({
+    text: [hit(1, 1, 'body')],
+    config: { semanticCacheThreshold: 0.97 },
+    embed: async (q) => vectors[q],
+  });
+  await store.search('a', 5, 0);
+  await store.search('near', 5, 0);
+  assert.equal(store.legRuns, 1);
+  assert.equal(store.stats().semanticHits, 1);
+  await store.search('far', 5, 0);
+  await store.search('near', 6, 0);
+  assert.equal(store.legRuns, 3, 'dissimilar query or different arguments miss');
+});
+
+test('semantic cache is off by default', async () => {
+  const vectors = { a: [1, 0, 0], near: [0.99, 0.1, 0] };
+  const store = makeStore({ text: [hit(1, 1, 'body')], embed: async (q) => vectors[q] });
+  await store.search('a', 5, 0);
+  await store.search('near', 5, 0);
+  assert.equal(store.legRuns, 2);
+});
+
+test('searchBatch embeds all queries in one batch and keeps input order', async () => {
+  const batches = [];
+  const store = makeStore({
+    text: [hit(1, 1, 'body')],
+    embedBatch: async (texts) => { batches.push(texts); return texts.map(() => [1, 0, 0]); },
+  });
+  const results = await store.searchBatch(['a', 'b', 'c'], 5, 0);
+  assert.deepEqual(batches, [['a', 'b', 'c']]);
+  assert.equal(results.length, 3);
+  assert.equal(store.legRuns, 3);
+});
+
+test('searchBatch still searches when the batch embed fails', async () => {
+  const store = makeStore({
+    text: [hit(1, 1, 'body')],
+    embedBatch: async () => { throw new Error('provider down'); },
+  });
+  const results = await store.searchBatch(['a', 'b'], 5, 0);
+  assert.equal(results.length, 2);
+  assert.ok(results.every((r) => r.length === 1));
+});
+
+test('dominant FTS hit skips embedding and the vector leg', async () => {
+  let embeds = 0;
+  const text = [{ ...hit(1, 1, 'exact'), rawScore: 0.9 }, { ...hit(2, 2, 'weak'), rawScore: 0.1 }];
+  const store = makeStore({
+    text,
+    config: { ftsDominanceScore: 0.5 },
+    embed: async () => { embeds++; return [1, 0, 0]; },
+  });
+  const results = await store.search('q', 5, 0);
+  assert.equal(results[0].citation, 'shadowdb:memories#1');
+  assert.equal(embeds, 0);
+  assert.equal(store.legRuns, 0);
+});
+
+test('FTS hit without a clear margin still runs every leg', async () => {
+  let embeds = 0;
+  const text = [{ ...hit(1, 1, 'a'), rawScore: 0.9 }, { ...hit(2, 2, 'b'), rawScore: 0.6 }];
+  const store = makeStore({
+    text,
+    config: { ftsDominanceScore: 0.5 },
+    embed: async () => { embeds++; return [1, 0, 0]; },
+  });
+  await store.search('q', 5, 0);
+  assert.equal(embeds, 1);
+  assert.equal(store.legRuns, 1);
+});
+
+test('semantic lookup over long vectors still finds the closest entry', async () => {
+  const dims = 300;
+  const basis = (i) => Array.from({ length: dims }, (_, j) => (j === i ? 1 : 0));
+  const blend = (a, b, w) => a.map((x, j) => x * (1 - w) + b[j] * w);
+  const vectors = {
+    a: basis(0),
+    b: blend(basis(0), basis(250), 0.5),
+    far: basis(200),
+    query: blend(basis(0), basis(250), 0.6),
+  };
+  const store = makeStore({
+    text: [hit(1, 1, 'body')],
+    config: { semanticCacheThreshold: 0.9 },
+    embed: async (q) => vectors[q],
+  });
+  await store.search('far', 5, 0);
+  await store.search('a', 5, 0);
+  await store.search('b', 5, 0);
+  await store.search('query', 5, 0);
+  assert.equal(store.legRuns, 3);
+  assert.equal(store.stats().semanticHits, 1);
+});
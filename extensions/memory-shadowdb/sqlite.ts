@@ -10,6 +10,7 @@
  * Dependencies:
  * - better-sqlite3: synchronous SQLite driver (fast, no async overhead)
  * - sqlite-vec: vector search extension (loaded at runtime)
+ * - vectorlite: optional HNSW index for the vector leg (hnsw option)
  *
  * DESIGN NOTES:
  * - Single-file database: zero config, no server process
@@ -25,12 +26,51 @@
  * - WAL mode for concurrent read safety
  */
 
-import { MemoryStore, type RankedHit, type PrimerRow, type StoreConfig, type StoreLogger } from "./store.js";
-import type { EmbeddingClient } from "./embedder.js";
+import { MemoryStore, SNIPPET_MAX_CHARS, type RankedHit, type PrimerRow, type StoreConfig, type StoreLogger } from "./store.js";
+import { vectorBlob, type EmbeddingClient } from "./embedder.js";
+import type { SearchFilters } from "./types.js";
 
 // better-sqlite3 types
 type Database = any;
 
+/** vectorlite HNSW build parameters (capacity, graph degree, build beam width). */
+const HNSW_MAX_ELEMENTS = 100_000;
+const HNSW_M = 16;
+const HNSW_EF_CONSTRUCTION = 64;
+
+/**
+ * FTS5 rank function for the word-level table: BM25 with per-column weights
+ * (title, content). Titles are short summaries of the record, so a term
+ * there counts double.
+ */
+const FTS_RANK = "bm25(2.0, 1.0)";
+
+/**
+ * int8 form of an embedding for a vec0 int8 column: scaled so the largest
+ * component maps to ±127. The scale differs per vector, which cosine
+ * distance ignores (it only sees direction).
+ */
+function quantizeInt8(embedding: number[]): Uint8Array {
+  let max = 0;
+  for (const x of embedding) max = Math.max(max, Math.abs(x));
+  const scale = max > 0 ? 127 / max : 0;
+  const q = Int8Array.from(embedding, (x) => Math.round(x * scale));
+  return new Uint8Array(q.buffer);
+}
+
+/**
+ * float32 BLOB of an int8 vec0 value, for copying into the HNSW index. The
+ * quantization scale is lost, but the index ranks by cosine, which only
+ * sees direction.
+ */
+function int8ToFloat32Blob(bytes: Uint8Array): Uint8Array {
+  const q = new Int8Array(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  return new Uint8Array(Float32Array.from(q).buffer);
+}
+
+/** Record ids per transaction when copying embeddings into another vector table. */
+const BACKFILL_BATCH = 500;
+
 /**
  * SQLite-backed memory store.
  *
@@ -42,15 +82,52 @@ export class SQLiteStore extends MemoryStore {
   private db: Database = null;
   private dbPath: string;
   private hasVec: boolean = false;
-
+  private int8Vectors: boolean;
+  private binaryCandidates: number;
+  private hnsw: boolean;
+  private hasHnsw: boolean = false;
+  /** True while `<table>_hnsw` holds every stored embedding (see backfillHnsw). */
+  private hnswComplete: boolean = false;
+  private statements = new Map<string, any>();
+
+  /**
+   * @param params.int8Vectors - Keep embeddings as int8 (1 byte per dimension
+   *   instead of 4) in a separate `<table>_vec_i8` vec0 table ranked by cosine
+   *   distance. The vector scan reads a quarter of the bytes. initialize()
+   *   quantizes embeddings already in `<table>_vec` into it (default: false).
+   * @param params.binaryCandidates - When > 0, embeddings are also kept as
+   *   1-bit sign codes in `<table>_vec_bit`, and the vector leg first takes
+   *   this many nearest rows by Hamming distance there, then re-ranks only
+   *   those against the full vectors. Codes for embeddings stored before
+   *   the option was on are filled in by initialize() (default: 0 = off).
+   * @param params.hnsw - Also index embeddings in a vectorlite HNSW table
+   *   (`<table>_hnsw`, graph persisted next to the database file) and answer
+   *   the vector leg from it instead of sqlite-vec's brute-force scan.
+   *   initialize() copies in embeddings stored before the option was on. The
+   *   graph holds at most 100,000 vectors (HNSW_MAX_ELEMENTS); past that, or
+   *   when vectorlite isn't installed, the vector leg uses sqlite-vec. Takes
+   *   precedence over int8Vectors and binaryCandidates for search
+   *   (default: false).
+   */
   constructor(params: {
     dbPath: string;
     embedder: EmbeddingClient;
     config: StoreConfig;
     logger: StoreLogger;
+    int8Vectors?: boolean;
+    binaryCandidates?: number;
+    hnsw?: boolean;
   }) {
     super(params.embedder, params.config, params.logger);
     this.dbPath = params.dbPath;
+    this.int8Vectors = params.int8Vectors ?? false;
+    this.binaryCandidates = Math.max(0, Math.floor(params.binaryCandidates ?? 0));
+    this.hnsw = params.hnsw ?? false;
+  }
+
+  /** vec0 table holding this store's embeddings. */
+  private get vecTable(): string {
+    return this.int8Vectors ? `${this.config.table}_vec_i8` : `${this.config.table}_vec`;
   }
 
   // ==========================================================================
@@ -65,6 +142,12 @@ export class SQLiteStore extends MemoryStore {
     // WAL mode for concurrent reads
     this.db.pragma("journal_mode = WAL");
     this.db.pragma("foreign_keys = ON");
+    // The handle lives for the store's lifetime, so these are paid once.
+    // NORMAL is durable under WAL except for the last commits on power loss;
+    // the mmap window and a 64 MB page cache keep hot pages out of read().
+    this.db.pragma("synchronous = NORMAL");
+    this.db.pragma("mmap_size = 268435456");
+    this.db.pragma("cache_size = -65536");
 
     // Try to load sqlite-vec extension
     try {
@@ -80,6 +163,32 @@ export class SQLiteStore extends MemoryStore {
       );
     }
 
+    // vectorlite: HNSW index for the vector leg (opt-in)
+    if (this.hnsw) {
+      try {
+        // eslint-disable-next-line @typescript-eslint/ban-ts-comment
+        // @ts-ignore — vectorlite is an optional peer dependency; not installed in all environments
+        const vectorlite = await import("vectorlite");
+        this.db.loadExtension(vectorlite.vectorlitePath());
+        const dims = this.embedder.getDimensions?.() ?? 768;
+        // Without an index file the graph would live only in memory
+        const indexPath = `${this.dbPath}.${this.config.table}.hnsw`.replace(/'/g, "''");
+        const indexFile = this.dbPath === ":memory:" ? "" : `, '${indexPath}'`;
+        this.db.exec(`
+          CREATE VIRTUAL TABLE IF NOT EXISTS ${this.config.table}_hnsw USING vectorlite(
+            embedding float32[${dims}] cosine,
+            hnsw(max_elements=${HNSW_MAX_ELEMENTS}, M=${HNSW_M}, ef_construction=${HNSW_EF_CONSTRUCTION})${indexFile}
+          );
+        `);
+        this.hasHnsw = true;
+        this.logger.info("memory-shadowdb: vectorlite HNSW index loaded");
+      } catch (err) {
+        this.logger.warn(
+          `memory-shadowdb: vectorlite not available — using sqlite-vec scan. Install: npm install vectorlite (${err instanceof Error ? err.message : String(err)})`,
+        );
+      }
+    }
+
     // Create tables if they don't exist
     this.db.exec(`
       CREATE TABLE IF NOT EXISTS ${this.config.table} (
@@ -107,6 +216,11 @@ export class SQLiteStore extends MemoryStore {
         title, content, content=${this.config.table}, content_rowid=id
       );
     `);
+    // Stored as the table's default rank, so ORDER BY rank stays on FTS5's
+    // ranked-query path instead of computing bm25() per matching row
+    this.db
+      .prepare(`INSERT INTO ${this.config.table}_fts(${this.config.table}_fts, rank) VALUES ('rank', ?)`)
+      .run(FTS_RANK);
 
     // Trigram FTS5 virtual table for substring/fuzzy search
     this.db.exec(`
@@ -139,14 +253,37 @@ export class SQLiteStore extends MemoryStore {
     // Vector table (if sqlite-vec is available)
     if (this.hasVec) {
       const dims = this.embedder.getDimensions?.() ?? 768;
+      const column = this.int8Vectors ? `int8[${dims}] distance_metric=cosine` : `float[${dims}]`;
       this.db.exec(`
-        CREATE VIRTUAL TABLE IF NOT EXISTS ${this.config.table}_vec USING vec0(
+        CREATE VIRTUAL TABLE IF NOT EXISTS ${this.vecTable} USING vec0(
           id INTEGER PRIMARY KEY,
-          embedding float[${dims}]
+          embedding ${column}
         );
       `);
+      if (this.int8Vectors) this.backfillInt8();
+      if (this.binaryCandidates > 0) {
+        this.db.exec(`
+          CREATE VIRTUAL TABLE IF NOT EXISTS ${this.config.table}_vec_bit USING vec0(
+            id INTEGER PRIMARY KEY,
+            embedding bit[${dims}]
+          );
+        `);
+        // Records embedded before binaryCandidates was turned on have no code
+        // yet, and the Hamming prefilter would never return them
+        const backfilled = this.db.prepare(`
+          INSERT INTO ${this.config.table}_vec_bit (id, embedding)
+          SELECT id, vec_quantize_binary(${this.int8Vectors ? "vec_int8(embedding)" : "vec_f32(embedding)"})
+          FROM ${this.vecTable}
+          WHERE id NOT IN (SELECT id FROM ${this.config.table}_vec_bit)
+        `).run().changes;
+        if (backfilled > 0) {
+          this.logger.info(`memory-shadowdb: backfilled ${backfilled} binary codes into ${this.config.table}_vec_bit`);
+        }
+      }
     }
 
+    if (this.hasHnsw) this.backfillHnsw();
+
     // Primer table
     this.db.exec(`
       CREATE TABLE IF NOT EXISTS primer (
@@ -169,30 +306,156 @@ export class SQLiteStore extends MemoryStore {
     `);
   }
 
+  /**
+   * Quantize embeddings stored before int8Vectors was turned on from the
+   * float `<table>_vec` into `<table>_vec_i8`, in id-ordered batches. Every
+   * read goes to the int8 table (as do the _vec_bit and HNSW backfills), so
+   * without this the vector leg finds nothing until a re-embed.
+   */
+  private backfillInt8(): void {
+    const floatTable = `${this.config.table}_vec`;
+    const exists = this.db.prepare(`SELECT 1 FROM sqlite_master WHERE name = ?`).pluck().get(floatTable);
+    if (!exists) return;
+    const ids = this.db.prepare(`SELECT id FROM ${this.config.table} WHERE id > ? ORDER BY id LIMIT ?`).pluck();
+    const stored = this.db.prepare(`SELECT embedding FROM ${floatTable} WHERE id = ?`).pluck();
+    const quantized = this.db.prepare(`SELECT id FROM ${this.vecTable} WHERE id = ?`).pluck();
+    const insert = this.db.prepare(`INSERT INTO ${this.vecTable} (id, embedding) VALUES (?, vec_int8(?))`);
+    const copyBatch = this.db.transaction((batch: number[]) => {
+      let copied = 0;
+      for (const id of batch) {
+        const blob: Uint8Array | undefined = stored.get(id);
+        if (!blob || quantized.get(id) !== undefined) continue;
+        // Copied first: the Float32Array view needs a 4-byte-aligned offset
+        insert.run(id, quantizeInt8(Array.from(new Float32Array(Uint8Array.from(blob).buffer))));
+        copied++;
+      }
+      return copied;
+    });
+
+    let added = 0;
+    try {
+      let batch: number[] = ids.all(0, BACKFILL_BATCH);
+      while (batch.length > 0) {
+        added += copyBatch(batch);
+        batch = ids.all(batch[batch.length - 1], BACKFILL_BATCH);
+      }
+    } catch (err) {
+      this.logger.warn(
+        `memory-shadowdb: could not copy ${floatTable} into ${this.vecTable} — records without an int8 vector need a re-embed (${err instanceof Error ? err.message : String(err)})`,
+      );
+    }
+    if (added > 0) {
+      this.logger.info(`memory-shadowdb: backfilled ${added} int8 embeddings into ${this.vecTable}`);
+    }
+  }
+
+  /**
+   * Copy embeddings the HNSW index doesn't have yet (stored before hnsw was
+   * turned on) from the vec0 table, in id-ordered batches. The index is only
+   * searched once it holds every embedding: if it fills up or can't be
+   * written, hnswComplete stays false and the vector leg keeps scanning vec0.
+   */
+  private backfillHnsw(): void {
+    if (!this.hasVec) {
+      // No vec0 table to copy from or fall back to
+      this.hnswComplete = true;
+      return;
+    }
+    const ids = this.db.prepare(`SELECT id FROM ${this.config.table} WHERE id > ? ORDER BY id LIMIT ?`).pluck();
+    const stored = this.db.prepare(`SELECT embedding FROM ${this.vecTable} WHERE id = ?`).pluck();
+    const indexed = this.db.prepare(`SELECT rowid FROM ${this.config.table}_hnsw WHERE rowid = ?`).pluck();
+    const insert = this.db.prepare(`INSERT INTO ${this.config.table}_hnsw (rowid, embedding) VALUES (?, ?)`);
+    const copyBatch = this.db.transaction((batch: number[]) => {
+      let copied = 0;
+      for (const id of batch) {
+        const embedding = stored.get(id);
+        if (!embedding || indexed.get(id) !== undefined) continue;
+        insert.run(id, this.int8Vectors ? int8ToFloat32Blob(embedding) : embedding);
+        copied++;
+      }
+      return copied;
+    });
+
+    let added = 0;
+    try {
+      let batch: number[] = ids.all(0, BACKFILL_BATCH);
+      while (batch.length > 0) {
+        added += copyBatch(batch);
+        batch = ids.all(batch[batch.length - 1], BACKFILL_BATCH);
+      }
+    } catch (err) {
+      this.logger.warn(
+        `memory-shadowdb: HNSW index incomplete (holds at most ${HNSW_MAX_ELEMENTS} vectors) — using sqlite-vec scan (${err instanceof Error ? err.message : String(err)})`,
+      );
+      return;
+    }
+    this.hnswComplete = true;
+    if (added > 0) {
+      this.logger.info(`memory-shadowdb: backfilled ${added} embeddings into ${this.config.table}_hnsw`);
+    }
+  }
+
+  /**
+   * Compiled statement for `sql`, prepared on first use and reused after, so
+   * repeat queries skip SQLite's parse and plan. better-sqlite3 statements
+   * stay valid for the handle's lifetime (SQLite re-prepares them itself
+   * after a schema change).
+   */
+  private statement(sql: string): any {
+    let stmt = this.statements.get(sql);
+    if (!stmt) {
+      stmt = this.db.prepare(sql);
+      this.statements.set(sql, stmt);
+    }
+    return stmt;
+  }
+
   // ==========================================================================
   // Search legs
   // ==========================================================================
+  // Legs return ids + metadata only; search() reads content for just the
+  // merged hits via fetchContentByIds() instead of copying it for every
+  // candidate RRF discards.
+
+  /**
+   * Category filter as a rowid prefilter on the leg's virtual table. The
+   * subquery reads the live-row category index, so FTS5 and vec0 only
+   * consider rows in that category — for vec0 this also keeps a rare
+   * category from being filtered out of the top k after the KNN probe.
+   */
+  private categoryPrefilter(rowid: string, filters?: SearchFilters): { clause: string; values: unknown[] } {
+    if (!filters?.category) return { clause: "", values: [] };
+    return {
+      clause: `AND ${rowid} IN (SELECT id FROM ${this.config.table} WHERE category = ? AND deleted_at IS NULL)`,
+      values: [filters.category],
+    };
+  }
 
-  protected async vectorSearch(query: string, embedding: number[], limit: number): Promise<RankedHit[]> {
+  protected async vectorSearch(query: string, embedding: number[], limit: number, filters?: SearchFilters): Promise<RankedHit[]> {
+    if (this.hasHnsw && this.hnswComplete) return this.hnswVectorSearch(embedding, limit, filters);
     if (!this.hasVec) return [];
 
     // sqlite-vec: query the vec0 virtual table, join back to main table for metadata
+    const prefilter = this.categoryPrefilter("v.id", filters);
     const sql = `
-      SELECT m.id, m.content, m.category, m.title, m.record_type, m.created_at,
+      SELECT m.id, m.category, m.title, m.record_type, m.created_at,
              v.distance AS score
-      FROM ${this.config.table}_vec v
+      FROM ${this.vecTable} v
       JOIN ${this.config.table} m ON m.id = v.id
-      WHERE v.embedding MATCH ?
+      WHERE v.embedding MATCH ${this.int8Vectors ? "vec_int8(?)" : "?"}
         AND k = ?
+        ${prefilter.clause}
         AND m.deleted_at IS NULL
       ORDER BY v.distance ASC
     `;
-    const vecBlob = new Float32Array(embedding).buffer;
-    const rows = this.db.prepare(sql).all(new Uint8Array(vecBlob), limit);
+    const vector = this.int8Vectors ? quantizeInt8(embedding) : vectorBlob(embedding);
+    const rows = this.binaryCandidates > 0
+      ? this.binaryVectorSearch(embedding, vector, limit, filters)
+      : this.statement(sql).all(vector, limit, ...prefilter.values);
 
     return rows.map((r: any, idx: number) => ({
       id: r.id,
-      content: r.content,
+      content: "",
       category: r.category,
       title: r.title,
       record_type: r.record_type,
@@ -202,24 +465,85 @@ export class SQLiteStore extends MemoryStore {
     }));
   }
 
-  protected async textSearch(query: string, limit: number): Promise<RankedHit[]> {
-    // FTS5 MATCH with bm25 ranking
+  /**
+   * Vector leg over the vectorlite HNSW graph: an approximate k-NN walk that
+   * touches O(log n) vectors instead of scanning all of them. Distances are
+   * cosine, so 1 - distance is cosine similarity.
+   */
+  private hnswVectorSearch(embedding: number[], limit: number, filters?: SearchFilters): RankedHit[] {
+    const prefilter = this.categoryPrefilter("h.rowid", filters);
+    const sql = `
+      SELECT m.id, m.category, m.title, m.record_type, m.created_at,
+             h.distance AS score
+      FROM ${this.config.table}_hnsw h
+      JOIN ${this.config.table} m ON m.id = h.rowid
+      WHERE knn_search(h.embedding, knn_param(?, ?))
+        ${prefilter.clause}
+        AND m.deleted_at IS NULL
+      ORDER BY h.distance ASC
+    `;
+    const rows = this.statement(sql).all(vectorBlob(embedding), limit, ...prefilter.values);
+    return rows.map((r: any, idx: number) => ({
+      id: r.id,
+      content: "",
+      category: r.category,
+      title: r.title,
+      record_type: r.record_type,
+      created_at: r.created_at,
+      rank: idx + 1,
+      rawScore: 1 - r.score,
+    }));
+  }
+
+  /**
+   * Two-stage vector leg: Hamming distance over the 1-bit codes (32x fewer
+   * bytes than float32) picks candidates, and only those are scored against
+   * the full vectors with the table's own metric, so the final order
+   * matches a single-stage search over the candidate set.
+   */
+  private binaryVectorSearch(embedding: number[], vector: Uint8Array, limit: number, filters?: SearchFilters): any[] {
+    const prefilter = this.categoryPrefilter("id", filters);
+    const distance = this.int8Vectors ? "vec_distance_cosine(v.embedding, vec_int8(?))" : "vec_distance_l2(v.embedding, ?)";
+    const sql = `
+      WITH candidates AS (
+        SELECT id FROM ${this.config.table}_vec_bit
+        WHERE embedding MATCH vec_quantize_binary(?)
+          AND k = ?
+          ${prefilter.clause}
+      )
+      SELECT m.id, m.category, m.title, m.record_type, m.created_at,
+             ${distance} AS score
+      FROM candidates c
+      JOIN ${this.vecTable} v ON v.id = c.id
+      JOIN ${this.config.table} m ON m.id = c.id
+      WHERE m.deleted_at IS NULL
+      ORDER BY score ASC
+      LIMIT ?
+    `;
+    const k = Math.max(this.binaryCandidates, limit);
+    return this.statement(sql).all(vectorBlob(embedding), k, ...prefilter.values, vector, limit);
+  }
+
+  protected async textSearch(query: string, limit: number, filters?: SearchFilters): Promise<RankedHit[]> {
+    // FTS5 MATCH ranked by FTS_RANK (the table's configured rank)
+    const prefilter = this.categoryPrefilter("fts.rowid", filters);
     const sql = `
-      SELECT m.id, m.content, m.category, m.title, m.record_type, m.created_at,
+      SELECT m.id, m.category, m.title, m.record_type, m.created_at,
              -fts.rank AS score
       FROM ${this.config.table}_fts fts
       JOIN ${this.config.table} m ON m.id = fts.rowid
       WHERE ${this.config.table}_fts MATCH ?
+        ${prefilter.clause}
         AND m.deleted_at IS NULL
       ORDER BY fts.rank
       LIMIT ?
     `;
 
     try {
-      const rows = this.db.prepare(sql).all(query, limit);
+      const rows = this.statement(sql).all(query, ...prefilter.values, limit);
       return rows.map((r: any, idx: number) => ({
         id: r.id,
-        content: r.content,
+        content: "",
         category: r.category,
         title: r.title,
         record_type: r.record_type,
@@ -233,19 +557,21 @@ export class SQLiteStore extends MemoryStore {
     }
   }
 
-  protected async fuzzySearch(query: string, limit: number): Promise<RankedHit[]> {
+  protected async fuzzySearch(query: string, limit: number, filters?: SearchFilters): Promise<RankedHit[]> {
     // FTS5 trigram tokenizer — enables substring matching.
     // Unlike pg_trgm, this is boolean (match/no-match) not scored similarity,
     // but combined with BM25 ranking it produces usable fuzzy results.
     // Trigram MATCH requires the query to be at least 3 characters.
     if (query.length < 3) return [];
 
+    const prefilter = this.categoryPrefilter("tri.rowid", filters);
     const sql = `
-      SELECT m.id, m.content, m.category, m.title, m.record_type, m.created_at,
+      SELECT m.id, m.category, m.title, m.record_type, m.created_at,
              -tri.rank AS score
       FROM ${this.config.table}_trigram tri
       JOIN ${this.config.table} m ON m.id = tri.rowid
       WHERE ${this.config.table}_trigram MATCH ?
+        ${prefilter.clause}
         AND m.deleted_at IS NULL
       ORDER BY tri.rank
       LIMIT ?
@@ -254,10 +580,10 @@ export class SQLiteStore extends MemoryStore {
     try {
       // Quote the query for trigram MATCH — wrap in double quotes for literal substring
       const quoted = '"' + query.replace(/"/g, '""') + '"';
-      const rows = this.db.prepare(sql).all(quoted, limit);
+      const rows = this.statement(sql).all(quoted, ...prefilter.values, limit);
       return rows.map((r: any, idx: number) => ({
         id: r.id,
-        content: r.content,
+        content: "",
         category: r.category,
         title: r.title,
         record_type: r.record_type,
@@ -276,7 +602,7 @@ export class SQLiteStore extends MemoryStore {
   // ==========================================================================
 
   async get(id: number): Promise<{ text: string; path: string } | null> {
-    const row = this.db.prepare(
+    const row = this.statement(
       `SELECT id, content, category, title, record_type FROM ${this.config.table} WHERE id = ? AND deleted_at IS NULL`,
     ).get(id);
 
@@ -310,8 +636,8 @@ export class SQLiteStore extends MemoryStore {
       : `SELECT id, substr(content, 1, 200) as content, category, title FROM ${this.config.table} WHERE deleted_at IS NULL ORDER BY id DESC LIMIT 20`;
 
     const rows = category
-      ? this.db.prepare(sql).all(category)
-      : this.db.prepare(sql).all();
+      ? this.statement(sql).all(category)
+      : this.statement(sql).all();
 
     const text = rows
       .map((r: any) => `[${r.id}] ${r.title || r.category || "—"}: ${(r.content || "").slice(0, 120)}`)
@@ -320,9 +646,20 @@ export class SQLiteStore extends MemoryStore {
     return { text: text || "No records found", path: pathQuery };
   }
 
+  protected async fetchContentByIds(ids: number[], snippetOnly = false): Promise<Map<number, string>> {
+    if (ids.length === 0) return new Map();
+    // Ids go in as one JSON array, so each variant is a single cached
+    // statement whatever the hit count
+    const column = snippetOnly ? `substr(content, 1, ${SNIPPET_MAX_CHARS})` : "content";
+    const rows = this.statement(
+      `SELECT id, ${column} AS content FROM ${this.config.table} WHERE id IN (SELECT value FROM json_each(?))`,
+    ).all(JSON.stringify(ids));
+    return new Map(rows.map((r: any) => [r.id, r.content]));
+  }
+
   protected async getPrimerRows(): Promise<PrimerRow[]> {
     try {
-      return this.db.prepare(
+      return this.statement(
         `SELECT key, content FROM primer WHERE enabled = 1 OR enabled IS NULL ORDER BY priority ASC, key ASC`,
       ).all() as PrimerRow[];
     } catch {
@@ -336,7 +673,7 @@ export class SQLiteStore extends MemoryStore {
   // ==========================================================================
 
   protected async findByOperationId(operationId: string): Promise<number | null> {
-    const row = (this.db as any).prepare(
+    const row = this.statement(
       `SELECT id FROM memories WHERE json_extract(metadata, '$.operationId') = ? AND deleted_at IS NULL ORDER BY id ASC LIMIT 1`
     ).get(operationId) as { id: number } | undefined;
     return row?.id ?? null;
@@ -352,7 +689,7 @@ export class SQLiteStore extends MemoryStore {
     parent_id: number | null;
     priority: number;
   }): Promise<number> {
-    const result = this.db.prepare(`
+    const result = this.statement(`
       INSERT INTO ${this.config.table} (content, category, title, tags, record_type, metadata, parent_id, priority)
       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     `).run(params.content, params.category, params.title, JSON.stringify(params.tags), params.record_type,
@@ -390,7 +727,7 @@ export class SQLiteStore extends MemoryStore {
     const off = params.offset ?? 0;
     const contentCol = params.detail_level === "full" || params.detail_level === "snippet" ? ", content" : "";
 
-    const rows = this.db.prepare(`
+    const rows = this.statement(`
       SELECT id, category, title, record_type, priority, parent_id,
              COALESCE(metadata, '{}') as metadata, created_at, COALESCE(tags, '[]') as tags${contentCol}
       FROM ${this.config.table}
@@ -415,55 +752,75 @@ export class SQLiteStore extends MemoryStore {
   }
 
   protected async updateRecord(id: number, patch: Record<string, unknown>): Promise<void> {
-    const setClauses: string[] = [];
-    const values: unknown[] = [];
-
-    for (const [key, value] of Object.entries(patch)) {
-      setClauses.push(`${key} = ?`);
-      values.push(key === "tags" ? JSON.stringify(value) : value);
-    }
-
-    setClauses.push(`updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')`);
+    const values = Object.entries(patch).map(([key, value]) => (key === "tags" ? JSON.stringify(value) : value));
     values.push(id);
 
-    this.db.prepare(
-      `UPDATE ${this.config.table} SET ${setClauses.join(", ")} WHERE id = ?`,
+    this.statement(
+      this.updateSql(Object.keys(patch), () => "?", `updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')`),
     ).run(...values);
   }
 
   protected async softDeleteRecord(id: number): Promise<void> {
-    this.db.prepare(
+    this.statement(
       `UPDATE ${this.config.table} SET deleted_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = ?`,
     ).run(id);
   }
 
   protected async restoreRecord(id: number): Promise<void> {
-    this.db.prepare(
+    this.statement(
       `UPDATE ${this.config.table} SET deleted_at = NULL WHERE id = ?`,
     ).run(id);
   }
 
   protected async fetchExpiredRecords(days: number) {
-    return this.db.prepare(
+    return this.statement(
       `SELECT id, content, category, title, deleted_at FROM ${this.config.table} WHERE deleted_at IS NOT NULL AND deleted_at < datetime('now', '-${days} days')`,
     ).all() as Array<{ id: number; content: string; category: string | null; title: string | null; deleted_at: string }>;
   }
 
   protected async purgeExpiredRecords(days: number): Promise<number> {
-    const result = this.db.prepare(
+    const result = this.statement(
       `DELETE FROM ${this.config.table} WHERE deleted_at IS NOT NULL AND deleted_at < datetime('now', '-${days} days')`,
     ).run();
     return result.changes;
   }
 
   protected async storeEmbedding(id: number, embedding: number[]): Promise<void> {
+    if (this.hasHnsw) {
+      try {
+        // vectorlite has no upsert; replace the node by rowid
+        this.statement(`DELETE FROM ${this.config.table}_hnsw WHERE rowid = ?`).run(id);
+        this.statement(
+          `INSERT INTO ${this.config.table}_hnsw (rowid, embedding) VALUES (?, ?)`,
+        ).run(id, vectorBlob(embedding));
+      } catch (err) {
+        // Index full (HNSW_MAX_ELEMENTS): vec0 below still has every vector
+        if (!this.hasVec) throw err;
+        if (this.hnswComplete) {
+          this.logger.warn(
+            `memory-shadowdb: HNSW index full (${HNSW_MAX_ELEMENTS} vectors) — using sqlite-vec scan (${err instanceof Error ? err.message : String(err)})`,
+          );
+        }
+        this.hnswComplete = false;
+      }
+    }
     if (!this.hasVec) return;
 
     // Upsert into the vec0 virtual table
-    const vecBlob = new Float32Array(embedding).buffer;
-    this.db.prepare(
-      `INSERT OR REPLACE INTO ${this.config.table}_vec (id, embedding) VALUES (?, ?)`,
-    ).run(id, new Uint8Array(vecBlob));
+    if (this.binaryCandidates > 0) {
+      this.statement(
+        `INSERT OR REPLACE INTO ${this.config.table}_vec_bit (id, embedding) VALUES (?, vec_quantize_binary(?))`,
+      ).run(id, vectorBlob(embedding));
+    }
+    if (this.int8Vectors) {
+      this.statement(
+        `INSERT OR REPLACE INTO ${this.vecTable} (id, embedding) VALUES (?, vec_int8(?))`,
+      ).run(id, quantizeInt8(embedding));
+      return;
+    }
+    this.statement(
+      `INSERT OR REPLACE INTO ${this.vecTable} (id, embedding) VALUES (?, ?)`,
+    ).run(id, vectorBlob(embedding));
   }
 
   protected async getRecordMeta(id: number): Promise<{
@@ -472,7 +829,7 @@ export class SQLiteStore extends MemoryStore {
     category: string | null;
     deleted_at: string | Date | null;
   } | null> {
-    return this.db.prepare(
+    return this.statement(
       `SELECT id, content, category, deleted_at FROM ${this.config.table} WHERE id = ?`,
     ).get(id) || null;
   }
@@ -483,7 +840,7 @@ export class SQLiteStore extends MemoryStore {
 
   async ping(): Promise<boolean> {
     try {
-      this.db.prepare("SELECT 1").get();
+      this.statement("SELECT 1").get();
       return true;
     } catch {
       return false;
@@ -492,6 +849,7 @@ export class SQLiteStore extends MemoryStore {
 
   async close(): Promise<void> {
     if (this.db) {
+      this.statements.clear();
       this.db.close();
       this.db = null;
     }
@@ -499,7 +857,7 @@ export class SQLiteStore extends MemoryStore {
 
   async getMetaValue(key: string): Promise<string | null> {
     try {
-      const row = this.db.prepare(
+      const row = this.statement(
         `SELECT value FROM ${this.config.table}_meta WHERE key = ?`,
       ).get(key) as { value: string } | undefined;
       return row?.value ?? null;
@@ -509,14 +867,14 @@ export class SQLiteStore extends MemoryStore {
   }
 
   async setMetaValue(key: string, value: string): Promise<void> {
-    this.db.prepare(`
+    this.statement(`
       INSERT OR REPLACE INTO ${this.config.table}_meta (key, value, updated_at)
       VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
     `).run(key, value);
   }
 
   protected async getRecordBatch(afterId: number, limit: number): Promise<Array<{ id: number; content: string }>> {
-    return this.db.prepare(
+    return this.statement(
       `SELECT id, content FROM ${this.config.table} WHERE deleted_at IS NULL AND id > ? ORDER BY id ASC LIMIT ?`,
     ).all(afterId, limit) as Array<{ id: number; content: string }>;
   }
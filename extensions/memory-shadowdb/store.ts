@@ -53,6 +53,9 @@ export const MAX_CATEGORY_LENGTH = 100;
 /** RRF constant k — standard value from the original RRF paper. */
 export const RRF_K = 60;
 
+/** Characters of content a search snippet shows at most (formatSnippet). */
+export const SNIPPET_MAX_CHARS = 700;
+
 // ============================================================================
 // Types — internal to store layer
 // ============================================================================
@@ -98,6 +101,22 @@ export interface PrimerRow {
   content: string;
 }
 
+/** Cache counters reported by MemoryStore.stats(). */
+export interface StoreStats {
+  primerHits: number;
+  primerMisses: number;
+  searchHits: number;
+  searchMisses: number;
+  /** searchHits served for a different but semantically near query */
+  semanticHits: number;
+  /** Moving average of search() latency when served from cache (ms; null before the first hit) */
+  avgCachedSearchMs: number | null;
+  /** Moving average of search() latency when the backend ran (ms; null before the first miss) */
+  avgUncachedSearchMs: number | null;
+  /** Query-embedding LRU counters from the embedder */
+  embedCache: { size: number; capacity: number; hits: number; misses: number; shortCircuits: number };
+}
+
 /** Logger interface — subset of what OpenClaw provides. */
 export interface StoreLogger {
   info: (msg: string) => void;
@@ -129,6 +148,87 @@ export interface StoreConfig {
    * before formatting. Undefined = reranking disabled.
    */
   reranker?: import("./reranker.js").RerankerConfig;
+  /**
+   * How long getPrimerContext() reuses primer rows before re-reading the DB
+   * (default: 60000ms; 0 = always re-read). The primer table is near-static
+   * identity text, so this saves a round-trip on nearly every agent turn.
+   */
+  primerRowsTtlMs?: number;
+  /**
+   * How long search() serves a repeated identical query from memory
+   * (default: 60000ms; 0 = no result cache). Writes through this store
+   * clear the cache, so the TTL only bounds staleness from other writers.
+   */
+  searchCacheTtlMs?: number;
+  /** Max distinct queries kept in the search result cache (default: 256). */
+  searchCacheSize?: number;
+  /**
+   * Cosine similarity at or above which search() reuses the cached results
+   * of a different query with the same arguments (default: 0 = exact matches
+   * only; e.g. 0.97). Each cache miss then embeds the query before the
+   * lookup, which the embedder LRU absorbs for the search that follows.
+   */
+  semanticCacheThreshold?: number;
+  /**
+   * Backend FTS score (rawScore: ts_rank_cd, MATCH relevance, or negated
+   * bm25 for SQLite) at which a top text hit that also scores at least twice
+   * the runner-up ends the search without embedding the query or running
+   * the vector leg (default: 0 = always run every leg). Enabling it makes
+   * the text leg finish before embedding starts, so searches that do not
+   * short-circuit give up that overlap. Tune it per backend.
+   */
+  ftsDominanceScore?: number;
+}
+
+/** Default TTL for cached primer rows (ms). */
+export const PRIMER_ROWS_TTL_MS = 60_000;
+
+/** Default TTL for cached search results (ms). */
+export const SEARCH_CACHE_TTL_MS = 60_000;
+
+/** Default number of queries kept in the search result cache. */
+export const SEARCH_CACHE_SIZE = 256;
+
+/** Weight of the newest sample in the stats() latency moving averages. */
+const LATENCY_EWMA_ALPHA = 0.2;
+
+/** Copy of `vector` scaled to unit length, so a dot product is cosine similarity. */
+function unitVector(vector: number[]): Float32Array {
+  const unit = Float32Array.from(vector);
+  let norm = 0;
+  for (let i = 0; i < unit.length; i++) norm += unit[i] * unit[i];
+  norm = Math.sqrt(norm) || 1;
+  for (let i = 0; i < unit.length; i++) unit[i] /= norm;
+  return unit;
+}
+
+/** Dimensions summed between early-abort checks in nearestCachedSearch(). */
+const SEMANTIC_SCAN_BLOCK = 64;
+
+/**
+ * tails[b] = norm of unit[b * SEMANTIC_SCAN_BLOCK ..]: by Cauchy-Schwarz, the
+ * most the remaining dimensions can add to a dot product with a unit vector.
+ */
+function blockTailNorms(unit: Float32Array): Float64Array {
+  const blocks = Math.ceil(unit.length / SEMANTIC_SCAN_BLOCK);
+  const tails = new Float64Array(blocks + 1);
+  let sum = 0;
+  for (let b = blocks - 1; b >= 0; b--) {
+    const end = Math.min((b + 1) * SEMANTIC_SCAN_BLOCK, unit.length);
+    for (let i = b * SEMANTIC_SCAN_BLOCK; i < end; i++) sum += unit[i] * unit[i];
+    tails[b] = Math.sqrt(sum);
+  }
+  return tails;
+}
+
+/** One search() result set in the cache. `vector` is kept for semantic lookups. */
+interface CachedSearch {
+  results: SearchResult[];
+  at: number;
+  /** JSON of every search() argument except the query text */
+  args: string;
+  /** Unit-length query embedding (semanticCacheThreshold > 0 only) */
+  vector?: Float32Array;
 }
 
 // ============================================================================
@@ -149,6 +249,32 @@ export abstract class MemoryStore {
   protected config: StoreConfig;
   protected logger: StoreLogger;
 
+  /** Primer rows from the last DB read, reused until primerRowsTtlMs elapses. */
+  private primerRowsCache: { rows: PrimerRow[]; at: number } | null = null;
+
+  /** In-flight primer read shared by concurrent cache misses. */
+  private primerRowsPending: Promise<PrimerRow[]> | null = null;
+
+  /** Recent search() results keyed by their arguments; Map order = LRU order. */
+  private searchCache = new Map<string, CachedSearch>();
+
+  /** Bumped on every invalidation so searches racing a write are not cached. */
+  private searchGeneration = 0;
+
+  /** Cache hit/miss counters and latency averages exposed via stats(). */
+  private counters: Omit<StoreStats, "embedCache"> = {
+    primerHits: 0,
+    primerMisses: 0,
+    searchHits: 0,
+    searchMisses: 0,
+    semanticHits: 0,
+    avgCachedSearchMs: null,
+    avgUncachedSearchMs: null,
+  };
+
+  /** updateSql() text by patch column list. */
+  private updateSqls = new Map<string, string>();
+
   constructor(embedder: EmbeddingClient, config: StoreConfig, logger: StoreLogger) {
     this.embedder = embedder;
     this.config = config;
@@ -180,37 +306,273 @@ export abstract class MemoryStore {
     filters?: SearchFilters,
     detailLevel?: "summary" | "snippet" | "section" | "full",
   ): Promise<SearchResult[]> {
+    const started = performance.now();
+    const ttl = this.config.searchCacheTtlMs ?? SEARCH_CACHE_TTL_MS;
+    const size = this.config.searchCacheSize ?? SEARCH_CACHE_SIZE;
+    if (ttl <= 0 || size <= 0) {
+      const { results } = await this.searchUncached(query, maxResults, minScore, filters, detailLevel);
+      this.recordSearch(false, started);
+      return results;
+    }
+
+    const args = JSON.stringify([maxResults, minScore, filters ?? null, detailLevel || "snippet"]);
+    const key = `${query}\0${args}`;
+    const cached = this.searchCache.get(key);
+    if (cached && Date.now() - cached.at < ttl) {
+      // Re-insert to mark as most recently used
+      this.searchCache.delete(key);
+      this.searchCache.set(key, cached);
+      this.logger.info(`memory-shadowdb: search cache hit — query="${query.slice(0, 80)}"`);
+      const results = cached.results.map((r) => ({ ...r }));
+      this.recordSearch(true, started);
+      return results;
+    }
+
+    const threshold = this.config.semanticCacheThreshold ?? 0;
+    let vector: Float32Array | undefined;
+    if (threshold > 0) {
+      try {
+        vector = unitVector(await this.embedder.embed(query, "query"));
+      } catch {
+        // searchUncached retries the embed and logs the failure
+      }
+      const near = vector && this.nearestCachedSearch(vector, args, ttl, threshold);
+      if (near) {
+        this.searchCache.delete(near.key);
+        this.searchCache.set(near.key, near.entry);
+        this.logger.info(`memory-shadowdb: semantic search cache hit — query="${query.slice(0, 80)}", similarity=${near.similarity.toFixed(3)}`);
+        const results = near.entry.results.map((r) => ({ ...r }));
+        this.counters.semanticHits++;
+        this.recordSearch(true, started);
+        return results;
+      }
+    }
+
+    const generation = this.searchGeneration;
+    const { results, complete } = await this.searchUncached(query, maxResults, minScore, filters, detailLevel);
+    // Don't cache results missing the vector leg, or missing a write that
+    // landed while the legs ran
+    if (complete && generation === this.searchGeneration) {
+      this.searchCache.delete(key);
+      this.searchCache.set(key, { results: results.map((r) => ({ ...r })), at: Date.now(), args, vector });
+      while (this.searchCache.size > size) {
+        this.searchCache.delete(this.searchCache.keys().next().value as string);
+      }
+    }
+    this.recordSearch(false, started);
+    return results;
+  }
+
+  /**
+   * Run search() for several queries at once.
+   *
+   * All query embeddings are fetched up front with one embedBatch() request,
+   * which seeds the embedder LRU, so each search() below reuses its vector
+   * instead of calling the provider. The searches then run concurrently. If
+   * the batch embed fails, each search() embeds (or degrades) on its own.
+   *
+   * @returns One result list per query, in input order
+   */
+  async searchBatch(
+    queries: string[],
+    maxResults: number,
+    minScore: number,
+    filters?: SearchFilters,
+    detailLevel?: "summary" | "snippet" | "section" | "full",
+  ): Promise<SearchResult[][]> {
+    if (queries.length > 1) {
+      try {
+        await this.embedder.embedBatch(queries, "query");
+      } catch (err) {
+        this.logger.warn(`memory-shadowdb: searchBatch embedding failed, embedding per query: ${err instanceof Error ? err.message : String(err)}`);
+      }
+    }
+    return Promise.all(queries.map((query) => this.search(query, maxResults, minScore, filters, detailLevel)));
+  }
+
+  /**
+   * Cache hit/miss counters for the primer, search and embedding caches,
+   * plus moving-average search latency split by cache outcome. Cheap to
+   * call; intended for logging when tuning cache sizes and TTLs.
+   */
+  stats(): StoreStats {
+    return { ...this.counters, embedCache: this.embedder.stats() };
+  }
+
+  /**
+   * Fresh cache entry with the same non-query arguments whose query
+   * embedding is most similar to `vector`, if it reaches `threshold`.
+   * A linear scan: the cache holds at most searchCacheSize entries.
+   *
+   * Each dot product is summed in blocks, and abandoned as soon as the
+   * partial sum plus the most the remaining dimensions could add (the
+   * product of both vectors' remaining norms) can no longer reach the
+   * threshold or the best match so far. Unrelated queries usually drop out
+   * after the first block.
+   */
+  private nearestCachedSearch(
+    vector: Float32Array,
+    args: string,
+    ttl: number,
+    threshold: number,
+  ): { key: string; entry: CachedSearch; similarity: number } | null {
+    const now = Date.now();
+    const n = vector.length;
+    const tails = blockTailNorms(vector);
+    let best: { key: string; entry: CachedSearch; similarity: number } | null = null;
+    scan: for (const [key, entry] of this.searchCache) {
+      if (!entry.vector || entry.args !== args || now - entry.at >= ttl) continue;
+      if (entry.vector.length !== n) continue;
+      const cached = entry.vector;
+      const floor = best ? Math.max(threshold, best.similarity) : threshold;
+      let similarity = 0;
+      let cachedHead = 0;
+      for (let start = 0, b = 1; start < n; start += SEMANTIC_SCAN_BLOCK, b++) {
+        const end = Math.min(start + SEMANTIC_SCAN_BLOCK, n);
+        // Four independent accumulators keep the adds from serializing on
+        // one register, which is the bulk of a scalar dot product's cost
+        let s0 = 0, s1 = 0, s2 = 0, s3 = 0;
+        let i = start;
+        for (; i + 3 < end; i += 4) {
+          s0 += vector[i] * cached[i];
+          s1 += vector[i + 1] * cached[i + 1];
+          s2 += vector[i + 2] * cached[i + 2];
+          s3 += vector[i + 3] * cached[i + 3];
+          cachedHead += cached[i] * cached[i] + cached[i + 1] * cached[i + 1]
+            + cached[i + 2] * cached[i + 2] + cached[i + 3] * cached[i + 3];
+        }
+        for (; i < end; i++) {
+          s0 += vector[i] * cached[i];
+          cachedHead += cached[i] * cached[i];
+        }
+        similarity += (s0 + s1) + (s2 + s3);
+        // 1e-6 absorbs float32 rounding in the unit vectors' norms
+        const bound = similarity + tails[b] * Math.sqrt(Math.max(0, 1 - cachedHead)) + 1e-6;
+        if (end < n && bound < floor) continue scan;
+      }
+      if (similarity >= threshold && (!best || similarity > best.similarity)) {
+        best = { key, entry, similarity };
+      }
+    }
+    return best;
+  }
+
+  /** Count one search() call and fold its latency into the matching average. */
+  private recordSearch(cached: boolean, started: number): void {
+    const ms = performance.now() - started;
+    const field = cached ? "avgCachedSearchMs" : "avgUncachedSearchMs";
+    const prev = this.counters[field];
+    this.counters[field] = prev === null ? ms : prev + LATENCY_EWMA_ALPHA * (ms - prev);
+    if (cached) this.counters.searchHits++;
+    else this.counters.searchMisses++;
+  }
+
+  /**
+   * Drop cached search results so the next search() hits the backend.
+   * Called by write/update/delete/undelete; call it after out-of-band edits.
+   */
+  invalidateSearchCache(): void {
+    this.searchCache.clear();
+    this.searchGeneration++;
+  }
+
+  /**
+   * search() without the result cache — embed, run legs, merge, rerank, format.
+   * If the query can't be embedded the text legs still run, and a leg that
+   * throws contributes no hits; `complete` is then false so the degraded
+   * results aren't cached.
+   */
+  private async searchUncached(
+    query: string,
+    maxResults: number,
+    minScore: number,
+    filters?: SearchFilters,
+    detailLevel?: "summary" | "snippet" | "section" | "full",
+  ): Promise<{ results: SearchResult[]; complete: boolean }> {
     const searchStart = Date.now();
     this.logger.info(`memory-shadowdb: search start — query="${query.slice(0, 80)}", maxResults=${maxResults}, minScore=${minScore}, filters=${filters ? JSON.stringify(filters) : "none"}, detailLevel=${detailLevel || "snippet"}`);
 
-    const embedStart = Date.now();
-    const embedding = await this.embedder.embed(query, "query");
-    const embedMs = Date.now() - embedStart;
-    this.logger.info(`memory-shadowdb: embedding generated in ${embedMs}ms (dims=${embedding.length})`);
-
     const oversample = maxResults * 5;
 
-    // Run all search legs in parallel — backends return [] for unsupported signals
+    const embedQuery = () =>
+      this.embedder.embed(query, "query").catch((err) => {
+        this.logger.warn(`memory-shadowdb: query embedding failed, searching text legs only: ${err instanceof Error ? err.message : String(err)}`);
+        return null;
+      });
+
+    // Exact-match short-circuit: a dominant FTS hit (e.g. a rare proper
+    // noun) ranks first regardless, so embedding + the vector leg are skipped
+    const dominance = this.config.ftsDominanceScore ?? 0;
+
+    // Without that gate the embedding request goes out first. A synchronous
+    // driver (better-sqlite3) runs the text legs to completion inside the
+    // calls below, so the request must already be in flight to overlap them.
     const legStart = Date.now();
+    let embedStart = legStart;
+    const embedPending = dominance > 0 ? null : embedQuery();
+
+    // Text and fuzzy legs don't need the embedding, so they run while the
+    // query is embedded; only the vector leg waits for it.
+    // Backends return [] for unsupported signals. A leg that throws
+    // contributes nothing, and legFailed keeps the result out of the cache.
+    let legFailed = false;
+    const ftsPending = this.textSearch(query, oversample, filters).catch((err) => {
+      legFailed = true;
+      this.logger.warn(`memory-shadowdb: textSearch failed: ${err instanceof Error ? err.message : String(err)}`);
+      return [] as RankedHit[];
+    });
+    const fuzzyPending = this.fuzzySearch(query, oversample, filters).catch((err) => {
+      legFailed = true;
+      this.logger.warn(`memory-shadowdb: fuzzySearch failed: ${err instanceof Error ? err.message : String(err)}`);
+      return [] as RankedHit[];
+    });
+
+    let ftsDominant = false;
+    if (dominance > 0) {
+      const fts = await ftsPending;
+      const top = fts[0]?.rawScore ?? 0;
+      ftsDominant = top >= dominance && top >= 2 * (fts[1]?.rawScore ?? 0);
+      if (ftsDominant) {
+        this.logger.info(`memory-shadowdb: FTS top hit dominates (score=${top}), skipping embedding and vector leg`);
+      }
+    }
+
+    let embedding: number[] | null = null;
+    if (embedPending) {
+      embedding = await embedPending;
+    } else if (!ftsDominant) {
+      embedStart = Date.now();
+      embedding = await embedQuery();
+    }
+    const embedMs = Date.now() - embedStart;
+    if (embedding) {
+      this.logger.info(`memory-shadowdb: embedding generated in ${embedMs}ms (dims=${embedding.length})`);
+    }
+
     const [vectorHits, ftsHits, fuzzyHits] = await Promise.all([
-      this.vectorSearch(query, embedding, oversample, filters).catch((err) => {
+      (embedding ? this.vectorSearch(query, embedding, oversample, filters) : Promise.resolve([] as RankedHit[])).catch((err) => {
+        legFailed = true;
         this.logger.warn(`memory-shadowdb: vectorSearch failed: ${err instanceof Error ? err.message : String(err)}`);
         return [] as RankedHit[];
       }),
-      this.textSearch(query, oversample, filters).catch((err) => {
-        this.logger.warn(`memory-shadowdb: textSearch failed: ${err instanceof Error ? err.message : String(err)}`);
-        return [] as RankedHit[];
-      }),
-      this.fuzzySearch(query, oversample, filters).catch((err) => {
-        this.logger.warn(`memory-shadowdb: fuzzySearch failed: ${err instanceof Error ? err.message : String(err)}`);
-        return [] as RankedHit[];
-      }),
+      ftsPending,
+      fuzzyPending,
     ]);
     const legMs = Date.now() - legStart;
     this.logger.info(`memory-shadowdb: search legs completed in ${legMs}ms — vector=${vectorHits.length}, fts=${ftsHits.length}, fuzzy=${fuzzyHits.length}`);
 
     // Merge via RRF
     const merged = mergeRRF(vectorHits, ftsHits, fuzzyHits, maxResults, minScore, this.config);
+
+    // Backends whose legs skip `content` hydrate just the merged hits here —
+    // summary output never shows content, so it only needs it for reranking
+    if (merged.length > 0 && (detailLevel !== "summary" || this.config.reranker?.enabled)) {
+      const snippetOnly = (detailLevel || "snippet") === "snippet" && !this.config.reranker?.enabled;
+      const contents = await this.fetchContentByIds(merged.map((h) => h.id), snippetOnly);
+      if (contents) {
+        for (const hit of merged) hit.content = contents.get(hit.id) ?? hit.content;
+      }
+    }
     // Rerank: send top rerankTopK RRF candidates through cross-encoder
     // Degrades gracefully — if reranker is down/slow, returns RRF order unchanged
     const rerankStart = Date.now();
@@ -269,7 +631,7 @@ export abstract class MemoryStore {
     const level = detailLevel || "snippet";
 
     // Format as SearchResult[]
-    return scoredHits.map((hit) => {
+    const results = scoredHits.map((hit): SearchResult => {
       let snippet: string;
       if (level === "summary") {
         // Summary: title + category + tags + metadata only, NO content
@@ -303,6 +665,7 @@ export abstract class MemoryStore {
         citation: `shadowdb:${this.config.table}#${hit.id}`,
       };
     });
+    return { results, complete: !legFailed && (embedding !== null || ftsDominant) };
   }
 
   /**
@@ -512,8 +875,8 @@ export abstract class MemoryStore {
     truncated: boolean;
   } | null> {
     const primerStart = Date.now();
-    const rows = await this.getPrimerRows();
-    this.logger.info(`memory-shadowdb: getPrimerContext — ${rows.length} rows from DB, maxChars=${maxChars}`);
+    const { rows, cached } = await this.loadPrimerRows();
+    this.logger.info(`memory-shadowdb: getPrimerContext — ${rows.length} rows from ${cached ? "cache" : "DB"}, maxChars=${maxChars}`);
     if (rows.length === 0) return null;
 
     // Format each row as a markdown section: ## {key}\n{content}
@@ -574,6 +937,43 @@ export abstract class MemoryStore {
     return { text, digest, totalChars: fullText.length, rowCount: formatted.length, includedCount: included.length, skippedKeys, truncated };
   }
 
+  /**
+   * Drop cached primer rows so the next getPrimerContext() re-reads the DB.
+   * Call after editing the primer table out-of-band (admin flows, migrations).
+   */
+  invalidatePrimerCache(): void {
+    this.primerRowsCache = null;
+    this.primerRowsPending = null;
+  }
+
+  /**
+   * Primer rows, served from cache while younger than primerRowsTtlMs.
+   * Misses while a read is in flight (e.g. several sessions starting at
+   * once) await that read; a read that an invalidation overtook is returned
+   * to its callers but not cached.
+   */
+  private async loadPrimerRows(): Promise<{ rows: PrimerRow[]; cached: boolean }> {
+    const ttl = this.config.primerRowsTtlMs ?? PRIMER_ROWS_TTL_MS;
+    const now = Date.now();
+    if (ttl > 0 && this.primerRowsCache && now - this.primerRowsCache.at < ttl) {
+      this.counters.primerHits++;
+      return { rows: this.primerRowsCache.rows, cached: true };
+    }
+    this.counters.primerMisses++;
+    if (!this.primerRowsPending) {
+      const pending: Promise<PrimerRow[]> = this.getPrimerRows()
+        .then((rows) => {
+          if (this.primerRowsPending === pending) this.primerRowsCache = ttl > 0 ? { rows, at: now } : null;
+          return rows;
+        })
+        .finally(() => {
+          if (this.primerRowsPending === pending) this.primerRowsPending = null;
+        });
+      this.primerRowsPending = pending;
+    }
+    return { rows: await this.primerRowsPending, cached: false };
+  }
+
   /**
    * Decay confidence on stale graph edges.
    *
@@ -714,6 +1114,8 @@ export abstract class MemoryStore {
       this.logger.info(`memory-shadowdb: write embed — id=${newId}, success=${embedded}, ${embedMs}ms`);
     }
 
+    this.invalidateSearchCache();
+
     const totalMs = Date.now() - writeStart;
     const path = `shadowdb/${category}/${newId}`;
     this.logger.info(`memory-shadowdb: write complete — id=${newId}, embedded=${embedded}, ${totalMs}ms (insert=${insertMs}ms)`);
@@ -795,6 +1197,7 @@ export abstract class MemoryStore {
       embedded = await this.tryEmbed(params.id, patch.content as string);
       this.logger.info(`memory-shadowdb: update embed — id=${params.id}, success=${embedded}, ${Date.now() - embedStart}ms`);
     }
+    this.invalidateSearchCache();
 
     const totalMs = Date.now() - updateStart;
     const category = (patch.category as string) || existing.category || "general";
@@ -831,6 +1234,7 @@ export abstract class MemoryStore {
 
     this.logger.info(`memory-shadowdb: delete — id=${params.id}, category="${category}"`);
     await this.softDeleteRecord(params.id);
+    this.invalidateSearchCache();
 
     const purgeNote = this.config.purgeAfterDays > 0
       ? ` Permanent removal in ${this.config.purgeAfterDays} days.`
@@ -864,6 +1268,7 @@ export abstract class MemoryStore {
 
     this.logger.info(`memory-shadowdb: undelete — id=${params.id}, category="${category}"`);
     await this.restoreRecord(params.id);
+    this.invalidateSearchCache();
 
     return {
       ok: true, operation: "write", id: params.id, path, embedded: false,
@@ -983,6 +1388,9 @@ export abstract class MemoryStore {
   /**
    * Re-embed all non-deleted records with the current embedding configuration.
    * Cursor-based iteration to keep memory bounded. Errors are logged and skipped.
+   *
+   * Each page is embedded with one embedBatch() request. If the batch fails,
+   * that page is retried record-by-record so one bad record can't sink 99 good ones.
    */
   async reembedAll(onProgress?: (done: number, total: number) => void): Promise<{ success: number; errors: number }> {
     let lastId = 0;
@@ -994,9 +1402,17 @@ export abstract class MemoryStore {
       const batch = await this.getRecordBatch(lastId, batchSize);
       if (batch.length === 0) break;
 
-      for (const row of batch) {
+      let embeddings: number[][] | null = null;
+      try {
+        embeddings = await this.embedder.embedBatch(batch.map((row) => row.content), "document");
+      } catch (err) {
+        const message = err instanceof Error ? err.message : String(err);
+        this.logger.warn(`memory-shadowdb: batch re-embed failed after id ${lastId}, retrying per record: ${message}`);
+      }
+
+      for (const [i, row] of batch.entries()) {
         try {
-          const embedding = await this.embedder.embed(row.content, "document");
+          const embedding = embeddings ? embeddings[i] : await this.embedder.embed(row.content, "document");
           await this.storeEmbedding(row.id, embedding);
           success++;
         } catch (err) {
@@ -1012,6 +1428,7 @@ export abstract class MemoryStore {
       }
     }
 
+    this.invalidateSearchCache();
     return { success, errors };
   }
 
@@ -1031,7 +1448,7 @@ export abstract class MemoryStore {
     record_type?: string | null;
     created_at?: Date | string | null;
   }): string {
-    const maxChars = 700;
+    const maxChars = SNIPPET_MAX_CHARS;
     const header = [
       row.category || null,
       row.created_at ? formatRelativeAge(row.created_at) : null,
@@ -1168,6 +1585,21 @@ export abstract class MemoryStore {
   /** Fetch primer rows ordered by priority. */
   protected abstract getPrimerRows(): Promise<PrimerRow[]>;
 
+  /**
+   * Fetch content for the given record ids, keyed by id.
+   *
+   * Backends whose search legs leave `content` empty (so oversampled rows
+   * that RRF discards never cross the wire) override this; search() calls
+   * it once for the merged hits. Default null = legs already carry content.
+   *
+   * `snippetOnly` is set when the caller only needs the first
+   * SNIPPET_MAX_CHARS (snippet output, no reranker); backends may then
+   * return a stored prefix instead of the full text.
+   */
+  protected async fetchContentByIds(_ids: number[], _snippetOnly = false): Promise<Map<number, string> | null> {
+    return null;
+  }
+
   // --- Write operations (raw DB, no validation — base class validates first) ---
 
   /** Insert a new record, return the new ID. */
@@ -1215,6 +1647,28 @@ export abstract class MemoryStore {
   /** Update record fields by ID. */
   protected abstract updateRecord(id: number, patch: Record<string, unknown>): Promise<void>;
 
+  /**
+   * `UPDATE <table> SET col = <p>, ...[, extraSet] WHERE id = <p>` for a patch
+   * with these columns, assembled once per column list and reused after that.
+   * update() only patches a fixed set of fields, so there are few shapes, and
+   * identical text per shape lets each backend's statement cache hit.
+   *
+   * @param columns     - Patch keys, in the order their values are bound
+   * @param placeholder - Backend parameter marker for 1-based position i
+   * @param extraSet    - Extra assignment appended to SET (e.g. updated_at)
+   */
+  protected updateSql(columns: string[], placeholder: (i: number) => string, extraSet?: string): string {
+    const key = columns.join(",");
+    let sql = this.updateSqls.get(key);
+    if (sql === undefined) {
+      const sets = columns.map((column, i) => `${column} = ${placeholder(i + 1)}`);
+      if (extraSet) sets.push(extraSet);
+      sql = `UPDATE ${this.config.table} SET ${sets.join(", ")} WHERE id = ${placeholder(columns.length + 1)}`;
+      this.updateSqls.set(key, sql);
+    }
+    return sql;
+  }
+
   /** Set deleted_at = now() on a record. */
   protected abstract softDeleteRecord(id: number): Promise<void>;
 
@@ -2,7 +2,7 @@
  * update-validation.test.mjs — Unit tests for update() input validation
  *
  * Tests: empty patch rejection, deleted record guard,
- * record-not-found, priority clamping.
+ * record-not-found, priority clamping, updateSql() text per patch shape.
  */
 
 import test from 'node:test';
@@ -56,3 +56,11 @@ test('update() clamps priority to 1-10 range', async () => {
   await store.update({ id: 1, priority: -3 });
   assert.equal(store.getLastPatch().priority, 1);
 });
+
+test('updateSql() builds each patch shape once with backend placeholders', () => {
+  const store = makeStore();
+  const pg = store.updateSql(['title', 'tags'], (i) => `$${i}`, 'updated_at = NOW()');
+  assert.equal(pg, 'UPDATE memories SET title = $1, tags = $2, updated_at = NOW() WHERE id = $3');
+  assert.equal(store.updateSql(['title', 'tags'], () => { throw new Error('rebuilt'); }), pg);
+  assert.equal(store.updateSql(['tags'], () => '?'), 'UPDATE memories SET tags = ? WHERE id = ?');
+});
@@ -15,6 +15,9 @@ CREATE TABLE IF NOT EXISTS primer (
   updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+-- Matches getPrimerRows() ordering (migration 008)
+CREATE INDEX IF NOT EXISTS primer_priority_key_idx ON primer (priority, key);
+
 -- Main memories table — the knowledge base
 CREATE TABLE IF NOT EXISTS memories (
   id BIGSERIAL PRIMARY KEY,
@@ -30,6 +33,8 @@ CREATE TABLE IF NOT EXISTS memories (
   fts TSVECTOR GENERATED ALWAYS AS (
     to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))
   ) STORED,
+  -- Inline prefix for result projections; avoids detoasting content (migration 005)
+  content_snippet TEXT GENERATED ALWAYS AS (left(content, 800)) STORED,
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
   updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
   deleted_at TIMESTAMPTZ DEFAULT NULL,
@@ -38,17 +43,38 @@ CREATE TABLE IF NOT EXISTS memories (
 
 -- Indexes
 CREATE INDEX IF NOT EXISTS memories_category_idx ON memories(category);
+-- Category filters and listings over live rows (migration 011)
+CREATE INDEX IF NOT EXISTS memories_category_active_idx ON memories (category, id DESC) WHERE deleted_at IS NULL;
 CREATE INDEX IF NOT EXISTS memories_created_at_idx ON memories(created_at DESC);
 CREATE INDEX IF NOT EXISTS memories_deleted_at_idx ON memories(deleted_at) WHERE deleted_at IS NOT NULL;
-CREATE INDEX IF NOT EXISTS memories_fts_idx ON memories USING GIN (fts);
+CREATE INDEX IF NOT EXISTS memories_fts_active_idx ON memories USING GIN (fts) WHERE deleted_at IS NULL;
 CREATE INDEX IF NOT EXISTS memories_content_trgm_idx ON memories USING GIN (content gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS memories_tags_idx ON memories USING GIN (tags);
 CREATE INDEX IF NOT EXISTS memories_metadata_idx ON memories USING GIN (metadata jsonb_path_ops);
 CREATE INDEX IF NOT EXISTS memories_parent_id_idx ON memories(parent_id) WHERE parent_id IS NOT NULL;
 CREATE INDEX IF NOT EXISTS memories_priority_idx ON memories(priority);
-CREATE INDEX IF NOT EXISTS memories_embedding_hnsw_idx
+-- Live rows only: search legs always filter deleted_at IS NULL (migration 007)
+CREATE INDEX IF NOT EXISTS memories_embedding_active_hnsw_idx
   ON memories USING hnsw (embedding vector_cosine_ops)
-  WHERE embedding IS NOT NULL;
+  WHERE embedding IS NOT NULL AND deleted_at IS NULL;
+
+-- Semantic result cache for scripts/hybrid-search.py (migration 009)
+CREATE TABLE IF NOT EXISTS query_cache (
+  id BIGSERIAL PRIMARY KEY,
+  qemb vector(768) NOT NULL,
+  args TEXT NOT NULL,
+  results JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS query_cache_qemb_hnsw_idx ON query_cache USING hnsw (qemb vector_cosine_ops);
+CREATE INDEX IF NOT EXISTS query_cache_args_created_idx ON query_cache (args, created_at);
+
+-- Bumped once per write statement on memories; query_cache entries carry it (migration 009)
+CREATE TABLE IF NOT EXISTS memories_generation (
+  id INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  gen BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO memories_generation (id) VALUES (1) ON CONFLICT DO NOTHING;
 
 -- Auto-update timestamps
 CREATE OR REPLACE FUNCTION shadowdb_set_updated_at()
@@ -70,3 +96,23 @@ CREATE TRIGGER memories_set_updated_at
 BEFORE UPDATE ON memories
 FOR EACH ROW
 EXECUTE FUNCTION shadowdb_set_updated_at();
+
+CREATE OR REPLACE FUNCTION shadowdb_bump_memories_generation()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE memories_generation SET gen = gen + 1 WHERE id = 1;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS memories_bump_generation ON memories;
+CREATE TRIGGER memories_bump_generation
+AFTER INSERT OR UPDATE OR DELETE ON memories
+FOR EACH STATEMENT
+EXECUTE FUNCTION shadowdb_bump_memories_generation();
+
+DROP TRIGGER IF EXISTS memories_bump_generation_truncate ON memories;
+CREATE TRIGGER memories_bump_generation_truncate
+AFTER TRUNCATE ON memories
+FOR EACH STATEMENT
+EXECUTE FUNCTION shadowdb_bump_memories_generation();
@@ -9,6 +9,7 @@ Usage:
     python3 contact-import.py --test        # Run tests
 """
 
+import heapq
 import json
 import subprocess
 import sys
@@ -28,10 +29,12 @@ def load_contact_graph():
 def check_contact_exists(name):
     """Check if contact already exists in ShadowDB."""
     try:
+        # stdout stays bytes: json.loads decodes UTF-8 itself, so the
+        # output is not first decoded into a str copy
         result = subprocess.run(
             ['memory_search', '--query', name, '--maxResults', '5', '--category', 'contacts'],
+            stdin=subprocess.DEVNULL,
             capture_output=True,
-            text=True,
             timeout=10
         )
         
@@ -133,7 +136,9 @@ def import_contact(contact, dry_run=False):
              '--metadata', json.dumps(metadata),
              '--tags', json.dumps(['contact', 'imported']),
              '--record_type', 'document'],
-            capture_output=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,  # only stderr is ever read
+            stderr=subprocess.PIPE,
             text=True,
             timeout=15
         )
@@ -158,10 +163,11 @@ def preview_import():
     print(f"Contacts with >= {MIN_INTERACTIONS} interactions: {len(contacts)}")
     print(f"\nTop 20 by interactions:\n")
     
-    # Sort by interactions descending
-    sorted_contacts = sorted(contacts, key=lambda c: c.get('total_interactions', 0), reverse=True)
+    # Top 20 by interactions descending; nlargest keeps a 20-entry heap
+    # instead of sorting every contact
+    top_contacts = heapq.nlargest(20, contacts, key=lambda c: c.get('total_interactions', 0))
     
-    for i, contact in enumerate(sorted_contacts[:20], 1):
+    for i, contact in enumerate(top_contacts, 1):
         name = contact.get('name', 'Unknown')
         total = contact.get('total_interactions', 0)
         org = contact.get('organization', 'N/A')
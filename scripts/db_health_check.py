@@ -25,6 +25,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import TypedDict, Optional
 
+try:
+    # Optional: with psycopg2 installed the stats queries run in-process
+    # instead of through a psql subprocess (see run_queries)
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
 # ---------------------------------------------------------------------------
 # Configuration — all from env vars, no hardcoded PII
 # ---------------------------------------------------------------------------
@@ -36,10 +43,30 @@ _WORKSPACE  = Path(os.environ.get("SHADOWDB_WORKSPACE",
                                    str(Path.home() / ".openclaw" / "workspace")))
 
 BASELINE_FILE = _WORKSPACE / "db-baseline.json"
-DB_CMD = (
-    f"PGDATABASE={_DB_NAME} PGHOST={_DB_HOST} "
-    f"PGPORT={_DB_PORT} PGUSER={_DB_USER} psql -t -A -c"
-)
+DB_CMD = ["psql", "-X", "-q", "-t", "-A", "-f", "-"]
+DB_ENV = {
+    **os.environ,
+    "PGDATABASE": _DB_NAME,
+    "PGHOST": _DB_HOST,
+    "PGPORT": _DB_PORT,
+    "PGUSER": _DB_USER,
+}
+# Echoed after each statement so one psql session's output can be split per query
+QUERY_END = "__shadowdb_query_end__"
+
+STATS_QUERIES = {
+    "total_records": "SELECT COUNT(*) FROM memories",
+    "by_category": "SELECT category, COUNT(*) FROM memories GROUP BY category",
+    "recent_24h": "SELECT COUNT(*) FROM memories WHERE created_at > NOW() - INTERVAL '24 hours'",
+    "last_record": "SELECT title, created_at FROM memories ORDER BY created_at DESC LIMIT 1",
+    "connected": "SELECT 1",
+    "id_gaps": (
+        "SELECT COUNT(*) FROM generate_series("
+        "(SELECT MIN(id) FROM memories), (SELECT MAX(id) FROM memories)"
+        ") AS s(id) WHERE NOT EXISTS (SELECT 1 FROM memories WHERE id = s.id)"
+    ),
+    "id_range": "SELECT MIN(id), MAX(id) FROM memories",
+}
 
 
 # ---------------------------------------------------------------------------
@@ -67,49 +94,114 @@ class DBStats(TypedDict, total=False):
 # Core helpers
 # ---------------------------------------------------------------------------
 
+def run_queries(queries: dict[str, str]) -> dict[str, str]:
+    """Run *queries* on one connection, returning each one's output as psql -t -A prints it.
+
+    Uses psycopg2 when it is importable and the psql CLI otherwise; callers
+    see the same result either way. A query that fails (or every query, if
+    the database is unreachable) comes back as "".
+    """
+    if psycopg2 is not None:
+        return _run_queries_native(queries)
+    return _run_queries_psql(queries)
+
+
+def _run_queries_native(queries: dict[str, str]) -> dict[str, str]:
+    """run_queries() over a psycopg2 connection: no process spawn at all."""
+    try:
+        conn = psycopg2.connect(dbname=_DB_NAME, host=_DB_HOST, port=_DB_PORT, user=_DB_USER or None)
+    except psycopg2.Error:
+        return dict.fromkeys(queries, "")
+    conn.autocommit = True  # a failed query must not abort the ones after it
+    out: dict[str, str] = {}
+    try:
+        for name, sql in queries.items():
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    rows = cur.fetchall()
+            except psycopg2.Error:
+                out[name] = ""
+                continue
+            out[name] = "\n".join("|".join(_psql_text(v) for v in row) for row in rows)
+    finally:
+        conn.close()
+    return out
+
+
+def _psql_text(value) -> str:
+    """One value as psql -t -A prints it: NULL empty, booleans t/f, and
+    timestamps without trailing fraction zeros and with a short UTC offset
+    (2026-10-14 07:00:00.123+00, not str()'s .123000+00:00)."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if not isinstance(value, datetime):
+        return str(value)
+    text = value.replace(tzinfo=None).isoformat(" ")
+    if "." in text:
+        text = text.rstrip("0")
+    offset = value.utcoffset()
+    if offset is None:
+        return text
+    seconds = int(offset.total_seconds())
+    sign = "-" if seconds < 0 else "+"
+    hours, rest = divmod(abs(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    text += f"{sign}{hours:02d}"
+    if minutes or seconds:
+        text += f":{minutes:02d}"
+    if seconds:
+        text += f":{seconds:02d}"
+    return text
+
+
+def _run_queries_psql(queries: dict[str, str]) -> dict[str, str]:
+    """run_queries() through a single psql session.
+
+    One process and one connection serve every query instead of a shell and
+    a psql per query.
+    """
+    script = "".join(f"{sql};\n\\echo {QUERY_END}\n" for sql in queries.values())
+    r = subprocess.run(DB_CMD, input=script, env=DB_ENV, capture_output=True, text=True)
+    outputs = r.stdout.split(QUERY_END + "\n") if r.returncode == 0 else []
+    return {
+        name: outputs[i].strip() if i < len(outputs) else ""
+        for i, name in enumerate(queries)
+    }
+
+
 def get_db_stats() -> DBStats:
     """Return current database statistics. Never raises — missing data defaults to 0/False."""
     stats: DBStats = {}
-
-    def _run(sql: str) -> subprocess.CompletedProcess[str]:
-        return subprocess.run(
-            DB_CMD + f' "{sql}"',
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
+    out = run_queries(STATS_QUERIES)
 
     # Total records
-    r = _run("SELECT COUNT(*) FROM memories")
-    stats["total_records"] = int(r.stdout.strip()) if r.returncode == 0 and r.stdout.strip() else 0
+    stats["total_records"] = int(out["total_records"]) if out["total_records"] else 0
 
     # Records by category
-    r = _run("SELECT category, COUNT(*) FROM memories GROUP BY category")
     stats["by_category"] = {}
-    if r.returncode == 0:
-        for line in r.stdout.strip().split("\n"):
-            if "|" in line:
-                cat, count = line.split("|", 1)
-                stats["by_category"][cat] = int(count)
+    for line in out["by_category"].split("\n"):
+        if "|" in line:
+            cat, count = line.rsplit("|", 1)  # the category itself may contain "|"
+            stats["by_category"][cat] = int(count)
 
     stats["contacts"] = stats["by_category"].get("contacts", 0)
 
     # Recent records (last 24h)
-    r = _run("SELECT COUNT(*) FROM memories WHERE created_at > NOW() - INTERVAL '24 hours'")
-    stats["recent_24h"] = int(r.stdout.strip()) if r.returncode == 0 and r.stdout.strip() else 0
+    stats["recent_24h"] = int(out["recent_24h"]) if out["recent_24h"] else 0
 
     # Last created record
-    r = _run("SELECT title, created_at FROM memories ORDER BY created_at DESC LIMIT 1")
-    if r.returncode == 0 and r.stdout.strip():
-        parts = r.stdout.strip().split("|", 1)
+    if out["last_record"]:
+        parts = out["last_record"].rsplit("|", 1)  # the title may contain "|"
         stats["last_record"] = {
             "title": parts[0],
             "created_at": parts[1] if len(parts) > 1 else None,
         }
 
     # Connectivity
-    r = _run("SELECT 1")
-    stats["connected"] = r.returncode == 0
+    stats["connected"] = out["connected"] == "1"
 
     # Contact graph
     graph_path = _WORKSPACE / "contact-graph.json"
@@ -121,17 +213,11 @@ def get_db_stats() -> DBStats:
         stats["contact_graph_contacts"] = 0
 
     # ID gaps
-    r = _run(
-        "SELECT COUNT(*) FROM generate_series("
-        "(SELECT MIN(id) FROM memories), (SELECT MAX(id) FROM memories)"
-        ") AS s(id) WHERE NOT EXISTS (SELECT 1 FROM memories WHERE id = s.id)"
-    )
-    stats["id_gaps"] = int(r.stdout.strip()) if r.returncode == 0 and r.stdout.strip() else 0
+    stats["id_gaps"] = int(out["id_gaps"]) if out["id_gaps"] else 0
 
     # ID range
-    r = _run("SELECT MIN(id), MAX(id) FROM memories")
-    if r.returncode == 0 and r.stdout.strip():
-        parts = r.stdout.strip().split("|", 1)
+    if out["id_range"]:
+        parts = out["id_range"].split("|", 1)
         stats["id_range"] = {
             "min": int(parts[0]) if parts[0] else 0,
             "max": int(parts[1]) if len(parts) > 1 and parts[1] else 0,
@@ -23,6 +23,7 @@ Usage:
 
 import subprocess
 import json
+import shutil
 import sys
 import os
 from datetime import datetime
@@ -80,41 +81,45 @@ class DBStats(TypedDict, total=False):
 # Standalone DB stats helper (mirrors db-health-check.py)
 # ---------------------------------------------------------------------------
 
+# Echoed after each statement so one psql session's output can be split per query
+_QUERY_END = "__shadowdb_query_end__"
+
+_STATS_QUERIES = {
+    "total_records": "SELECT COUNT(*) FROM memories",
+    "by_category": "SELECT category, COUNT(*) FROM memories GROUP BY category",
+    "recent_24h": "SELECT COUNT(*) FROM memories WHERE created_at > NOW() - INTERVAL '24 hours'",
+    "connected": "SELECT 1",
+}
+
+
 def get_db_stats() -> DBStats:
     """Return current database statistics. Never raises."""
-    _DB_CMD = (
-        f"PGDATABASE={DB_NAME} PGHOST={DB_HOST} "
-        f"PGPORT={DB_PORT} PGUSER={DB_USER} psql -t -A -c"
+    # Every query runs in one psql session rather than a shell and a psql each
+    script = "".join(f"{sql};\n\\echo {_QUERY_END}\n" for sql in _STATS_QUERIES.values())
+    r = subprocess.run(
+        ["psql", "-X", "-q", "-t", "-A", "-f", "-"],
+        input=script,
+        env={**os.environ, "PGDATABASE": DB_NAME, "PGHOST": DB_HOST,
+             "PGPORT": DB_PORT, "PGUSER": DB_USER},
+        capture_output=True,
+        text=True,
     )
-
-    def _run(sql: str) -> subprocess.CompletedProcess[str]:
-        return subprocess.run(
-            _DB_CMD + f' "{sql}"',
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
+    outputs = r.stdout.split(_QUERY_END + "\n") if r.returncode == 0 else []
+    out = {name: outputs[i].strip() if i < len(outputs) else ""
+           for i, name in enumerate(_STATS_QUERIES)}
 
     stats: DBStats = {}
+    stats["total_records"] = int(out["total_records"]) if out["total_records"] else 0
 
-    r = _run("SELECT COUNT(*) FROM memories")
-    stats["total_records"] = int(r.stdout.strip()) if r.returncode == 0 and r.stdout.strip() else 0
-
-    r = _run("SELECT category, COUNT(*) FROM memories GROUP BY category")
     stats["by_category"] = {}
-    if r.returncode == 0:
-        for line in r.stdout.strip().split("\n"):
-            if "|" in line:
-                cat, count = line.split("|", 1)
-                stats["by_category"][cat] = int(count)
+    for line in out["by_category"].split("\n"):
+        if "|" in line:
+            cat, count = line.rsplit("|", 1)  # the category itself may contain "|"
+            stats["by_category"][cat] = int(count)
 
     stats["contacts"] = stats["by_category"].get("contacts", 0)
-
-    r = _run("SELECT COUNT(*) FROM memories WHERE created_at > NOW() - INTERVAL '24 hours'")
-    stats["recent_24h"] = int(r.stdout.strip()) if r.returncode == 0 and r.stdout.strip() else 0
-
-    r = _run("SELECT 1")
-    stats["connected"] = r.returncode == 0
+    stats["recent_24h"] = int(out["recent_24h"]) if out["recent_24h"] else 0
+    stats["connected"] = out["connected"] == "1"
 
     graph_path = _WORKSPACE / "contact-graph.json"
     if graph_path.exists():
@@ -142,6 +147,8 @@ class DBIntegritySuite:
             "passed": 0,
             "failed": 0,
         }
+        # psql/pg_amcheck environment per database, built on first use
+        self._pg_envs: dict[str, dict[str, str]] = {}
 
     # ------------------------------------------------------------------
     # Runner
@@ -208,18 +215,29 @@ class DBIntegritySuite:
     # SQL helper
     # ------------------------------------------------------------------
 
+    def _pg_env(self, db: str = DB_NAME) -> dict[str, str]:
+        """Process environment plus the PG* connection settings for *db*.
+
+        Built once per database and reused, rather than copying all of
+        os.environ again for every query.
+        """
+        env = self._pg_envs.get(db)
+        if env is None:
+            env = {
+                **os.environ,
+                "PGDATABASE": db,
+                "PGHOST": DB_HOST,
+                "PGPORT": DB_PORT,
+                "PGUSER": DB_USER,
+            }
+            self._pg_envs[db] = env
+        return env
+
     def run_sql(self, query: str, db: str = DB_NAME) -> Optional[str]:
         """Run a SQL query and return stripped stdout, or None on failure."""
-        env = os.environ.copy()
-        env.update({
-            "PGDATABASE": db,
-            "PGHOST": DB_HOST,
-            "PGPORT": DB_PORT,
-            "PGUSER": DB_USER,
-        })
         result = subprocess.run(
             ["psql", "-t", "-A", "-c", query],
-            env=env,
+            env=self._pg_env(db),
             capture_output=True,
             text=True,
         )
@@ -260,8 +278,9 @@ class DBIntegritySuite:
         """Test 2: Run pg_amcheck for index/table consistency (PostgreSQL 14+)."""
         print("\n=== TEST 2: Index/Table Consistency (pg_amcheck) ===")
 
-        check = subprocess.run(["which", "pg_amcheck"], capture_output=True)
-        if check.returncode != 0:
+        # PATH lookup in-process rather than spawning `which`
+        amcheck = shutil.which("pg_amcheck")
+        if amcheck is None:
             print("⚠️  WARNING: pg_amcheck not available (requires PostgreSQL 14+)")
             self.results["tests"]["amcheck"] = {"status": "SKIP", "reason": "Not installed"}
             self.results["warnings"].append("pg_amcheck not available — upgrade to PostgreSQL 14+")
@@ -283,16 +302,9 @@ class DBIntegritySuite:
             )
             return None
 
-        env = os.environ.copy()
-        env.update({
-            "PGDATABASE": DB_NAME,
-            "PGHOST": DB_HOST,
-            "PGPORT": DB_PORT,
-            "PGUSER": DB_USER,
-        })
         result = subprocess.run(
-            ["pg_amcheck", "--verbose"],
-            env=env,
+            [amcheck, "--verbose"],
+            env=self._pg_env(),
             capture_output=True,
             text=True,
             timeout=60,
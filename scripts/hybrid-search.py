@@ -2,115 +2,383 @@
 """
 hybrid-search.py — Hybrid search over Shadow PG memories.
 Combines: SQL metadata filters + PostgreSQL FTS + pgvector semantic search + RRF fusion.
+Reads the content_snippet column (extensions/memory-shadowdb/migrations/005_content_snippet.sql)
+and, when present, the query_cache table (009_query_cache.sql).
 
 Usage:
-    python3 scripts/hybrid-search.py "query" [-n 5] [--category cat] [--tags tag1,tag2] [--json]
+    python3 scripts/hybrid-search.py "query" ["query" ...] [-n 5] [--category cat] [--tags tag1,tag2] [--json]
+                                     [--fusion rrf|weighted] [--no-cache]
 """
 
 import argparse
+import array
+import concurrent.futures
+import csv
+import functools
+import hashlib
+import http.client
+import io
 import json
+import os
+import re
+import sqlite3
 import subprocess
 import sys
+import threading
+import uuid
+
+try:
+    # Optional: orjson parses Ollama's embedding arrays and cached result
+    # sets several times faster than the stdlib; output is identical.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 PSQL = "/opt/homebrew/opt/postgresql@17/bin/psql"
 DB = "shadow"
 
-def get_embedding(text: str) -> list[float]:
-    """Get embedding from Ollama nomic-embed-text."""
-    import urllib.request
-    req = urllib.request.Request(
-        "http://localhost:11434/api/embeddings",
-        data=json.dumps({"model": "nomic-embed-text", "prompt": text}).encode(),
-        headers={"Content-Type": "application/json"},
-    )
+# HNSW candidate list size for the vector leg. pgvector's default of 40 is
+# below the leg's LIMIT 50, which caps how many neighbours it can return.
+HNSW_EF_SEARCH = 80
+
+# Half-precision HNSW index (migration 011, or 006 before it); the vector
+# leg uses either when present.
+HALFVEC_INDEXES = ("memories_embedding_halfvec_active_hnsw_idx", "memories_embedding_halfvec_hnsw_idx")
+
+# Tables every search checks for. A new PsqlSession looks them (and the
+# memories.embedding width, and whether memories.content_snippet exists) up
+# in one query queued behind its SET, so the probe runs while the first
+# query is being embedded.
+PROBED_TABLES = (*HALFVEC_INDEXES, "query_cache")
+
+# Per-row contribution to the fused score, summed over the legs that found
+# the row. rrf: reciprocal rank (k=60 is standard). weighted: the leg's own
+# score normalized to [0, 1] — ts_rank over the best FTS match, cosine
+# similarity for vectors — so score strength counts, not just order.
+FUSION_SCORES = {
+    "rrf": "1.0 / (60 + r)",
+    "weighted": "w",
+}
+
+# Semantic result cache (migration 009): a query whose embedding is within
+# this cosine distance of one searched in the last QUERY_CACHE_TTL, with the
+# same options, gets that search's results back without running the legs.
+# Entries are keyed by memories_generation.gen as well: a trigger bumps it
+# on every write statement to memories, so any insert, update, soft or hard
+# delete misses every entry stored before it.
+QUERY_CACHE_MAX_DISTANCE = 0.03
+QUERY_CACHE_TTL = "1 hour"
+# One row, read by primary key
+MEMORIES_GENERATION_SQL = "SELECT gen FROM memories_generation WHERE id = 1"
+
+OLLAMA_HOST = ("localhost", 11434)
+EMBED_MODEL = "nomic-embed-text"
+
+# Query embeddings persist here across runs, namespaced by model, as packed
+# float32 (3 KB per 768-dim vector rather than ~15 KB of JSON text).
+EMBED_CACHE = os.path.expanduser("~/.shadowdb/embed_cache.db")
+
+# One keep-alive connection to Ollama, reused by every get_embedding() call
+# in the process instead of a new TCP connection per query.
+_ollama = None
+
+
+# Lazily opened connection to EMBED_CACHE; False once it failed to open.
+_embed_db = None
+
+# Embeddings fetched ahead by prefetch_embeddings(), taken (once) by
+# _cached_embedding() in place of a per-query Ollama request.
+_prefetched = {}
+
+
+def get_embedding(text: str) -> tuple:
+    """
+    Get embedding for a query — in-process LRU, then EMBED_CACHE, then Ollama.
+    Returns the cached tuple itself (immutable, so safe to share), not a copy.
+    """
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return json.loads(resp.read())["embedding"]
-    except Exception:
+        return _cached_embedding(text)
+    except LookupError:
         return None
 
 
-def hybrid_search(query: str, n: int = 5, category: str = None, tags: list = None, as_json: bool = False):
+@functools.lru_cache(maxsize=1024)
+def _cached_embedding(text: str) -> tuple:
+    # Raises on failure, which lru_cache does not remember
+    key = _embed_key(text)
+    db = _embed_cache_db()
+    if db:
+        row = db.execute("SELECT vec FROM ecache WHERE model = ? AND hash = ?", (EMBED_MODEL, key)).fetchone()
+        if row:
+            # Floats are read in place from the BLOB, without an array copy
+            return tuple(memoryview(row[0]).cast("f"))
+    embedding = _prefetched.pop(text, None) or _ollama_embedding(text)
+    if not embedding:
+        raise LookupError(text)
+    if db:
+        with db:
+            db.execute("INSERT OR REPLACE INTO ecache (model, hash, vec) VALUES (?, ?, ?)",
+                       (EMBED_MODEL, key, array.array("f", embedding).tobytes()))
+    return tuple(embedding)
+
+
+def _embed_key(text: str) -> bytes:
+    """EMBED_CACHE key for text under EMBED_MODEL."""
+    return hashlib.sha256(f"{EMBED_MODEL}|{text}".encode()).digest()
+
+
+def _embed_cache_db():
+    """Open EMBED_CACHE once; None if it can't be used (the cache is optional)."""
+    global _embed_db
+    if _embed_db is None:
+        try:
+            os.makedirs(os.path.dirname(EMBED_CACHE), exist_ok=True)
+            # Calls are serialized (one embedding worker), but not always on
+            # the thread that opened the connection
+            _embed_db = sqlite3.connect(EMBED_CACHE, check_same_thread=False)
+            _embed_db.execute("CREATE TABLE IF NOT EXISTS ecache"
+                              " (model TEXT NOT NULL, hash BLOB NOT NULL, vec BLOB NOT NULL, PRIMARY KEY (model, hash))")
+        except (OSError, sqlite3.Error):
+            _embed_db = False
+    return _embed_db or None
+
+
+def prefetch_embeddings(texts: list):
     """
-    Three-stage hybrid search:
+    Embed every text not already in EMBED_CACHE with one /api/embed request,
+    so the get_embedding() calls that follow don't each go to Ollama.
+    Best-effort: on any failure those calls embed one at a time as usual.
+    Call it from the thread that runs get_embedding() (the Ollama
+    connection is not shared).
+    """
+    misses = list(dict.fromkeys(texts))
+    db = _embed_cache_db()
+    if db:
+        misses = [text for text in misses if not db.execute(
+            "SELECT 1 FROM ecache WHERE model = ? AND hash = ?",
+            (EMBED_MODEL, _embed_key(text))).fetchone()]
+    if len(misses) < 2:
+        return
+    # /api/embed returns unit-length vectors; every consumer compares by
+    # cosine distance, so they mix with /api/embeddings output
+    data = _ollama_post("/api/embed", {"model": EMBED_MODEL, "input": misses})
+    embeddings = (data or {}).get("embeddings")
+    if embeddings and len(embeddings) == len(misses):
+        _prefetched.update(zip(misses, embeddings))
+
+
+def _ollama_embedding(text: str) -> list[float]:
+    """Get embedding from Ollama nomic-embed-text."""
+    data = _ollama_post("/api/embeddings", {"model": EMBED_MODEL, "prompt": text})
+    return (data or {}).get("embedding")
+
+
+def _ollama_post(path: str, payload: dict) -> dict:
+    """POST JSON to Ollama over the keep-alive connection; the parsed body on 200, else None."""
+    global _ollama
+    body = json.dumps(payload)
+    for attempt in range(2):
+        if _ollama is None:
+            _ollama = http.client.HTTPConnection(*OLLAMA_HOST, timeout=10)
+        try:
+            _ollama.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            resp = _ollama.getresponse()
+            # Reading to the end leaves the connection ready for the next request
+            data = _json_loads(resp.read())
+            return data if resp.status == 200 else None
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # Ollama closed the idle keep-alive socket; reconnect once
+            _ollama.close()
+            _ollama = None
+        except Exception:
+            _ollama.close()
+            _ollama = None
+            return None
+    return None
+
+
+def hybrid_search(query: str, n: int = 5, category: str = None, tags: list = None, as_json: bool = False,
+                  fusion: str = "rrf", session: "PsqlSession" = None,
+                  embedding_future: concurrent.futures.Future = None, no_cache: bool = False):
+    """
+    Three-stage hybrid search, run as a single SQL statement:
     1. FTS (BM25-like via ts_rank) — keyword precision
     2. Vector similarity (pgvector cosine) — semantic recall
-    3. RRF fusion of both ranked lists
+    3. Fusion of both ranked lists — RRF, or normalized scores (see FUSION_SCORES)
+
+    Pass a PsqlSession to reuse one psql connection across searches, and an
+    embedding_future (resolving to get_embedding(query)) to embed ahead of time.
+    no_cache skips the query_cache lookup and insert.
     """
-    embedding = get_embedding(query)
+    embedding = embedding_future.result() if embedding_future else get_embedding(query)
+
+    own_session = session is None
+    if own_session:
+        session = PsqlSession()
+    try:
+        results = _search(session, query, embedding, n, category, tags, fusion, no_cache)
+    finally:
+        if own_session:
+            session.close()
+    return _print_results(results, as_json)
 
-    # Build WHERE clause for metadata filters
-    where_parts = []
+
+def _search(session: "PsqlSession", query: str, embedding: tuple, n: int, category: str, tags: list,
+            fusion: str, no_cache: bool) -> list:
+    """Run one hybrid search on session; returns result dicts."""
+    # pgvector would reject a mis-sized vector with an opaque cast error
+    # (e.g. a 1024-dim model against vector(768)); fail with the cause
+    dims = session.vector_dims("memories", "embedding") if embedding else None
+    if dims and len(embedding) != dims:
+        raise ValueError(f"{EMBED_MODEL} returned {len(embedding)}-dim embeddings "
+                         f"but memories.embedding is vector({dims})")
+
+    # Values are bound like the query text, never spliced into the SQL.
+    params = {"q": query}
     if category:
-        where_parts.append(f"category = '{category}'")
+        params["category"] = category
     if tags:
-        tag_array = ",".join(f"'{t}'" for t in tags)
-        where_parts.append(f"tags && ARRAY[{tag_array}]")
-    where_clause = ("WHERE " + " AND ".join(where_parts)) if where_parts else ""
-
-    # FTS query
-    escaped_q = query.replace("'", "''")
-    fts_sql = f"""
-    SELECT id, left(content, 1000) as content, category, tags::text, source_file,
-           ts_rank(fts, plainto_tsquery('english', '{escaped_q}')) as fts_score
-    FROM memories
-    {where_clause}
-    {"AND" if where_parts else "WHERE"} fts @@ plainto_tsquery('english', '{escaped_q}')
-    ORDER BY fts_score DESC
-    LIMIT 50;
+        params["tags"] = ",".join(tags)
+    halfvec_dims = 0
+    if embedding:
+        if any(session.has_table(name) for name in HALFVEC_INDEXES):
+            halfvec_dims = len(embedding)
+        # json.dumps formats the floats in C and its "[a,b,...]" output is
+        # exactly pgvector's text format
+        params["emb"] = json.dumps(embedding, separators=(",", ":"))
+    # content_snippet comes with migration 005; before it, cut content itself
+    snippet = session.has_column("memories", "content_snippet")
+    sql = _search_sql(bool(category), bool(tags), bool(embedding), halfvec_dims, fusion, int(n), snippet)
+
+    use_cache = bool(embedding) and not no_cache and session.has_table("query_cache")
+    if use_cache:
+        params["cache_args"] = json.dumps([n, category, tags, fusion])
+        cached = session.run_prepared(_CACHE_LOOKUP_SQL, params)
+        if not cached:
+            use_cache = False
+        elif cached[0]["results"]:
+            return _json_loads(cached[0]["results"])
+        else:
+            # Stored under the generation the search ran against, not
+            # whatever it is by the time the insert runs
+            params["cache_args"] = cached[0]["args"]
+
+    # Columns are fixed by _search_sql's SELECT list, so rows are unpacked
+    # in place instead of each going through a DictReader dict first
+    results = []
+    for id_, content, cat, tags_text, source_file, score, fts_hit, vec_hit in session.run_prepared(sql, params, True):
+        results.append({
+            "id": id_,  # already a str from the CSV stream
+            "score": round(float(score), 6),
+            "category": cat,
+            "tags": tags_text,
+            "source_file": source_file,
+            "content": content,
+            "fts_hit": fts_hit == "t",
+            "vec_hit": vec_hit == "t",
+        })
+
+    if use_cache:
+        params["results"] = json.dumps(results)
+        session.run(_CACHE_STORE_SQL, params)
+    return results
+
+
+@functools.lru_cache(maxsize=32)
+def _search_sql(category: bool, tags: bool, vector: bool, halfvec_dims: int, fusion: str, n: int,
+                snippet: bool = True) -> str:
+    """Hybrid search statement for one combination of filters and legs.
+
+    The text depends only on which options are set, never on their values
+    (those are psql variables), so each shape is built once per process and
+    repeat searches hand run_prepared the same string.
     """
+    # Live rows only, matching the partial FTS/HNSW indexes.
+    where_parts = ["deleted_at IS NULL"]
+    if category:
+        where_parts.append("category = :'category'")
+    if tags:
+        where_parts.append("tags && string_to_array(:'tags', ',')")
+    filt = " AND ".join(where_parts)
 
-    # Vector query (only if embedding succeeded)
-    vec_sql = None
-    if embedding:
-        emb_str = "[" + ",".join(str(x) for x in embedding) + "]"
-        vec_sql = f"""
-        SELECT id, left(content, 1000) as content, category, tags::text, source_file,
-               1 - (embedding <=> '{emb_str}'::vector) as vec_score
-        FROM memories
-        {where_clause}
-        {"AND" if where_parts else "WHERE"} embedding IS NOT NULL
-        ORDER BY embedding <=> '{emb_str}'::vector
-        LIMIT 50;
-        """
+    # Both legs and the fusion run as one statement. The top n are picked
+    # from the fused ids before the join, so only those n rows are read back
+    # from memories for their display columns.
+    legs = [f"""
+    fts AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY s DESC) AS r,
+               COALESCE(s / NULLIF(MAX(s) OVER (), 0), 0) AS w
+        FROM (SELECT id, ts_rank(fts, q) AS s
+              FROM memories, plainto_tsquery('english', :'q') AS q
+              WHERE {filt} AND fts @@ q
+              ORDER BY s DESC
+              LIMIT 50) f
+    )"""]
+    union = "SELECT id, r, w, TRUE AS is_fts FROM fts"
 
-    # Execute queries
-    fts_results = run_sql(fts_sql)
-    vec_results = run_sql(vec_sql) if vec_sql else []
+    # Vector leg (only if embedding succeeded). With a half-precision index,
+    # candidates are ordered by its expression so HNSW walks the 2-byte
+    # graph; w is still full-precision cosine.
+    if vector:
+        distance = "embedding <=> :'emb'::vector"
+        if halfvec_dims:
+            # Through ::vector first so the prepared parameter has one type
+            distance = f"embedding::halfvec({halfvec_dims}) <=> :'emb'::vector::halfvec({halfvec_dims})"
+        legs.append(f"""
+    vec AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY d) AS r, 1 - full_d AS w
+        FROM (SELECT id, {distance} AS d, embedding <=> :'emb'::vector AS full_d
+              FROM memories
+              WHERE {filt} AND embedding IS NOT NULL
+              ORDER BY d
+              LIMIT 50) v
+    )""")
+        union += " UNION ALL SELECT id, r, w, FALSE FROM vec"
 
-    # RRF fusion (k=60 is standard)
-    k = 60
-    scores = {}
-    content_map = {}
+    return f"""
+    WITH {",".join(legs)},
+    fused AS (
+        SELECT id, SUM({FUSION_SCORES[fusion]}) AS score,
+               bool_or(is_fts) AS fts_hit, bool_or(NOT is_fts) AS vec_hit
+        FROM ({union}) u
+        GROUP BY id
+        ORDER BY score DESC
+        LIMIT {n}
+    )
+    SELECT m.id, left(m.{"content_snippet" if snippet else "content"}, 500) as content, m.category, m.tags::text, m.source_file,
+           fused.score, fused.fts_hit, fused.vec_hit
+    FROM fused JOIN memories m USING (id)
+    ORDER BY fused.score DESC;
+    """
 
-    for rank, row in enumerate(fts_results):
-        rid = str(row["id"])
-        scores[rid] = scores.get(rid, 0) + 1.0 / (k + rank + 1)
-        content_map[rid] = row
 
-    for rank, row in enumerate(vec_results):
-        rid = str(row["id"])
-        scores[rid] = scores.get(rid, 0) + 1.0 / (k + rank + 1)
-        if rid not in content_map:
-            content_map[rid] = row
+# Always one row: the generation-keyed args, and the cached results ("" on a
+# miss). The materialized CTE filters on args through the (args, created_at)
+# index before ranking, rather than letting an HNSW scan post-filter on it.
+_CACHE_LOOKUP_SQL = f"""
+        WITH g AS (
+            SELECT :'cache_args'::text || '@' || COALESCE(({MEMORIES_GENERATION_SQL}), 0) AS args
+        ), c AS MATERIALIZED (
+            SELECT results, qemb <=> :'emb'::vector AS d
+            FROM query_cache, g
+            WHERE query_cache.args = g.args AND created_at > NOW() - INTERVAL '{QUERY_CACHE_TTL}'
+        )
+        SELECT g.args, (
+            SELECT results FROM c
+            WHERE d < {QUERY_CACHE_MAX_DISTANCE}
+            ORDER BY d
+            LIMIT 1) AS results
+        FROM g;
+        """
 
-    # Sort by fused score
-    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:n]
+_CACHE_STORE_SQL = f"""
+        DELETE FROM query_cache WHERE created_at <= NOW() - INTERVAL '{QUERY_CACHE_TTL}';
+        INSERT INTO query_cache (qemb, args, results) VALUES (:'emb'::vector, :'cache_args', :'results'::jsonb);
+        """
 
-    results = []
-    for rid, score in ranked:
-        row = content_map[rid]
-        results.append({
-            "id": rid,
-            "score": round(score, 6),
-            "category": row.get("category", ""),
-            "tags": row.get("tags", ""),
-            "source_file": row.get("source_file", ""),
-            "content": row["content"][:500],
-            "fts_hit": rid in {str(r["id"]) for r in fts_results},
-            "vec_hit": rid in {str(r["id"]) for r in vec_results},
-        })
 
+def _print_results(results: list, as_json: bool) -> list:
+    """Print results as JSON or human-readable blocks; returns them unchanged."""
     if as_json:
         print(json.dumps(results, indent=2))
     else:
@@ -127,40 +395,223 @@ def hybrid_search(query: str, n: int = 5, category: str = None, tags: list = Non
     return results
 
 
-def run_sql(sql: str) -> list[dict]:
-    """Execute SQL via psql JSON output for reliable parsing."""
-    if not sql:
+def _dict_rows(lines: list[str]) -> list[dict]:
+    """
+    psql --csv output as one dict per row, keyed by the header line.
+    Same rows as csv.DictReader (blank lines skipped), but each dict is
+    built by dict(zip()) in C, not by DictReader's per-row Python code.
+    """
+    rows = csv.reader(lines)
+    header = next(rows, None)
+    if header is None:
         return []
-    # Wrap query to return JSON
-    json_sql = f"SELECT json_agg(t) FROM ({sql.strip().rstrip(';')}) t;"
-    cmd = [PSQL, DB, "-t", "-A", "-c", json_sql]
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-        if result.returncode != 0:
-            print(f"SQL error: {result.stderr[:200]}", file=sys.stderr)
+    return [dict(zip(header, row)) for row in rows if row]
+
+
+def _tuple_rows(lines: list[str]) -> list[list[str]]:
+    """psql --csv output as bare rows, header dropped; blank lines skipped as in _dict_rows."""
+    rows = csv.reader(lines)
+    next(rows, None)
+    return [row for row in rows if row]
+
+
+class PsqlSession:
+    """
+    One long-lived psql process; each query is written to its stdin.
+
+    Forking psql and reconnecting (TCP + auth + backend startup) per query
+    costs more than the searches themselves. The session keeps one process
+    and one server backend for every query the script runs.
+
+    Rows are parsed straight from psql's --csv stream (header line, then
+    RFC 4180 records) rather than aggregated server-side into one JSON
+    document and re-parsed. NULL comes back as "", booleans as "t"/"f".
+    After each query the session echoes a random sentinel line, which marks
+    where that query's output ends.
+
+    params are set as psql variables (\\set name 'value') and referenced in the
+    SQL as :'name', which psql quotes as a literal. run_prepared() instead
+    binds them as parameters of a server-side prepared statement.
+
+    Queries are serialized on a lock, so one session can be shared by
+    threads without their scripts and output interleaving on the pipe.
+    """
+
+    def __init__(self):
+        self.sentinel = f"__END_{uuid.uuid4().hex}__"
+        # stderr is inherited so SQL errors show up as psql prints them;
+        # ON_ERROR_STOP stays off so one bad query doesn't end the session
+        self.proc = subprocess.Popen(
+            [PSQL, DB, "-X", "-q", "--csv", "-f", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+        self.proc.stdin.write(f"SET hnsw.ef_search = {HNSW_EF_SEARCH};\n")
+        self.tables = {}
+        self.dims = {}
+        self.columns = {}
+        self.prepared = set()
+        self.lock = threading.RLock()
+        # Read back by _finish_probe(), ahead of the first query's output
+        self.probe_pending = True
+        self.proc.stdin.write(self._script(
+            "SELECT t AS name, to_regclass(t) IS NOT NULL AS ok,"
+            " (SELECT atttypmod FROM pg_attribute"
+            "  WHERE attrelid = to_regclass('memories') AND attname = 'embedding') AS dims,"
+            " EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass('memories')"
+            "  AND attname = 'content_snippet' AND NOT attisdropped) AS snippet"
+            " FROM unnest(string_to_array(:'tables', ',')) AS t;",
+            {"tables": ",".join(PROBED_TABLES)},
+        ))
+
+    def has_table(self, name: str) -> bool:
+        """Whether the table (or index) exists; looked up once per session."""
+        self._finish_probe()
+        if name not in self.tables:
+            rows = self.run("SELECT to_regclass(:'table') IS NOT NULL AS ok;", {"table": name})
+            self.tables[name] = bool(rows) and rows[0]["ok"] == "t"
+        return self.tables[name]
+
+    def has_column(self, table: str, column: str) -> bool:
+        """Whether the column exists; looked up once per session."""
+        key = f"{table}.{column}"
+        self._finish_probe()
+        if key not in self.columns:
+            rows = self.run("SELECT EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass(:'table')"
+                            " AND attname = :'column' AND NOT attisdropped) AS ok;",
+                            {"table": table, "column": column})
+            self.columns[key] = bool(rows) and rows[0]["ok"] == "t"
+        return self.columns[key]
+
+    def vector_dims(self, table: str, column: str) -> int:
+        """Declared dimension of a vector column (0 if unknown); looked up once per session."""
+        key = f"{table}.{column}"
+        self._finish_probe()
+        if key not in self.dims:
+            rows = self.run("SELECT atttypmod AS dims FROM pg_attribute"
+                            " WHERE attrelid = to_regclass(:'table') AND attname = :'column';",
+                            {"table": table, "column": column})
+            self.dims[key] = max(int(rows[0]["dims"]), 0) if rows else 0
+        return self.dims[key]
+
+    def run(self, sql: str, params: dict = None, as_tuples: bool = False) -> list:
+        """
+        Execute one statement; returns one dict of strings per row, or with
+        as_tuples the bare rows in SELECT column order (no per-row dict, for
+        callers that know their column list).
+        """
+        if not sql or self.proc.poll() is not None:
             return []
-        raw = result.stdout.strip()
-        if not raw or raw == "null" or raw == "":
+        with self.lock:
+            return self._exchange(self._script(sql, params), as_tuples)
+
+    def _script(self, sql: str, params: dict = None) -> str:
+        """psql input for one statement: its variables, the SQL, then the sentinel."""
+        script = "".join(f"\\set {name} '{_psql_quote(value)}'\n" for name, value in (params or {}).items())
+        return script + f"{sql.strip()}\n\\echo {self.sentinel}\n"
+
+    def _exchange(self, script: str, as_tuples: bool = False) -> list:
+        """Write one script and read its CSV output up to the sentinel."""
+        try:
+            self._finish_probe()
+            self.proc.stdin.write(script)
+            self.proc.stdin.flush()
+            lines = self._read_output()
+            if as_tuples:
+                return _tuple_rows(lines)
+            return _dict_rows(lines)
+        except (BrokenPipeError, csv.Error):
             return []
-        rows = json.loads(raw)
-        # Normalize key names (score fields vary)
-        for row in rows:
-            for key in ["fts_score", "vec_score"]:
-                if key in row:
-                    row["score"] = row[key]
-        return rows
-    except Exception:
-        return []
+
+    def _finish_probe(self):
+        """Fill tables/dims from the probe queued in __init__, once."""
+        with self.lock:
+            if not self.probe_pending:
+                return
+            self.probe_pending = False
+            try:
+                for row in _dict_rows(self._read_output()):
+                    self.tables[row["name"]] = row["ok"] == "t"
+                    self.dims["memories.embedding"] = max(int(row["dims"] or 0), 0)
+                    self.columns["memories.content_snippet"] = row["snippet"] == "t"
+            except (BrokenPipeError, csv.Error, ValueError):
+                pass  # has_table()/has_column()/vector_dims() look up whatever is missing
+
+    def _read_output(self) -> list[str]:
+        """Lines of one script's output, up to its sentinel."""
+        lines = []
+        for line in self.proc.stdout:
+            if line.rstrip("\n") == self.sentinel:
+                break
+            lines.append(line)
+        return lines
+
+    def run_prepared(self, sql: str, params: dict, as_tuples: bool = False) -> list:
+        """
+        Like run(), but through a PREPAREd statement, so repeat queries of
+        the same shape skip parse and plan.
+
+        Each distinct :'name' becomes a $n parameter; the statement is
+        prepared once per session, named after a hash of its text, and run
+        with EXECUTE name(:'a', :'b', ...). A PREPARE that fails (psql only
+        reports it on stderr) is checked for in pg_prepared_statements, so
+        the name is only remembered once the statement exists; until then
+        each call returns no rows and the next one prepares it again.
+        """
+        names = list(dict.fromkeys(re.findall(r":'(\w+)'", sql)))
+        body = re.sub(r":'(\w+)'", lambda m: f"${names.index(m.group(1)) + 1}", sql.strip().rstrip(";"))
+        name = "hs_" + hashlib.sha1(body.encode()).hexdigest()[:16]
+        args = ", ".join(f":'{n}'" for n in names)
+        with self.lock:
+            if name not in self.prepared:
+                rows = self.run(f"PREPARE {name} AS {body};\n"
+                                f"SELECT count(*) AS ok FROM pg_prepared_statements WHERE name = '{name}';")
+                if not rows or rows[0]["ok"] != "1":
+                    return []
+                self.prepared.add(name)
+            return self.run(f"EXECUTE {name}({args});", params, as_tuples)
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=15)
+
+
+def _psql_quote(value) -> str:
+    """Escape a value for a single-quoted psql meta-command argument."""
+    return (str(value).replace("\\", "\\\\").replace("'", "''")
+            .replace("\n", "\\n").replace("\r", "\\r"))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Hybrid search over Shadow PG memories")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="+", help="Search query (several run over one psql session)")
     parser.add_argument("-n", type=int, default=5, help="Number of results")
     parser.add_argument("--category", help="Filter by category")
     parser.add_argument("--tags", help="Filter by tags (comma-separated)")
     parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument("--fusion", choices=sorted(FUSION_SCORES), default="rrf",
+                        help="How leg results are combined (default: rrf)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the semantic query cache")
     args = parser.parse_args()
 
     tags = args.tags.split(",") if args.tags else None
-    hybrid_search(args.query, n=args.n, category=args.category, tags=tags, as_json=args.json)
+    session = PsqlSession()
+    # One worker embeds the queries in order (keeping the shared Ollama
+    # connection single-threaded) while this thread runs each query's SQL,
+    # so query i+1's embedding overlaps query i's search. With several
+    # queries it first embeds all the uncached ones in a single request.
+    embedder = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        if len(args.query) > 1:
+            embedder.submit(prefetch_embeddings, args.query)
+        futures = [embedder.submit(get_embedding, query) for query in args.query]
+        for query, future in zip(args.query, futures):
+            if len(args.query) > 1 and not args.json:
+                print(f"\n═══ {query}")
+            hybrid_search(query, n=args.n, category=args.category, tags=tags, as_json=args.json,
+                          fusion=args.fusion, session=session, embedding_future=future, no_cache=args.no_cache)
+    except ValueError as err:
+        sys.exit(f"hybrid-search: {err}")
+    finally:
+        embedder.shutdown(cancel_futures=True)
+        session.close()
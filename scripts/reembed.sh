@@ -9,6 +9,7 @@ PSQL="${PSQL:-/opt/homebrew/opt/postgresql@17/bin/psql}"
 DB="${DB:-shadow}"
 OLLAMA_URL="${OLLAMA_URL:-http://localhost:11434}"
 MODEL="${MODEL:-nomic-embed-text}"
+BATCH="${BATCH:-32}"
 DRY_RUN=false
 VERIFY=false
 
@@ -26,31 +27,79 @@ if $DRY_RUN; then echo "(dry run)"; exit 0; fi
 DONE=0
 FAILED=0
 
-# Stream IDs, fetch content one at a time (safe for any content)
-$PSQL -d "$DB" -tA -c "SELECT id FROM memories WHERE deleted_at IS NULL ORDER BY id" | while read -r ID; do
-  [ -z "$ID" ] && continue
+# Rows are read back as one JSON object per line, so any content survives
+# the pipe. Texts go to Ollama BATCH at a time over one connection
+# (/api/embed), and each batch is written with a single UPDATE, instead of
+# a psql and a curl process (and connection) per record.
+embed_one() {
+  jq -n --arg model "$MODEL" --arg prompt "search_document: $1" '{model:$model,prompt:$prompt}' \
+    | curl -sf "$OLLAMA_URL/api/embeddings" -H "Content-Type: application/json" -d @- \
+    | jq -c '.embedding'
+}
 
-  # Fetch content as JSON to handle all escaping
-  CONTENT=$($PSQL -d "$DB" -tA -c "SELECT left(content, 8000) FROM memories WHERE id = $ID")
-
-  # Build JSON payload with jq (handles all escaping)
-  PREFIXED="search_document: $CONTENT"
-  PAYLOAD=$(jq -n --arg model "$MODEL" --arg prompt "$PREFIXED" '{model:$model,prompt:$prompt}')
-
-  EMBEDDING=$(curl -sf "$OLLAMA_URL/api/embeddings" \
-    -H "Content-Type: application/json" \
-    -d "$PAYLOAD" | jq -c '.embedding')
+# stdin: {id, content} lines; stdout: {id, embedding} lines
+embed_batch() {
+  local rows resp
+  rows=$(cat)
+  resp=$(jq -s --arg model "$MODEL" '{model:$model, input: map("search_document: " + .content)}' <<<"$rows" \
+    | curl -sf "$OLLAMA_URL/api/embed" -H "Content-Type: application/json" -d @-) || resp=""
+  if [ -n "$resp" ]; then
+    # The response (~17 KB per 768-dim vector) goes in on stdin: as an
+    # --argjson it would pass Linux's 128 KiB limit on a single argument
+    jq -c --slurpfile rows <(printf '%s\n' "$rows") \
+      '. as $resp | $rows | to_entries[] | {id: .value.id, embedding: $resp.embeddings[.key]}' <<<"$resp"
+    return
+  fi
+  # Ollama < 0.3 has no /api/embed: one request per record
+  while read -r ROW; do
+    jq -c -n --argjson row "$ROW" --argjson emb "$(embed_one "$(jq -r '.content' <<<"$ROW")" || echo null)" \
+      '{id: $row.id, embedding: $emb}'
+  done <<<"$rows"
+}
 
-  if [ -z "$EMBEDDING" ] || [ "$EMBEDDING" = "null" ]; then
+flush() {
+  if [ ${#BATCH_ROWS[@]} -eq 0 ]; then return; fi
+  local out ok
+  out=$(printf '%s\n' "${BATCH_ROWS[@]}" | embed_batch)
+  BATCH_ROWS=()
+  while read -r ID; do
     echo "FAIL: id=$ID"
     FAILED=$((FAILED + 1))
-    continue
+  done < <(jq -r 'select(.embedding == null) | .id' <<<"$out")
+  ok=$(jq -c 'select(.embedding != null)' <<<"$out")
+  if [ -z "$ok" ]; then return; fi
+  # COPY the batch into a staging table and apply it with one UPDATE ... FROM:
+  # COPY rows skip the SQL lexer and parser that a VALUES list of
+  # multi-kilobyte vector literals has to go through. The data is read
+  # inline from psql's stdin, up to the \. line. ON_ERROR_STOP makes psql
+  # exit non-zero if any statement fails (the transaction is then rolled
+  # back), so the batch is counted as failed rather than done.
+  local n
+  n=$(jq -s 'length' <<<"$ok")
+  if {
+    echo "BEGIN;"
+    echo "CREATE TEMP TABLE emb_stage (id bigint, e vector) ON COMMIT DROP;"
+    echo "COPY emb_stage FROM STDIN;"
+    jq -r '"\(.id)\t\(.embedding | tostring)"' <<<"$ok"
+    echo '\.'
+    echo "UPDATE memories AS m SET embedding = s.e FROM emb_stage s WHERE m.id = s.id;"
+    echo "COMMIT;"
+  } | $PSQL -d "$DB" -q -v ON_ERROR_STOP=1 >/dev/null; then
+    DONE=$((DONE + n))
+  else
+    echo "FAIL: batch of $n (ids $(jq -s -r 'map(.id) | join(",")' <<<"$ok"))"
+    FAILED=$((FAILED + n))
   fi
+  echo "Progress: $DONE / $TOTAL"
+}
 
-  $PSQL -d "$DB" -c "UPDATE memories SET embedding = '$EMBEDDING'::vector WHERE id = $ID" >/dev/null
-  DONE=$((DONE + 1))
-  [ $((DONE % 100)) -eq 0 ] && echo "Progress: $DONE / $TOTAL"
-done
+BATCH_ROWS=()
+while read -r ROW; do
+  [ -z "$ROW" ] && continue
+  BATCH_ROWS+=("$ROW")
+  if [ ${#BATCH_ROWS[@]} -ge "$BATCH" ]; then flush; fi
+done < <($PSQL -d "$DB" -tA -c "SELECT json_build_object('id', id, 'content', left(content, 8000)) FROM memories WHERE deleted_at IS NULL ORDER BY id")
+flush
 
 echo "Done. Re-embedded: $DONE, Failed: $FAILED"
 
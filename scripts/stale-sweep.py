@@ -8,25 +8,48 @@ Rules:
 - records with superseded_by already set → skip
 - records with valid_to already set → skip
 """
-import subprocess, json, re, sys
+import csv, subprocess, re, sys, uuid
 from datetime import datetime, timedelta, timezone
 
 P = "/opt/homebrew/opt/postgresql@17/bin/psql"
 D = "shadow"
 
-def sql(q):
-    r = subprocess.run([P, D, "-t", "-A", "-c", q], capture_output=True, text=True, timeout=15)
-    return r.stdout.strip()
+# One psql process (and server connection) for the whole sweep: each query is
+# written to its stdin, and a sentinel line echoed after it marks the end of
+# its output. statement_timeout stands in for the old per-call subprocess timeout.
+END = f"__END_{uuid.uuid4().hex}__"
+psql = subprocess.Popen([P, D, "-X", "-q", "--csv", "-f", "-"], stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+psql.stdin.write("SET statement_timeout = '15s';\n")
+
+def sql_column(q):
+    """First column of each row as strings, read from psql --csv — no
+    server-side json_agg assembling one document per query, nor a JSON
+    parse of it, nor a dict per row."""
+    try:
+        psql.stdin.write(f"{q.strip().rstrip(';')};\n\\echo {END}\n")
+        psql.stdin.flush()
+    except BrokenPipeError:
+        return []
+    lines = []
+    for line in psql.stdout:
+        if line.rstrip("\n") == END:
+            break
+        lines.append(line)
+    rows = csv.reader(lines)
+    next(rows, None)  # header
+    return [row[0] for row in rows]
 
-def sql_json(q):
-    r = sql(f"SELECT json_agg(row_to_json(sub)) FROM ({q}) sub;")
-    return json.loads(r) if r and r != "null" else []
+def sql(q):
+    """Run a statement for its effect."""
+    sql_column(q)
 
 now = datetime.now(timezone.utc)
 
 # 1. Find state-like records not accessed in 14+ days
-stale_states = sql_json("""
-    SELECT id, LEFT(content, 200) as preview, category, last_accessed, created_at
+# Only ids are read back; the sweep flags rows without looking at them.
+stale_states = sql_column("""
+    SELECT id
     FROM memories 
     WHERE superseded_by IS NULL 
       AND valid_to IS NULL
@@ -38,8 +61,8 @@ stale_states = sql_json("""
 """)
 
 # 2. Find event records with rotted date-relative language
-stale_events = sql_json("""
-    SELECT id, LEFT(content, 200) as preview, category, created_at
+stale_events = sql_column("""
+    SELECT id
     FROM memories
     WHERE superseded_by IS NULL
       AND valid_to IS NULL  
@@ -49,20 +72,15 @@ stale_events = sql_json("""
     LIMIT 50
 """)
 
-flagged = 0
+def flag(rows, record_type):
+    """Set valid_to to now and mark confidence low — one psql call per batch, not per row."""
+    ids = ",".join(str(int(i)) for i in rows)
+    if ids:
+        sql(f"UPDATE memories SET valid_to = now(), confidence = 0.3, record_type = '{record_type}' "
+            f"WHERE id = ANY(ARRAY[{ids}]::bigint[])")
+    return len(rows)
 
-# Flag stale states
-for r in stale_states:
-    rid = r['id']
-    # Set valid_to to now, mark confidence low
-    sql(f"UPDATE memories SET valid_to = now(), confidence = 0.3, record_type = 'state' WHERE id = {rid}")
-    flagged += 1
-
-# Flag stale events  
-for r in stale_events:
-    rid = r['id']
-    sql(f"UPDATE memories SET valid_to = now(), confidence = 0.3, record_type = 'event' WHERE id = {rid}")
-    flagged += 1
+flagged = flag(stale_states, 'state') + flag(stale_events, 'event')
 
 if flagged > 0:
     print(f"Flagged {flagged} stale records ({len(stale_states)} states, {len(stale_events)} events)")
@@ -73,3 +91,6 @@ if flagged > 0:
         'Stale Sweep — ' || to_char(now() AT TIME ZONE 'America/Chicago', 'YYYY-MM-DD'))""")
 else:
     print("No stale records found")
+
+psql.stdin.close()
+psql.wait(timeout=15)
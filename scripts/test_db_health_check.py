@@ -13,6 +13,7 @@ Run:
 import json
 import sys
 import unittest
+from datetime import datetime, timedelta, timezone
 from io import StringIO
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
@@ -34,22 +35,28 @@ def _make_proc(returncode: int = 0, stdout: str = "") -> MagicMock:
     return p
 
 
+def _session_proc(*outputs: str) -> MagicMock:
+    """psql session whose queries printed *outputs*, in STATS_QUERIES order."""
+    return _make_proc(0, "".join(f"{o.rstrip()}\n{dhc.QUERY_END}\n" for o in outputs))
+
+
+@patch("db_health_check.psycopg2", None)
 class TestGetDbStats(unittest.TestCase):
-    """Tests for get_db_stats()."""
+    """Tests for get_db_stats() over the psql CLI."""
 
     @patch("db_health_check.subprocess.run")
     @patch("db_health_check._WORKSPACE", new_callable=lambda: type("P", (), {"__truediv__": lambda s, o: Path("/no/contact-graph.json")})())
     def test_all_queries_succeed(self, _ws, mock_run):
         # Return sensible values for each query in order
-        mock_run.side_effect = [
-            _make_proc(0, "100\n"),            # total_records
-            _make_proc(0, "contacts|50\n"),    # by_category
-            _make_proc(0, "3\n"),              # recent_24h
-            _make_proc(0, "My Title|2026-01-01"),  # last_record
-            _make_proc(0, "1\n"),              # connected
-            _make_proc(0, "0\n"),              # id_gaps
-            _make_proc(0, "1|9999\n"),         # id_range
-        ]
+        mock_run.return_value = _session_proc(
+            "100\n",                # total_records
+            "contacts|50\n",        # by_category
+            "3\n",                  # recent_24h
+            "My Title|2026-01-01",  # last_record
+            "1\n",                  # connected
+            "0\n",                  # id_gaps
+            "1|9999\n",             # id_range
+        )
         with patch("db_health_check._WORKSPACE", Path("/tmp")):
             with patch.object(Path, "exists", return_value=False):
                 stats = dhc.get_db_stats()
@@ -59,6 +66,42 @@ class TestGetDbStats(unittest.TestCase):
         self.assertEqual(stats["recent_24h"], 3)
         self.assertTrue(stats["connected"])
 
+    @patch("db_health_check.subprocess.run")
+    def test_pipe_in_category_or_title_is_kept(self, mock_run):
+        mock_run.return_value = _session_proc(
+            "100\n",                      # total_records
+            "a|b|7\ncontacts|50\n",       # by_category
+            "3\n",                        # recent_24h
+            "Left | Right|2026-01-01",    # last_record
+            "1\n",                        # connected
+            "0\n",                        # id_gaps
+            "1|9999\n",                   # id_range
+        )
+        with patch.object(Path, "exists", return_value=False):
+            stats = dhc.get_db_stats()
+        self.assertEqual(stats["by_category"], {"a|b": 7, "contacts": 50})
+        self.assertEqual(stats["last_record"]["title"], "Left | Right")
+        self.assertEqual(stats["last_record"]["created_at"], "2026-01-01")
+
+    @patch("db_health_check.subprocess.run")
+    def test_all_queries_share_one_psql_session(self, mock_run):
+        mock_run.return_value = _session_proc(*["1"] * len(dhc.STATS_QUERIES))
+        with patch.object(Path, "exists", return_value=False):
+            stats = dhc.get_db_stats()
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual(mock_run.call_args.kwargs["input"].count(dhc.QUERY_END), len(dhc.STATS_QUERIES))
+        self.assertTrue(stats["connected"])
+
+    @patch("db_health_check.subprocess.run")
+    def test_single_failed_query_defaults_to_zero(self, mock_run):
+        # A failing statement prints nothing; the rest of the session still runs
+        mock_run.return_value = _session_proc("", "contacts|50", "3", "", "1", "0", "1|9")
+        with patch.object(Path, "exists", return_value=False):
+            stats = dhc.get_db_stats()
+        self.assertEqual(stats["total_records"], 0)
+        self.assertEqual(stats["contacts"], 50)
+        self.assertNotIn("last_record", stats)
+
     @patch("db_health_check.subprocess.run")
     def test_failed_queries_default_to_zero(self, mock_run):
         mock_run.return_value = _make_proc(1, "")
@@ -86,6 +129,57 @@ class TestGetDbStats(unittest.TestCase):
         self.assertEqual(stats["contact_graph_contacts"], 0)
 
 
+class TestRunQueriesNative(unittest.TestCase):
+    """Tests for run_queries() when psycopg2 is importable."""
+
+    def _driver(self, results):
+        """Fake psycopg2 whose cursor answers each execute() from *results* in turn."""
+        driver = MagicMock()
+        driver.Error = Exception
+        cur = driver.connect.return_value.cursor.return_value.__enter__.return_value
+        answers = iter(results)
+
+        def execute(sql):
+            answer = next(answers)
+            if isinstance(answer, Exception):
+                raise answer
+            cur.fetchall.return_value = answer
+        cur.execute.side_effect = execute
+        return driver
+
+    @patch("db_health_check.subprocess.run")
+    def test_rows_formatted_like_psql_without_a_subprocess(self, mock_run):
+        driver = self._driver([[(100,)], [("a|b", 7), ("contacts", 50)], [(None, 3)]])
+        queries = {"total": "q1", "cats": "q2", "pair": "q3"}
+        with patch("db_health_check.psycopg2", driver):
+            out = dhc.run_queries(queries)
+        self.assertEqual(out, {"total": "100", "cats": "a|b|7\ncontacts|50", "pair": "|3"})
+        mock_run.assert_not_called()
+        driver.connect.return_value.close.assert_called_once()
+
+    def test_timestamps_and_booleans_formatted_like_psql(self):
+        utc = timezone.utc
+        ist = timezone(timedelta(hours=5, minutes=30))
+        driver = self._driver([[
+            (datetime(2026, 10, 14, 7, 0, 0, 123000, tzinfo=utc), True),
+            (datetime(2026, 10, 14, 7, 0, 0, tzinfo=ist), False),
+            (datetime(2026, 10, 14, 7, 0, 0, 500), None),
+        ]])
+        with patch("db_health_check.psycopg2", driver):
+            out = dhc.run_queries({"last": "q"})
+        self.assertEqual(out["last"], "2026-10-14 07:00:00.123+00|t\n"
+                                      "2026-10-14 07:00:00+05:30|f\n"
+                                      "2026-10-14 07:00:00.0005|")
+
+    def test_failed_query_and_failed_connect_give_empty_output(self):
+        driver = self._driver([RuntimeError("boom"), [(1,)]])
+        with patch("db_health_check.psycopg2", driver):
+            self.assertEqual(dhc.run_queries({"a": "bad", "b": "SELECT 1"}), {"a": "", "b": "1"})
+        driver.connect.side_effect = RuntimeError("refused")
+        with patch("db_health_check.psycopg2", driver):
+            self.assertEqual(dhc.run_queries({"a": "SELECT 1"}), {"a": ""})
+
+
 class TestCreateBaseline(unittest.TestCase):
     """Tests for create_baseline()."""
 
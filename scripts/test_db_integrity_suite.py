@@ -47,6 +47,17 @@ class TestRunSql(unittest.TestCase):
         result = self.suite.run_sql("SELECT 1")
         self.assertIsNone(result)
 
+    @patch("db_integrity_suite.subprocess.run")
+    def test_env_built_once_per_database(self, mock_run):
+        mock_run.return_value = _make_proc(0, "1")
+        self.suite.run_sql("SELECT 1")
+        self.suite.run_sql("SELECT 2")
+        self.suite.run_sql("SELECT 1", db="other")
+        envs = [c.kwargs["env"] for c in mock_run.call_args_list]
+        self.assertIs(envs[0], envs[1])
+        self.assertEqual(envs[0]["PGDATABASE"], dis.DB_NAME)
+        self.assertEqual(envs[2]["PGDATABASE"], "other")
+
 
 class TestChecksumsEnabled(unittest.TestCase):
     """Tests for test_checksums_enabled()."""
@@ -82,26 +93,27 @@ class TestPgAmcheck(unittest.TestCase):
     def setUp(self):
         self.suite = dis.DBIntegritySuite()
 
+    @patch("db_integrity_suite.shutil.which", return_value=None)
     @patch("db_integrity_suite.subprocess.run")
-    def test_skip_when_not_installed(self, mock_run):
-        mock_run.return_value = _make_proc(1)  # 'which pg_amcheck' fails
+    def test_skip_when_not_installed(self, mock_run, _which):
         result = self.suite.test_pg_amcheck()
         self.assertIsNone(result)
         self.assertEqual(self.suite.results["tests"]["amcheck"]["status"], "SKIP")
+        mock_run.assert_not_called()
 
+    @patch("db_integrity_suite.shutil.which", return_value="/usr/bin/pg_amcheck")
     @patch("db_integrity_suite.subprocess.run")
-    def test_warning_when_extension_missing(self, mock_run):
-        # which pg_amcheck succeeds, but extension count = 0
+    def test_warning_when_extension_missing(self, mock_run, _which):
+        # pg_amcheck is on PATH, but extension count = 0
         mock_run.return_value = _make_proc(0, "0\n")
         with patch.object(self.suite, "run_sql", return_value="0"):
             result = self.suite.test_pg_amcheck()
         self.assertIsNone(result)
 
+    @patch("db_integrity_suite.shutil.which", return_value="/usr/bin/pg_amcheck")
     @patch("db_integrity_suite.subprocess.run")
-    def test_pass_when_clean(self, mock_run):
-        # which succeeds, amcheck run succeeds
+    def test_pass_when_clean(self, mock_run, _which):
         mock_run.side_effect = [
-            _make_proc(0),          # which pg_amcheck
             _make_proc(0, "ok\n"),  # pg_amcheck --verbose
         ]
         with patch.object(self.suite, "run_sql", return_value="1"):
@@ -109,10 +121,10 @@ class TestPgAmcheck(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(self.suite.results["passed"], 1)
 
+    @patch("db_integrity_suite.shutil.which", return_value="/usr/bin/pg_amcheck")
     @patch("db_integrity_suite.subprocess.run")
-    def test_fail_on_corruption(self, mock_run):
+    def test_fail_on_corruption(self, mock_run, _which):
         mock_run.side_effect = [
-            _make_proc(0),                         # which pg_amcheck
             _make_proc(1, "", "corruption found"),  # pg_amcheck fails
         ]
         with patch.object(self.suite, "run_sql", return_value="1"):
@@ -120,10 +132,10 @@ class TestPgAmcheck(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(self.suite.results["failed"], 1)
 
+    @patch("db_integrity_suite.shutil.which", return_value="/usr/bin/pg_amcheck")
     @patch("db_integrity_suite.subprocess.run")
-    def test_warning_on_no_relations(self, mock_run):
+    def test_warning_on_no_relations(self, mock_run, _which):
         mock_run.side_effect = [
-            _make_proc(0),
             _make_proc(1, "", "no relations to check"),
         ]
         with patch.object(self.suite, "run_sql", return_value="1"):